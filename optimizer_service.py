@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NöbetSihirbazı - Optimizatör Servisi
+====================================
+
+NobetOptimizer'ı kalıcı bir süreçte çalıştırır; kütüphaneler işçi süreçlerde
+bir kez yüklenir ve çözüm istekleri yerel HTTP/JSON (TCP veya Unix soketi)
+üzerinden alınır.
+
+Uç noktalar:
+    GET    /health        Servis durumu
+    POST   /solve         İşi çözer ve sonucu bekler (zaman aşımında 504)
+    POST   /jobs          İşi kuyruğa alır, iş kimliği döndürür (202)
+    POST   /score         Aday çizelgeleri/düzenlemeleri çözmeden puanlar
+    GET    /jobs/<id>     İş durumu ve sonucu
+    DELETE /jobs/<id>     Kuyrukta bekleyen işi iptal eder (çalışan iş için 409)
+
+İş gövdesi toplu moddaki satır biçimiyle aynıdır; ek olarak "timeout"
+(saniye) alanı kabul edilir. Kuyruk doluysa 503 ve Retry-After, kimliği
+zaten kullanılan iş için 409 döner.
+
+Kullanım:
+    python optimizer_service.py --port 8765 --workers 4 --queue-size 32
+    python optimizer_service.py --unix-socket /tmp/nobet.sock
+"""
+
+import asyncio
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple
+
+import schedule_optimizer
+from schedule_optimizer import dumps_json, score_job, solve_job
+
+MAX_BODY_SIZE = 10 * 1024 * 1024
+FINISHED_JOBS_KEPT = 1000
+
+HTTP_REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+
+def _warm_worker():
+    """İşçi sürecinde ağır kurulumları (DEAP tipleri vb.) önceden yapar"""
+    if schedule_optimizer.GA_AVAILABLE:
+        schedule_optimizer.ensure_deap_types()
+
+
+class QueueFullError(Exception):
+    """İş kuyruğu dolu (geri basınç)"""
+
+
+class DuplicateJobError(Exception):
+    """İş kimliği zaten kullanılıyor"""
+
+
+def parse_timeout(value) -> float:
+    """İstekteki zaman aşımını doğrular (pozitif saniye)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value < float('inf'):
+        raise ValueError("timeout pozitif bir sayı (saniye) olmalı")
+    return float(value)
+
+
+class OptimizerService:
+    """Sınırlı kuyruklu, zaman aşımı ve iptal destekli çözüm servisi
+    
+    İşler havuza yalnızca boş işçi oldukça verilir; havuzdaki iş iptal edilemez.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 32,
+                 default_timeout: float = 60.0, defaults: Optional[Dict] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.default_timeout = default_timeout
+        self.defaults = defaults or {}
+        self.executor = self.create_executor()
+        self.jobs = OrderedDict()  # id -> {'call', 'future', 'executor', 'done', 'status', 'result'}
+        self.pending = deque()     # havuza henüz verilmemiş iş kimlikleri
+        self.running = 0
+        self.loop = None
+
+    def create_executor(self) -> ProcessPoolExecutor:
+        """İşçi havuzunu kurar (forkserver: istemci soketleri miras alınmaz)"""
+        context = (multiprocessing.get_context('forkserver')
+                   if 'forkserver' in multiprocessing.get_all_start_methods() else None)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                   initializer=_warm_worker)
+
+    def restart_executor(self):
+        """Bozulan (işçisi çöken) havuzu yenisiyle değiştirir"""
+        broken, self.executor = self.executor, self.create_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("⚠️  İşçi havuzu bozuldu, yeniden kuruldu", file=sys.stderr)
+
+    @property
+    def active_jobs(self) -> int:
+        """Kuyrukta bekleyen veya çalışan iş sayısı"""
+        return sum(1 for job in self.jobs.values() if job['status'] in ('queued', 'running'))
+
+    def prepare_job(self, job: Dict) -> Tuple[Dict, float]:
+        """İş zaman aşımını belirler; motor süre sınırlarını ve iş bitiş anını buna göre ayarlar"""
+        timeout = parse_timeout(job.pop('timeout', self.default_timeout))
+        for key in ('solver_options', 'local_search_options', 'ga_options'):
+            options = dict(self.defaults.get(key) or {})
+            options.update(job.get(key) or {})
+            limit = options.get('time_limit')
+            options['time_limit'] = timeout if limit is None else min(limit, timeout)
+            job[key] = options
+        
+        portfolio = dict(self.defaults.get('portfolio_options') or {})
+        portfolio.update(job.get('portfolio_options') or {})
+        if portfolio:
+            portfolio['deadline'] = min(portfolio.get('deadline', timeout), timeout)
+            job['portfolio_options'] = portfolio
+        # Motorlar art arda çalıştığında da iş, istemcinin beklediği anda biter
+        job['deadline'] = time.time() + timeout
+        return job, timeout
+
+    def submit(self, job: Dict, function: Optional[Callable[[Dict], Dict]] = None) -> str:
+        """İşi kuyruğa alır (olay döngüsünden çağrılmalı)"""
+        job_id = str(job.get('id') or uuid.uuid4().hex)
+        if job_id in self.jobs:
+            raise DuplicateJobError(job_id)
+        if self.active_jobs >= self.queue_size:
+            raise QueueFullError()
+
+        self.loop = asyncio.get_running_loop()
+        job['id'] = job_id
+        call = (solve_job, job, self.defaults) if function is None else (function, job)
+        self.jobs[job_id] = {'call': call, 'future': None, 'executor': None,
+                             'done': self.loop.create_future(), 'status': 'queued', 'result': None}
+        self.pending.append(job_id)
+        self.dispatch()
+        return job_id
+
+    def dispatch(self):
+        """Boş işçi oldukça bekleyen işleri havuza verir"""
+        while self.pending and self.running < self.workers:
+            job_id = self.pending.popleft()
+            entry = self.jobs[job_id]
+            try:
+                entry['future'] = self.executor.submit(*entry['call'])
+            except BrokenProcessPool as e:
+                self.restart_executor()
+                self.fail(job_id, e)
+                continue
+            entry['executor'] = self.executor
+            entry['status'] = 'running'
+            self.running += 1
+            # Tamamlanma geri çağrısı havuzun yönetim iş parçacığında çalışır;
+            # self.jobs yalnızca olay döngüsünde değiştirilir
+            entry['future'].add_done_callback(
+                lambda future, job_id=job_id: self.loop.call_soon_threadsafe(self.finish, job_id, future))
+
+    def finish(self, job_id: str, future):
+        """Havuzdan dönen işi sonuçlandırır ve sıradaki işi başlatır (olay döngüsünde)"""
+        self.running -= 1
+        entry = self.jobs[job_id]
+        if future.cancelled():
+            # Havuzdaki işler yalnızca bozulan havuz kapatılırken iptal edilir
+            self.fail(job_id, BrokenProcessPool("İşçi havuzu yeniden kuruldu"))
+        elif future.exception() is not None:
+            error = future.exception()
+            # Aynı havuzun diğer işleri de bu hatayla döner; havuz bir kez yenilenir
+            if isinstance(error, BrokenProcessPool) and entry['executor'] is self.executor:
+                self.restart_executor()
+            self.fail(job_id, error)
+        else:
+            entry['result'] = future.result()
+            entry['status'] = 'done' if entry['result']['success'] else 'failed'
+            entry['done'].set_result(entry['result'])
+            self.forget_old_jobs()
+        self.dispatch()
+
+    def fail(self, job_id: str, error: BaseException):
+        """İşi hata sonucuyla sonuçlandırır"""
+        entry = self.jobs[job_id]
+        entry['status'] = 'failed'
+        entry['result'] = {'id': job_id, 'success': False, 'error': str(error) or type(error).__name__}
+        if not entry['done'].done():
+            entry['done'].set_result(entry['result'])
+        self.forget_old_jobs()
+
+    def cancel(self, job_id: str) -> bool:
+        """Bekleyen işi iptal eder; çalışan iş iptal edilemez (bitiş anında kendiliğinden biter)"""
+        entry = self.jobs.get(job_id)
+        if entry is None or entry['status'] != 'queued':
+            return False
+        self.pending.remove(job_id)
+        entry['status'] = 'cancelled'
+        entry['done'].set_result(None)
+        self.forget_old_jobs()
+        return True
+
+    def job_status(self, job_id: str) -> Optional[Dict]:
+        """İş durumunu döndürür"""
+        entry = self.jobs.get(job_id)
+        if entry is None:
+            return None
+        return {'id': job_id, 'status': entry['status'], 'result': entry['result']}
+
+    def forget_old_jobs(self):
+        """Biten işlerin yalnızca son FINISHED_JOBS_KEPT tanesini tutar"""
+        finished = [job_id for job_id, entry in self.jobs.items() if entry['done'].done()]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            self.jobs.pop(job_id, None)
+
+    async def solve(self, job: Dict, timeout: float, disconnected: Optional[asyncio.Future] = None,
+                    function: Optional[Callable[[Dict], Dict]] = None) -> Tuple[Optional[int], Optional[Dict]]:
+        """İşi çözer ve sonucu zaman aşımına kadar bekler
+
+        disconnected (istemcinin bağlantıyı kapattığında biten görev) önce
+        biterse bekleyen iş iptal edilir ve (None, None) döner; yanıt yazılmaz.
+        """
+        job_id = self.submit(job, function)
+        entry = self.jobs[job_id]
+        waiters = {entry['done']} if disconnected is None else {entry['done'], disconnected}
+        try:
+            finished, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            self.cancel(job_id)
+            raise
+
+        if entry['done'] in finished:
+            if entry['result'] is None:
+                return 409, {'id': job_id, 'success': False, 'error': "İş iptal edildi"}
+            return 200, entry['result']
+        self.cancel(job_id)
+        if finished:
+            return None, None
+        return 504, {'id': job_id, 'success': False, 'error': "Zaman aşımı"}
+
+    async def route(self, method: str, path: str, body: bytes,
+                    disconnected: Optional[asyncio.Future] = None) -> Tuple[Optional[int], Dict, Dict]:
+        """İsteği uç noktaya yönlendirir: (durum kodu, JSON gövde, ek başlıklar)
+
+        İstemci yanıtı beklerken bağlantıyı kapattıysa durum kodu None olur.
+        """
+        if path == '/health':
+            return 200, {'status': 'ok', 'workers': self.workers, 'active_jobs': self.active_jobs,
+                         'queue_size': self.queue_size}, {}
+
+        if path in ('/solve', '/jobs') and method == 'POST':
+            try:
+                job = json.loads(body.decode('utf-8') or '{}')
+                if not isinstance(job, dict):
+                    raise ValueError("İş bir JSON nesnesi olmalı")
+                job, timeout = self.prepare_job(job)
+            except (ValueError, UnicodeDecodeError) as e:
+                return 400, {'success': False, 'error': f"Geçersiz istek: {str(e)}"}, {}
+
+            try:
+                if path == '/jobs':
+                    return 202, {'id': self.submit(job), 'status': 'queued'}, {}
+                status, result = await self.solve(job, timeout, disconnected)
+                return status, result, {}
+            except QueueFullError:
+                return 503, {'success': False, 'error': "Kuyruk dolu, daha sonra tekrar deneyin"}, {'Retry-After': '1'}
+            except DuplicateJobError as e:
+                return 409, {'success': False, 'error': f"İş kimliği zaten kullanılıyor: {e}"}, {}
+
+        if path == '/score' and method == 'POST':
+            try:
+                job = json.loads(body.decode('utf-8') or '{}')
+                if not isinstance(job, dict):
+                    raise ValueError("İş bir JSON nesnesi olmalı")
+                timeout = parse_timeout(job.pop('timeout', self.default_timeout))
+            except (ValueError, UnicodeDecodeError) as e:
+                return 400, {'success': False, 'error': f"Geçersiz istek: {str(e)}"}, {}
+            # Puanlama da çözümlerle aynı sınırlı kuyruğu kullanır
+            try:
+                status, result = await self.solve(job, timeout, disconnected, score_job)
+            except QueueFullError:
+                return 503, {'success': False, 'error': "Kuyruk dolu, daha sonra tekrar deneyin"}, {'Retry-After': '1'}
+            except DuplicateJobError as e:
+                return 409, {'success': False, 'error': f"İş kimliği zaten kullanılıyor: {e}"}, {}
+            if status == 200 and not result['success']:
+                status = 400
+            return status, result, {}
+
+        if path.startswith('/jobs/'):
+            job_id = path[len('/jobs/'):]
+            if method == 'GET':
+                status = self.job_status(job_id)
+                return (200, status, {}) if status else (404, {'error': "İş bulunamadı"}, {})
+            if method == 'DELETE':
+                status = self.job_status(job_id)
+                if status is None:
+                    return 404, {'error': "İş bulunamadı"}, {}
+                if self.cancel(job_id):
+                    return 200, {'id': job_id, 'cancelled': True}, {}
+                error = ("Çalışan iş iptal edilemez; zaman aşımı anında durur"
+                         if status['status'] == 'running' else "İş zaten bitti")
+                return 409, {'id': job_id, 'cancelled': False, 'status': status['status'], 'error': error}, {}
+
+        if path in ('/health', '/solve', '/jobs', '/score') or path.startswith('/jobs/'):
+            return 405, {'error': "Desteklenmeyen metod"}, {}
+        return 404, {'error': "Bulunamadı"}, {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Tek bir HTTP/1.1 isteğini okur, yanıtlar ve bağlantıyı kapatır"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            if not request_line:
+                return
+            method, target, _ = (request_line.split(' ', 2) + ['', ''])[:3]
+
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY_SIZE:
+                status, payload, extra = 413, {'error': "İstek gövdesi çok büyük"}, {}
+            else:
+                body = await reader.readexactly(length) if length else b''
+                # Akış işleyicisi karşı taraf kapanınca iptal edilmez; EOF ayrıca izlenir
+                disconnected = asyncio.ensure_future(reader.read())
+                try:
+                    status, payload, extra = await self.route(method.upper(), target.split('?', 1)[0], body,
+                                                              disconnected)
+                finally:
+                    if disconnected.done() and not disconnected.cancelled():
+                        disconnected.exception()
+                    disconnected.cancel()
+                if status is None:
+                    writer.close()
+                    return
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload, extra = 400, {'error': f"Geçersiz HTTP isteği: {str(e)}"}, {}
+        except asyncio.CancelledError:
+            writer.close()
+            raise
+        except Exception as e:
+            status, payload, extra = 500, {'error': str(e)}, {}
+
+        data = dumps_json(payload).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(data)}",
+                "Connection: close"]
+        head.extend(f"{name}: {value}" for name, value in extra.items())
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765,
+                    unix_socket: Optional[str] = None):
+        """Servisi başlatır ve sonsuza dek çalıştırır"""
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            address = unix_socket
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            address = f"http://{host}:{port}"
+
+        print(f"🚀 NöbetSihirbazı optimizatör servisi: {address} "
+              f"({self.workers} işçi, kuyruk {self.queue_size})", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    """Servis çalıştırma fonksiyonu"""
+    parser = argparse.ArgumentParser(description='NöbetSihirbazı Optimizatör Servisi')
+    parser.add_argument('--host', default='127.0.0.1', help='Dinlenecek adres')
+    parser.add_argument('--port', type=int, default=8765, help='Dinlenecek port')
+    parser.add_argument('--unix-socket', help='TCP yerine Unix soketi yolu')
+    parser.add_argument('--workers', type=int, default=None, help='İşçi süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--queue-size', type=int, default=32, help='Aynı anda kabul edilen en fazla iş')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Varsayılan istek zaman aşımı (saniye)')
+    parser.add_argument('--cache-dir', help='Sonuç önbelleği dizini (işçiler arasında paylaşılır)')
+    parser.add_argument('--cache-size-mb', type=float, default=100, help='Disk önbelleği boyut sınırı (MB)')
+
+    args = parser.parse_args()
+
+    # Önbellek her işçide bellek katmanı, --cache-dir ile ortak disk katmanı kullanır
+    defaults = {'cache': {'directory': args.cache_dir,
+                          'max_disk_bytes': int(args.cache_size_mb * 1024 * 1024)}}
+    service = OptimizerService(args.workers, args.queue_size, args.timeout, defaults)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        print("👋 Servis durduruldu", file=sys.stderr)
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
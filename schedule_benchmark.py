@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NöbetSihirbazı - Performans Ölçüm Paketi
+========================================
+
+Sentetik tercih setleri üretir, NobetOptimizer motorlarını sabit tohumlarla
+çalıştırır ve duvar saati süresi, tepe bellek, amaç değeri ve kural
+ihlallerini makine tarafından okunabilir JSON olarak kaydeder. İki çalıştırma
+karşılaştırılarak performans gerilemeleri dağıtımdan önce yakalanabilir.
+
+Kullanım:
+    python schedule_benchmark.py run --sizes 10,50,100,500 --output bench.json
+    python schedule_benchmark.py compare baseline.json bench.json --threshold 0.2
+
+Not: Tepe bellek ayrı bir çalıştırmada tracemalloc ile ölçülür (süre
+ölçümü izlemesizdir); CBC ayrı süreçte çalıştığı için çözücünün kendi
+belleği dahil değildir.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from schedule_optimizer import NobetOptimizer, ScheduleCalendar
+
+ENGINES = ('lp', 'ga', 'greedy', 'local_search')
+
+
+def generate_preferences(num_doctors: int, horizon: int = 31, density: float = 0.25,
+                         negative_ratio: float = 0.5, seed: int = 0) -> Dict:
+    """Sentetik doktor tercihleri üretir"""
+    rng = random.Random(seed)
+    preferences = {}
+    marked = max(0, min(horizon, round(density * horizon)))
+    for i in range(num_doctors):
+        days = rng.sample(range(1, horizon + 1), marked)
+        negatives = round(len(days) * negative_ratio)
+        preferences[f"Dr. Sentetik {i + 1:03d}"] = {
+            'pozitif': sorted(days[negatives:]),
+            'negatif': sorted(days[:negatives]),
+            'ozelSebepler': '',
+        }
+    return preferences
+
+
+def default_cases(sizes: List[int], horizons: List[int], density: float) -> List[Dict]:
+    """Varsayılan senaryolar: boyut x ufuk taraması ve negatif ağırlıklı çözümsüz durum"""
+    cases = []
+    for horizon in horizons:
+        for size in sizes:
+            cases.append({'name': f"d{size}_h{horizon}", 'doctors': size, 'horizon': horizon,
+                          'density': density, 'negative_ratio': 0.5})
+        # Neredeyse her gün negatif: çoğu gün için yeterli doktor bulunamaz
+        cases.append({'name': f"negatif_agir_h{horizon}", 'doctors': min(sizes), 'horizon': horizon,
+                      'density': 0.9, 'negative_ratio': 0.95})
+    return cases
+
+
+def make_optimizer(preferences: Dict, horizon: int, seed: int) -> NobetOptimizer:
+    """1 Temmuz 2025'ten başlayan, resmi tatilsiz, verilen gün sayısında ufuklu optimizatör oluşturur"""
+    calendar = ScheduleCalendar(2025, 7, num_days=horizon, include_public_holidays=False)
+    return NobetOptimizer(preferences, calendar=calendar, ga_options={'seed': seed},
+                          local_search_options={'time_limit': 30.0})
+
+
+def measure_schedule(optimizer: NobetOptimizer, schedule: Optional[Dict]) -> Dict:
+    """Ortak amaç değerini (evaluate_schedule) ve kural ihlallerini hesaplar"""
+    if not schedule:
+        return {'objective': None, 'violations': None}
+
+    index = optimizer.pref_index
+    assigned = optimizer.as_schedule(schedule).matrix.astype(np.int64)
+
+    occupied = assigned > 0
+    counts = assigned.sum(axis=1)
+
+    return {
+        'objective': optimizer.evaluate_schedule(schedule),
+        'violations': {
+            'coverage': int(np.abs(occupied.sum(axis=0) - index.required).sum()),
+            'duplicate': int((assigned - occupied).sum()),
+            'consecutive': int((occupied[:, :-1] & occupied[:, 1:]).sum()),
+            'max_shifts': int(np.maximum(counts - optimizer.max_shifts, 0).sum()),
+            'negatif': int((occupied & index.negative_mask).sum()),
+        },
+    }
+
+
+def solve_engine(optimizer: NobetOptimizer, engine: str, start_schedule: Optional[Dict]) -> Optional[Dict]:
+    """Motoru çalıştırır ve çizelgeyi döndürür"""
+    if engine == 'lp':
+        return optimizer.linear_programming_optimize()
+    if engine == 'ga':
+        return optimizer.genetic_algorithm_optimize()
+    if engine == 'greedy':
+        return optimizer.simple_greedy_algorithm()
+    if engine == 'local_search':
+        return optimizer.local_search_optimize(start_schedule)
+    raise ValueError(f"Bilinmeyen motor: {engine}")
+
+
+def run_engine(preferences: Dict, horizon: int, engine: str, seed: int) -> Dict:
+    """Tek bir motoru ölçer; süre tracemalloc'suz, tepe bellek ayrı bir çalıştırmada"""
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen motor: {engine}")
+
+    def prepare():
+        optimizer = make_optimizer(preferences, horizon, seed)
+        random.seed(seed)
+        # Yerel arama greedy çözümden başlar; başlangıç çözümü ölçüme dahil edilmez
+        start_schedule = optimizer.simple_greedy_algorithm() if engine == 'local_search' else None
+        return optimizer, start_schedule
+
+    optimizer, start_schedule = prepare()
+    start = perf_counter()
+    schedule = solve_engine(optimizer, engine, start_schedule)
+    wall_time = perf_counter() - start
+
+    traced, start_schedule = prepare()
+    tracemalloc.start()
+    try:
+        solve_engine(traced, engine, start_schedule)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'engine': engine,
+        'success': bool(schedule),
+        'wall_time': wall_time,
+        'peak_memory_kb': peak / 1024,
+    }
+    result.update(measure_schedule(optimizer, schedule))
+    return result
+
+
+def run_benchmark(cases: List[Dict], engines: List[str], seed: int = 42, repeat: int = 1) -> Dict:
+    """Tüm senaryo x motor kombinasyonlarını çalıştırır"""
+    results = []
+    for case in cases:
+        preferences = generate_preferences(case['doctors'], case['horizon'], case['density'],
+                                           case['negative_ratio'], seed)
+        for engine in engines:
+            runs = [run_engine(preferences, case['horizon'], engine, seed) for _ in range(repeat)]
+            best = min(runs, key=lambda run: run['wall_time'])
+            best['wall_times'] = [run['wall_time'] for run in runs]
+            best.update({key: case[key] for key in ('doctors', 'horizon', 'density', 'negative_ratio')})
+            best['case'] = case['name']
+            results.append(best)
+            print(f"  {case['name']:<22} {engine:<13} {best['wall_time']:8.3f} sn  "
+                  f"amaç={best['objective']}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_runs(baseline: Dict, current: Dict, threshold: float = 0.2,
+                 min_time_delta: float = 0.01) -> List[Dict]:
+    """İki çalıştırmayı karşılaştırır; gerileme satırlarını döndürür"""
+    previous = {(row['case'], row['engine']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = previous.get((row['case'], row['engine']))
+        if old is None:
+            continue
+
+        reasons = []
+        slower = row['wall_time'] - old['wall_time']
+        if slower > min_time_delta and row['wall_time'] > old['wall_time'] * (1 + threshold):
+            reasons.append(f"süre {old['wall_time']:.3f} -> {row['wall_time']:.3f} sn")
+        if old['success'] and not row['success']:
+            reasons.append("çözüm bulunamadı")
+        if old['objective'] is not None and row['objective'] is not None and row['objective'] < old['objective']:
+            reasons.append(f"amaç {old['objective']:.1f} -> {row['objective']:.1f}")
+        if old['violations'] and row['violations']:
+            if sum(row['violations'].values()) > sum(old['violations'].values()):
+                reasons.append(f"ihlal {sum(old['violations'].values())} -> {sum(row['violations'].values())}")
+
+        if reasons:
+            regressions.append({'case': row['case'], 'engine': row['engine'], 'reasons': reasons})
+    return regressions
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+def main():
+    """Ölçüm paketi çalıştırma fonksiyonu"""
+    parser = argparse.ArgumentParser(description='NöbetSihirbazı performans ölçüm paketi')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Ölçümleri çalıştır')
+    run_parser.add_argument('--sizes', type=parse_int_list, default=[10, 50, 100, 250, 500],
+                            help='Doktor sayıları (virgülle ayrılmış)')
+    run_parser.add_argument('--horizons', type=parse_int_list, default=[31], help='Ufuk uzunlukları (gün)')
+    run_parser.add_argument('--density', type=float, default=0.25, help='Tercih yoğunluğu (0-1)')
+    run_parser.add_argument('--engines', default=','.join(ENGINES), help='Motorlar (virgülle ayrılmış)')
+    run_parser.add_argument('--seed', type=int, default=42, help='Rastgelelik tohumu')
+    run_parser.add_argument('--repeat', type=int, default=1, help='Her ölçümün tekrar sayısı (en hızlısı alınır)')
+    run_parser.add_argument('--output', '-o', default='-', help="Sonuç JSON dosyası ('-' ile stdout)")
+
+    compare_parser = subparsers.add_parser('compare', help='İki çalıştırmayı karşılaştır')
+    compare_parser.add_argument('baseline', help='Referans sonuç dosyası')
+    compare_parser.add_argument('current', help='Yeni sonuç dosyası')
+    compare_parser.add_argument('--threshold', type=float, default=0.2, help='İzin verilen süre artış oranı')
+    compare_parser.add_argument('--min-time-delta', type=float, default=0.01,
+                                help='Gerileme sayılacak en küçük süre artışı (saniye)')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+        unknown = [engine for engine in engines if engine not in ENGINES]
+        if unknown:
+            parser.error(f"Bilinmeyen motor: {', '.join(unknown)}")
+
+        report = run_benchmark(default_cases(args.sizes, args.horizons, args.density),
+                               engines, args.seed, args.repeat)
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output == '-':
+            print(data)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(data)
+            print(f"📁 Sonuç dosyası: {args.output}", file=sys.stderr)
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+
+    regressions = compare_runs(baseline, current, args.threshold, args.min_time_delta)
+    for regression in regressions:
+        print(f"❌ {regression['case']} / {regression['engine']}: {'; '.join(regression['reasons'])}")
+    if not regressions:
+        print("✅ Gerileme bulunamadı")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    exit(main())
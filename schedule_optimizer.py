@@ -7,58 +7,931 @@ NöbetSihirbazı - Akıllı Çizelge Optimizatörü
 Bu modül doktor nöbet çizelgelerini optimize etmek için:
 1. Linear Programming (PuLP)
 2. Genetic Algorithm (DEAP)
-3. Machine Learning (scikit-learn)
+3. Yerel arama (LP/GA/greedy çözümlerini iyileştirme)
 teknolojilerini kullanır.
 
 Kullanım:
     python schedule_optimizer.py --input preferences.json --output schedule.json
+    python schedule_optimizer.py --batch jobs.jsonl --output results.jsonl
+    python schedule_optimizer.py -i preferences.json --format stream --day-masks
+    python schedule_optimizer.py -i preferences.json --portfolio --deadline 10
+    python schedule_optimizer.py --store nobet.db --tenant acil --month 7 --year 2025
+    python schedule_optimizer.py -i agustos.json --month 8 --history temmuz_rapor.json
+    python schedule_optimizer.py -i preferences.json -o schedule.json --profile
+
+Toplu modda her satır bir iştir:
+    {"id": "acil-2025-07", "preferences": {...}, "month": 7, "year": 2025,
+     "rules": {"WEEKEND_DOCTORS_NEEDED": 3}}
+--store ile "tenant" alanı olan işlerin tercihleri (yoksa) depodan okunur ve
+sonuçları kurumun dönemine yeni sürüm olarak yazılır.
+
+Çok aylık ufuk (ör. bir çeyrek) tek modelde çözülür; günler ufkun başından
+itibaren numaralanır, tercihlerde "2025-08-15" gibi ISO tarihler de kullanılabilir:
+    python schedule_optimizer.py -i preferences.json --month 7 --year 2025 --months 3
+
+"Ne olur?" soruları çözmeden puanlanabilir; yüzlerce aday tek çağrıda
+vektörel değerlendirilir (servis: POST /score):
+    optimizer.score_schedules([{"edits": [{"doctor": "Dr. X", "from": 14, "to": 12}]}])
 """
 
 import json
+import os
 import sys
 import argparse
+import atexit
+import importlib
+import importlib.util
+import hashlib
+import multiprocessing
 import random
-import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import date, timedelta
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from time import perf_counter, time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
-# Linear Programming için
-try:
-    from pulp import *
-    LP_AVAILABLE = True
-except ImportError:
-    print("⚠️  PuLP kurulu değil. pip install pulp")
-    LP_AVAILABLE = False
+# Modül içe aktarma süreleri (--profile-startup için)
+_MODULE_START = perf_counter()
+IMPORT_TIMES = {}
+
+_import_start = perf_counter()
+import numpy as np
+IMPORT_TIMES['numpy'] = perf_counter() - _import_start
+
+def module_available(name: str) -> bool:
+    """Modülü içe aktarmadan kurulu olup olmadığını kontrol eder"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-# Genetic Algorithm için
-try:
+# Motor kütüphaneleri yalnızca ilgili motor seçildiğinde içe aktarılır
+LP_AVAILABLE = module_available('pulp')           # Linear Programming
+GA_AVAILABLE = module_available('deap')           # Genetic Algorithm
+ORJSON_AVAILABLE = module_available('orjson')     # Hızlı JSON çıktısı
+
+def import_engine(name: str):
+    """Motor kütüphanesini ilk kullanımda içe aktarır ve süresini kaydeder"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = perf_counter() - start
+    return module
+
+def load_deap():
+    """DEAP modüllerini (base, creator, tools, algorithms) döndürür"""
+    import_engine('deap.algorithms')
     from deap import base, creator, tools, algorithms
-    import random
-    GA_AVAILABLE = True
-except ImportError:
-    print("⚠️  DEAP kurulu değil. pip install deap")
-    GA_AVAILABLE = False
-
-# Machine Learning için
-try:
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.preprocessing import StandardScaler
-    import pandas as pd
-    ML_AVAILABLE = True
-except ImportError:
-    print("⚠️  scikit-learn kurulu değil. pip install scikit-learn pandas")
-    ML_AVAILABLE = False
+    return base, creator, tools, algorithms
+
+# Kısa çözücü adları -> PuLP çözücü sınıfları
+SOLVER_BACKENDS = {
+    'cbc': 'PULP_CBC_CMD',
+    'highs': 'HiGHS',
+    'highs_cmd': 'HiGHS_CMD',
+    'glpk': 'GLPK_CMD',
+    'gurobi': 'GUROBI_CMD',
+    'cplex': 'CPLEX_CMD',
+    'scip': 'SCIP_CMD',
+}
+
+def ensure_deap_types():
+    """DEAP creator sınıflarını (bir kez) tanımlar"""
+    base, creator, _, _ = load_deap()
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+    if not hasattr(creator, "Individual"):
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+# Ada modeli ve ayrıştırma işçi süreçleri için optimizatör kopyası
+_WORKER_OPTIMIZER = None
+
+def _init_optimizer_worker(optimizer):
+    """İşçi sürecinde kullanılacak optimizatörü saklar"""
+    global _WORKER_OPTIMIZER
+    _WORKER_OPTIMIZER = optimizer
+
+def _evolve_island(population, generations, start_generation, seed, time_left=None):
+    """İşçi sürecinde tek bir adayı evrimleştirir"""
+    return _WORKER_OPTIMIZER.evolve_island(population, generations, start_generation, seed, time_left)
+
+def _solve_window(first_day, last_day, shift_bounds):
+    return _WORKER_OPTIMIZER.solve_window(first_day, last_day, shift_bounds)
+
+# Portföy işçileri için (ara sonuç kuyruğu, durdurma olayı)
+_PORTFOLIO_CHANNEL = None
+
+def _init_portfolio_worker(optimizer, queue, stop_event):
+    """Portföy işçisine optimizatörü ve ana süreçle iletişim kanalını verir"""
+    global _PORTFOLIO_CHANNEL
+    _init_optimizer_worker(optimizer)
+    # Ana süreç okumayı bıraktıysa işçi kuyruğu boşaltmayı beklemeden çıkabilmeli
+    queue.cancel_join_thread()
+    _PORTFOLIO_CHANNEL = (queue, stop_event)
+
+def _run_portfolio_arm(arm, time_left, incumbent):
+    queue, stop_event = _PORTFOLIO_CHANNEL
+    return _WORKER_OPTIMIZER.run_portfolio_arm(
+        arm, time_left, incumbent,
+        lambda engine, schedule: queue.put((engine, schedule)), stop_event.is_set)
+
+def terminate_executor(executor: ProcessPoolExecutor) -> None:
+    """Havuzu beklemeden kapatır ve hâlâ çalışan işçi süreçlerini sonlandırır"""
+    # shutdown süreç listesini bıraktığı için önce alınır
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=1.0)
+
+# Doktor geçmişi alanları (aylar arası adalet için birikimli sayılar)
+HISTORY_FIELDS = ('shifts', 'weekend_shifts', 'negatif_violations', 'months')
+
+class PreferenceIndex:
+    """Tercihlerin motorlar arasında paylaşılan, değiştirilemez indeksi (doktorlar 0, günler 1 tabanlı)"""
+    
+    def __init__(self, preferences_data: Dict, doctors: List[str], days: int,
+                 required_per_day: List[int], weekend_days: List[bool],
+                 weights: Dict[str, float],
+                 weekend_adjustment: Optional[np.ndarray] = None,
+                 preference_adjustment: Optional[np.ndarray] = None):
+        self.doctors = tuple(doctors)
+        self.doctor_ids = {doctor: i for i, doctor in enumerate(self.doctors)}
+        self.days = days
+        
+        positive_mask = np.zeros((len(self.doctors), days), dtype=bool)
+        negative_mask = np.zeros((len(self.doctors), days), dtype=bool)
+        positive_bits = []
+        negative_bits = []
+        
+        for i, doctor in enumerate(self.doctors):
+            prefs = preferences_data.get(doctor, {})
+            pos = 0
+            neg = 0
+            for day in prefs.get('pozitif', []):
+                if 1 <= day <= days:
+                    positive_mask[i, day - 1] = True
+                    pos |= 1 << day
+            for day in prefs.get('negatif', []):
+                if 1 <= day <= days:
+                    negative_mask[i, day - 1] = True
+                    neg |= 1 << day
+            positive_bits.append(pos)
+            negative_bits.append(neg)
+        
+        # Pozitif tercih negatiften önce gelir (aynı gün ikisinde de varsa)
+        score_matrix = np.full((len(self.doctors), days), float(weights['neutral']))
+        score_matrix[negative_mask] = weights['negatif']
+        score_matrix[positive_mask] = weights['pozitif']
+        
+        # Geçmişe dayalı doktor başına düzeltmeler: tatil günlerine ve tercih edilen günlere ek puan
+        if weekend_adjustment is not None:
+            score_matrix[:, np.asarray(weekend_days, dtype=bool)] += np.asarray(weekend_adjustment)[:, np.newaxis]
+        if preference_adjustment is not None:
+            adjustment = np.broadcast_to(np.asarray(preference_adjustment)[:, np.newaxis], score_matrix.shape)
+            score_matrix[positive_mask] += adjustment[positive_mask]
+            score_matrix[negative_mask & ~positive_mask] -= adjustment[negative_mask & ~positive_mask]
+        
+        self.positive_mask = positive_mask
+        self.negative_mask = negative_mask
+        self.score_matrix = score_matrix
+        self.positive_bits = tuple(positive_bits)
+        self.negative_bits = tuple(negative_bits)
+        self.required = np.array(required_per_day, dtype=np.intp)
+        self.required_by_day = (0,) + tuple(int(r) for r in required_per_day)
+        self.score_rows = tuple(tuple(row) for row in score_matrix.tolist())
+        self.weekend = np.array(weekend_days, dtype=bool)
+        self.slot_days = np.repeat(np.arange(days, dtype=np.intp), self.required)
+        
+        for array in (self.positive_mask, self.negative_mask, self.score_matrix,
+                      self.required, self.weekend, self.slot_days):
+            array.setflags(write=False)
+    
+    def is_positive(self, doctor_id: int, day: int) -> bool:
+        """Doktorun bu günü pozitif işaretleyip işaretlemediği"""
+        return (self.positive_bits[doctor_id] >> day) & 1 == 1
+    
+    def is_negative(self, doctor_id: int, day: int) -> bool:
+        """Doktorun bu günü negatif işaretleyip işaretlemediği"""
+        return (self.negative_bits[doctor_id] >> day) & 1 == 1
+    
+    def score(self, doctor_id: int, day: int) -> float:
+        """Doktor-gün ataması için tercih puanı"""
+        return self.score_rows[doctor_id][day - 1]
+
+class Schedule(Mapping):
+    """Doktor x gün uint8 matrisiyle tutulan, gün -> doktor adları sözlüğü gibi okunan çizelge
+    
+    Eşitlik ve hash içeriğe dayanır: sözlük anahtarı olarak kullanılan çizelge değiştirilmemelidir.
+    """
+    
+    __slots__ = ('doctors', 'matrix')
+    
+    def __init__(self, doctors, num_days: int, matrix: Optional[np.ndarray] = None):
+        self.doctors = tuple(doctors)
+        self.matrix = np.zeros((len(self.doctors), num_days), dtype=np.uint8) if matrix is None else matrix
+    
+    @classmethod
+    def from_dict(cls, schedule: Dict, doctors, num_days: int) -> 'Schedule':
+        """Gün -> doktor adları sözlüğünden; başka doktor sırasındaki Schedule adlara göre eşlenir"""
+        result = cls(doctors, num_days)
+        if isinstance(schedule, Schedule):
+            if schedule.doctors == result.doctors and schedule.num_days == num_days:
+                return schedule
+            rows = {doctor: i for i, doctor in enumerate(schedule.doctors)}
+            days = min(num_days, schedule.num_days)
+            for doctor_id, doctor in enumerate(result.doctors):
+                if doctor in rows:
+                    result.matrix[doctor_id, :days] = schedule.matrix[rows[doctor], :days]
+            return result
+        doctor_ids = {doctor: i for i, doctor in enumerate(result.doctors)}
+        for day, names in schedule.items():
+            day = int(day)
+            if 1 <= day <= num_days:
+                for name in names:
+                    doctor_id = doctor_ids.get(name)
+                    if doctor_id is not None:
+                        result.matrix[doctor_id, day - 1] += 1
+        return result
+    
+    @classmethod
+    def from_slots(cls, doctors, num_days: int, doctor_ids, day_indices) -> 'Schedule':
+        """(doktor kimliği, 0 tabanlı gün) çiftlerinden; tekrarlar sayılır"""
+        result = cls(doctors, num_days)
+        np.add.at(result.matrix, (np.asarray(doctor_ids, dtype=np.intp), np.asarray(day_indices, dtype=np.intp)), 1)
+        return result
+    
+    @property
+    def num_days(self) -> int:
+        return self.matrix.shape[1]
+    
+    def to_dict(self) -> Dict[int, List[str]]:
+        """Mevcut JSON biçimi: her gün için doktor adları (kimlik sırasıyla)"""
+        return {day: list(self[day]) for day in range(1, self.num_days + 1)}
+    
+    def doctor_ids_on(self, day: int) -> List[int]:
+        """Günün doktor kimlikleri (çift atama tekrar eder)"""
+        column = self.matrix[:, day - 1]
+        ids = np.flatnonzero(column)
+        return np.repeat(ids, column[ids]).tolist()
+    
+    def days_of(self, doctor_id: int) -> List[int]:
+        """Doktorun nöbet günleri (1 tabanlı, çift atama tekrar eder)"""
+        row = self.matrix[doctor_id]
+        days = np.flatnonzero(row)
+        return np.repeat(days + 1, row[days]).tolist()
+    
+    def is_assigned(self, doctor_id: int, day: int) -> bool:
+        return self.matrix[doctor_id, day - 1] > 0
+    
+    def assign(self, doctor_id: int, day: int) -> None:
+        self.matrix[doctor_id, day - 1] += 1
+    
+    def unassign(self, doctor_id: int, day: int) -> None:
+        if self.matrix[doctor_id, day - 1]:
+            self.matrix[doctor_id, day - 1] -= 1
+    
+    def shift_counts(self) -> np.ndarray:
+        """Doktor başına nöbet sayısı"""
+        return self.matrix.sum(axis=1, dtype=np.intp)
+    
+    def coverage(self) -> np.ndarray:
+        """Gün başına atanan doktor sayısı (0. eleman 1. gün)"""
+        return self.matrix.sum(axis=0, dtype=np.intp)
+    
+    def bitmasks(self) -> List[int]:
+        """Doktor başına gün bit maskesi (bit d = d. gün), yerel arama ve GA operatörleriyle uyumlu"""
+        packed = np.packbits(self.matrix > 0, axis=1, bitorder='little')
+        return [int.from_bytes(row.tobytes(), 'little') << 1 for row in packed]
+    
+    def copy(self) -> 'Schedule':
+        return Schedule(self.doctors, self.num_days, self.matrix.copy())
+    
+    def __getitem__(self, day) -> Tuple[str, ...]:
+        day = int(day)
+        if not 1 <= day <= self.num_days:
+            raise KeyError(day)
+        return tuple(self.doctors[doctor_id] for doctor_id in self.doctor_ids_on(day))
+    
+    def __iter__(self):
+        return iter(range(1, self.num_days + 1))
+    
+    def __len__(self) -> int:
+        return self.num_days
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return self.doctors == other.doctors and np.array_equal(self.matrix, other.matrix)
+    
+    def __hash__(self) -> int:
+        return hash((self.doctors, self.matrix.shape, self.matrix.tobytes()))
+    
+    def __repr__(self) -> str:
+        return f"Schedule({len(self.doctors)} doktor, {self.num_days} gün, {int(self.matrix.sum())} atama)"
+
+# Sabit tarihli resmi tatiller: (ay, gün) -> ad
+PUBLIC_HOLIDAYS = {
+    (1, 1): "Yılbaşı",
+    (4, 23): "Ulusal Egemenlik ve Çocuk Bayramı",
+    (5, 1): "Emek ve Dayanışma Günü",
+    (5, 19): "Atatürk'ü Anma, Gençlik ve Spor Bayramı",
+    (7, 15): "Demokrasi ve Milli Birlik Günü",
+    (8, 30): "Zafer Bayramı",
+    (10, 29): "Cumhuriyet Bayramı",
+}
+
+# Hicri takvime bağlı bayramlar: yıl -> (ilk gün, gün sayısı, ad); arife yarım günleri dahil değildir
+RELIGIOUS_HOLIDAYS = {
+    2024: (('2024-04-10', 3, "Ramazan Bayramı"), ('2024-06-16', 4, "Kurban Bayramı")),
+    2025: (('2025-03-30', 3, "Ramazan Bayramı"), ('2025-06-06', 4, "Kurban Bayramı")),
+    2026: (('2026-03-20', 3, "Ramazan Bayramı"), ('2026-05-27', 4, "Kurban Bayramı")),
+    2027: (('2027-03-09', 3, "Ramazan Bayramı"), ('2027-05-16', 4, "Kurban Bayramı")),
+}
+
+def public_holidays(year: int) -> Dict[date, str]:
+    """Yılın resmi tatil günleri (tarih -> ad)"""
+    holidays = {date(year, month, day): name for (month, day), name in PUBLIC_HOLIDAYS.items()}
+    for first_day, length, name in RELIGIOUS_HOLIDAYS.get(year, ()):
+        start = date.fromisoformat(first_day)
+        for offset in range(length):
+            holidays[start + timedelta(days=offset)] = name
+    return holidays
+
+class ScheduleCalendar:
+    """Çizelge ufkunun takvimi: tarihler, hafta sonları ve resmi tatiller
+    
+    Günler ufkun ilk gününden 1 tabanlı numaralanır ve ay sınırında sıfırlanmaz.
+    """
+    
+    def __init__(self, year: int, month: int, months: int = 1, holidays=None,
+                 num_days: Optional[int] = None, include_public_holidays: bool = True):
+        if not 1 <= month <= 12:
+            raise ValueError(f"Geçersiz ay: {month}")
+        if months < 1:
+            raise ValueError(f"Ufuk en az bir ay olmalı: {months}")
+        
+        self.start = date(year, month, 1)
+        if num_days is None:
+            end_year, end_month = divmod(month - 1 + months, 12)
+            num_days = (date(year + end_year, end_month + 1, 1) - self.start).days
+        if num_days < 1:
+            raise ValueError(f"Ufuk en az bir gün olmalı: {num_days}")
+        
+        self.num_days = num_days
+        self.dates = tuple(self.start + timedelta(days=offset) for offset in range(num_days))
+        self.end = self.dates[-1]
+        
+        # Hafta günleri: 0=Pazartesi, ..., 6=Pazar
+        self.weekday = np.array([day.weekday() for day in self.dates], dtype=np.int8)
+        self.weekend = self.weekday >= 5
+        
+        holiday_names = {}
+        # Dini bayram tablosunda olmayan yıllar; bu yılların bayramları tatil sayılmaz
+        self.unknown_holiday_years = ()
+        if include_public_holidays:
+            self.unknown_holiday_years = tuple(year_ for year_ in range(self.start.year, self.end.year + 1)
+                                               if year_ not in RELIGIOUS_HOLIDAYS)
+            for year_ in range(self.start.year, self.end.year + 1):
+                for holiday, name in public_holidays(year_).items():
+                    if self.start <= holiday <= self.end:
+                        holiday_names[(holiday - self.start).days + 1] = name
+        if isinstance(holidays, dict):
+            extra = holidays.items()
+        else:
+            extra = ((value, "Tatil") for value in (holidays or ()))
+        for value, name in extra:
+            day = self.day_number(value)
+            if 1 <= day <= num_days:
+                holiday_names[day] = name
+        self.holiday_names = dict(sorted(holiday_names.items()))
+        
+        self.holiday = np.zeros(num_days, dtype=bool)
+        self.holiday[[day - 1 for day in self.holiday_names]] = True
+        
+        # Ufuktaki aylar ve her günün ay indeksi
+        month_keys = []
+        month_of_day = []
+        for day in self.dates:
+            key = f"{day.year:04d}-{day.month:02d}"
+            if not month_keys or month_keys[-1] != key:
+                month_keys.append(key)
+            month_of_day.append(len(month_keys) - 1)
+        self.months = tuple(month_keys)
+        self.month_of_day = np.array(month_of_day, dtype=np.intp)
+        self.month_masks = tuple(
+            sum(1 << (day + 1) for day in np.flatnonzero(self.month_of_day == month).tolist())
+            for month in range(len(self.months))
+        )
+        
+        for array in (self.weekday, self.weekend, self.holiday, self.month_of_day):
+            array.setflags(write=False)
+    
+    @property
+    def num_months(self) -> int:
+        """Ufkun kapsadığı (kısmi dahil) ay sayısı"""
+        return len(self.months)
+    
+    @property
+    def off_days(self) -> np.ndarray:
+        """Hafta sonu veya resmi tatil olan günler (hafta sonu kadrosuyla tutulur)"""
+        return self.weekend | self.holiday
+    
+    def day_number(self, value) -> int:
+        """Gün numarasını veya ISO tarihi ('2025-08-15') ufuk gün numarasına çevirir"""
+        if isinstance(value, str) and '-' in value:
+            return (date.fromisoformat(value) - self.start).days + 1
+        if isinstance(value, date):
+            return (value - self.start).days + 1
+        return int(value)
+    
+    def date_of(self, day: int) -> date:
+        """Gün numarasının takvim tarihi"""
+        return self.dates[day - 1]
+    
+    def day_type(self, day: int) -> str:
+        """'holiday', 'weekend' veya 'weekday'"""
+        if self.holiday[day - 1]:
+            return "holiday"
+        return "weekend" if self.weekend[day - 1] else "weekday"
+    
+    def normalize_preferences(self, preferences_data: Dict) -> Dict:
+        """Tercihlerdeki ISO tarihleri ufuk gün numaralarına çevirir"""
+        normalized = {}
+        for doctor, prefs in preferences_data.items():
+            prefs = dict(prefs or {})
+            for key in ('pozitif', 'negatif'):
+                if key in prefs:
+                    prefs[key] = [self.day_number(value) for value in prefs[key]]
+            normalized[doctor] = prefs
+        return normalized
+    
+    def key(self) -> Dict:
+        """Önbellek anahtarı için kanonik gösterim"""
+        return {
+            'start': self.start.isoformat(),
+            'days': self.num_days,
+            'holidays': sorted(self.holiday_names),
+        }
+    
+    def as_dict(self) -> Dict:
+        """Rapordaki 'calendar' bloğu"""
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'days': self.num_days,
+            'months': list(self.months),
+            'holidays': {str(day): {'date': self.date_of(day).isoformat(), 'name': name}
+                         for day, name in self.holiday_names.items()},
+        }
+
+def peak_memory_kb(who: str = 'self') -> Optional[float]:
+    """Sürecin (veya çocuk süreçlerin, ör. CBC) tepe bellek kullanımı (KB)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    target = resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN
+    usage = resource.getrusage(target).ru_maxrss
+    return usage / 1024 if sys.platform == 'darwin' else float(usage)
+
+class OptimizationMetrics:
+    """Faz süreleri ve sayaçlar için ölçüm kaydı; callback ve profiler isteğe bağlıdır"""
+    
+    def __init__(self, callback: Optional[Callable[[Dict], None]] = None,
+                 profiler: Optional['PhaseProfiler'] = None):
+        self.phases = {}
+        self.counters = {}
+        self.callback = callback
+        self.profiler = profiler
+    
+    def __getstate__(self):
+        # Geri çağırma fonksiyonu ve profilleyici işçi süreçlere taşınmaz
+        state = dict(self.__dict__)
+        state['callback'] = None
+        state['profiler'] = None
+        return state
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Bloğun süresini name fazına ekler"""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter(name)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+            if profiler is not None:
+                profiler.exit(name)
+    
+    def record(self, name: str, seconds: float) -> None:
+        """Ölçülmüş bir süreyi faza ekler"""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback({'type': 'phase', 'name': name, 'seconds': seconds})
+    
+    def count(self, name: str, value: int = 1) -> None:
+        """Sayacı artırır"""
+        self.counters[name] = self.counters.get(name, 0) + value
+    
+    def as_dict(self) -> Dict:
+        """Rapordaki 'metrics' bloğu"""
+        return {
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'counters': dict(self.counters),
+            'peak_memory_kb': peak_memory_kb('self'),
+            'solver_peak_memory_kb': peak_memory_kb('children'),
+        }
+    
+    def to_prometheus(self, prefix: str = 'nobet_optimizer') -> str:
+        """Prometheus metin biçiminde dışa aktarım"""
+        metrics = self.as_dict()
+        lines = [f"# HELP {prefix}_phase_seconds Faz başına geçen süre",
+                 f"# TYPE {prefix}_phase_seconds gauge"]
+        lines += [f'{prefix}_phase_seconds{{phase="{name}"}} {seconds}'
+                  for name, seconds in metrics['phases'].items()]
+        lines += [f"# HELP {prefix}_events_total Optimizasyon sayaçları",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{counter="{name}"}} {value}'
+                  for name, value in metrics['counters'].items()]
+        for key in ('peak_memory_kb', 'solver_peak_memory_kb'):
+            if metrics[key] is not None:
+                name = f"{prefix}_{key.replace('_kb', '_bytes')}"
+                lines += [f"# TYPE {name} gauge", f"{name} {int(metrics[key] * 1024)}"]
+        return "\n".join(lines) + "\n"
+
+class PhaseProfiler:
+    """Faz başına cProfile ve örnekleme (collapsed stack) profilleri
+    
+    İç içe fazlarda yalnızca en içteki faz profillenir; işçi süreçlerde geçen süre bekleme görünür.
+    """
+    
+    def __init__(self, interval: float = 0.005, sampling: bool = True):
+        import cProfile
+        import threading
+        self._new_profile = cProfile.Profile
+        self._threading = threading
+        self.interval = interval
+        self.sampling = sampling
+        self.profiles = {}      # faz -> cProfile.Profile
+        self.stacks = {}        # faz -> {collapsed yığın: örnek sayısı}
+        self.active = []        # etkin faz yığını
+        self._thread = None
+        self._thread_id = None
+        self._stop = None
+    
+    def enter(self, name: str) -> None:
+        """Fazı başlatır; dıştaki fazın profili duraklatılır"""
+        if self.active:
+            self.profiles[self.active[-1]].disable()
+        elif self.sampling:
+            self._start_sampler()
+        self.active.append(name)
+        if name not in self.profiles:
+            self.profiles[name] = self._new_profile()
+        self.profiles[name].enable()
+    
+    def exit(self, name: str) -> None:
+        """Fazı bitirir; dıştaki fazın profili sürdürülür"""
+        self.profiles[name].disable()
+        self.active.pop()
+        if self.active:
+            self.profiles[self.active[-1]].enable()
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+    
+    def _start_sampler(self) -> None:
+        self._thread_id = self._threading.get_ident()
+        self._stop = self._threading.Event()
+        self._thread = self._threading.Thread(target=self._sample, name='phase-profiler', daemon=True)
+        self._thread.start()
+    
+    def _sample(self) -> None:
+        """Ana iş parçacığının yığınını örnekler (kök önce, ';' ile ayrılmış)"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            try:
+                phase = self.active[-1]
+            except IndexError:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            counts = self.stacks.setdefault(phase, {})
+            counts[stack] = counts.get(stack, 0) + 1
+    
+    def write(self, directory: str, top: int = 25) -> List[str]:
+        """Profilleri dizine yazar (<faz>.pstats, profile.collapsed, summary.txt); yazılan dosyaları döndürür"""
+        import io
+        import pstats
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        summary = io.StringIO()
+        for name, profile in self.profiles.items():
+            path = os.path.join(directory, f"{name}.pstats")
+            profile.dump_stats(path)
+            written.append(path)
+            summary.write(f"=== {name} ===\n")
+            pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(top)
+        
+        if self.stacks:
+            path = os.path.join(directory, 'profile.collapsed')
+            with open(path, 'w', encoding='utf-8') as f:
+                for name, counts in self.stacks.items():
+                    for stack, count in sorted(counts.items()):
+                        f.write(f"{name};{stack} {count}\n")
+            written.append(path)
+        
+        path = os.path.join(directory, 'summary.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(summary.getvalue())
+        written.append(path)
+        return written
+
+class ResultCache:
+    """Kanonik problem özetiyle anahtarlanan bellek (LRU) ve disk sonuç önbelleği"""
+    
+    VERSION = 1  # Rapor biçimi veya puanlama değişince artırılır
+    
+    def __init__(self, max_entries: int = 128, directory: Optional[str] = None,
+                 max_disk_bytes: int = 100 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    @classmethod
+    def make_key(cls, problem: Dict) -> str:
+        """Sıralı anahtarlı, boşluksuz JSON üzerinden SHA-256 özeti"""
+        canonical = json.dumps({'version': cls.VERSION, 'problem': problem},
+                               sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Önbellekteki raporu döndürür; yoksa (veya disk kaydı bozuksa) None"""
+        data = self.memory.get(key)
+        report = None
+        if data is not None:
+            self.memory.move_to_end(key)
+            report = json.loads(data)
+        elif self.directory:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    data = f.read()
+                report = json.loads(data)
+                if not isinstance(report, dict):
+                    raise ValueError("Önbellek kaydı bir rapor değil")
+                os.utime(self._path(key))  # Tahliye sırası için erişim zamanı
+                self._remember(key, data)
+            except OSError:
+                report = None
+            except ValueError:
+                # Yarım yazılmış veya bozuk kayıt: ıska sayılır ve silinir
+                report = None
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+        
+        if report is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return report
+    
+    def put(self, key: str, report: Dict) -> None:
+        """Raporu her iki katmana yazar"""
+        data = json.dumps(report, ensure_ascii=False)
+        self._remember(key, data)
+        if self.directory:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+    
+    def _remember(self, key: str, data: str) -> None:
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+    
+    def _evict_disk(self) -> None:
+        """Disk katmanını boyut sınırının altına indirir (en eski erişilen önce)"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+# Süreç başına paylaşılan önbellekler (toplu mod ve servis işçileri için)
+_RESULT_CACHES = {}
+
+def get_result_cache(options: Optional[Dict]) -> Optional[ResultCache]:
+    """Aynı ayarlar için süreç içinde tek bir ResultCache döndürür"""
+    if not options:
+        return None
+    key = (options.get('max_entries', 128), options.get('directory'),
+           options.get('max_disk_bytes', 100 * 1024 * 1024))
+    if key not in _RESULT_CACHES:
+        _RESULT_CACHES[key] = ResultCache(*key)
+    return _RESULT_CACHES[key]
+
+class ScheduleOperators:
+    """Uygunluğu koruyan GA operatörleri (birey: günlere hizalı slot dizisi)"""
+    
+    def __init__(self, optimizer: 'NobetOptimizer', candidates: int = 3):
+        index = optimizer.pref_index
+        self.num_doctors = optimizer.num_doctors
+        self.num_days = optimizer.num_days
+        self.score = index.score_rows
+        self.target = optimizer.doctor_targets.tolist()
+        self.max_shifts = optimizer.max_shifts
+        self.month_max = optimizer.MAX_SHIFTS_PER_DOCTOR
+        self.imbalance_weight = optimizer.IMBALANCE_WEIGHT
+        self.candidates = candidates
+        
+        # slot -> gün (1 tabanlı) ve gün -> (ilk slot, son slot + 1)
+        self.slot_day = (index.slot_days + 1).tolist()
+        starts = np.concatenate([[0], np.cumsum(index.required)]).tolist()
+        self.bounds = [(0, 0)] + list(zip(starts[:-1], starts[1:])) + [(starts[-1], starts[-1])]
+        
+        month_masks = optimizer.calendar.month_masks
+        self.multi_month = len(month_masks) > 1
+        self.day_month = [0] + [month_masks[month] for month in optimizer.calendar.month_of_day.tolist()] + [0]
+    
+    def occupancy(self, individual: List[int]) -> Tuple[List[int], List[int]]:
+        """Doktor başına gün bit maskesi ve nöbet sayısı"""
+        masks = [0] * self.num_doctors
+        counts = [0] * self.num_doctors
+        for slot, doctor_id in enumerate(individual):
+            masks[doctor_id] |= 1 << self.slot_day[slot]
+            counts[doctor_id] += 1
+        return masks, counts
+    
+    def can_place(self, doctor_id: int, day: int, masks: List[int], counts: List[int]) -> bool:
+        """Doktor o güne kural ihlali olmadan eklenebilir mi"""
+        mask = masks[doctor_id]
+        if (mask >> (day - 1)) & 0b111 or counts[doctor_id] >= self.max_shifts:
+            return False
+        return not self.multi_month or (mask & self.day_month[day]).bit_count() < self.month_max
+    
+    def pick(self, day: int, masks: List[int], counts: List[int], avoid=()) -> Optional[int]:
+        """Güne eklenebilecek doktorlardan küçük bir rastgele örneğin en iyisini seçer"""
+        sample = set()
+        for _ in range(4 * self.candidates):
+            doctor_id = random.randrange(self.num_doctors)
+            if doctor_id not in avoid and self.can_place(doctor_id, day, masks, counts):
+                sample.add(doctor_id)
+                if len(sample) == self.candidates:
+                    break
+        if not sample:
+            feasible = [doctor_id for doctor_id in range(self.num_doctors)
+                        if doctor_id not in avoid and self.can_place(doctor_id, day, masks, counts)]
+            if not feasible:
+                return None
+            sample = random.sample(feasible, min(self.candidates, len(feasible)))
+        return max(sample, key=lambda doctor_id: self.score[doctor_id][day - 1]
+                   + self.imbalance_weight * (self.target[doctor_id] - counts[doctor_id]))
+    
+    def repair(self, individual: List[int]) -> List[int]:
+        """Bireyi gün sırasıyla tarayıp ihlal eden atamaları uygun doktorlarla değiştirir (yerinde)"""
+        masks = [0] * self.num_doctors
+        counts = [0] * self.num_doctors
+        for day in range(1, self.num_days + 1):
+            start, end = self.bounds[day]
+            next_start, next_end = self.bounds[day + 1]
+            following = individual[next_start:next_end]
+            for slot in range(start, end):
+                doctor_id = individual[slot]
+                if not self.can_place(doctor_id, day, masks, counts):
+                    replacement = self.pick(day, masks, counts, following)
+                    if replacement is None:
+                        # Uygun doktor yoksa en azından aynı güne çift atama önlenir
+                        free = [c for c in range(self.num_doctors) if not (masks[c] >> day) & 1]
+                        replacement = doctor_id if not (masks[doctor_id] >> day) & 1 or not free else random.choice(free)
+                    doctor_id = individual[slot] = replacement
+                masks[doctor_id] |= 1 << day
+                counts[doctor_id] += 1
+        return individual
+    
+    def crossover(self, ind1: List[int], ind2: List[int]) -> Tuple[List[int], List[int]]:
+        """Gün sınırlarında iki noktalı çaprazlama, ardından onarım"""
+        if self.num_days > 1:
+            first, last = sorted(random.sample(range(1, self.num_days + 2), 2))
+            start, end = self.bounds[first][0], self.bounds[last][0]
+            ind1[start:end], ind2[start:end] = ind2[start:end], ind1[start:end]
+            self.repair(ind1)
+            self.repair(ind2)
+        return ind1, ind2
+    
+    def mutate(self, individual: List[int], indpb: float) -> Tuple[List[int]]:
+        """Slot başına indpb olasılıkla taşıma (başka doktor) veya iki gün arası takas; kurallar korunur"""
+        masks, counts = self.occupancy(individual)
+        size = len(individual)
+        for slot in range(size):
+            if random.random() >= indpb:
+                continue
+            day = self.slot_day[slot]
+            a = individual[slot]
+            masks[a] &= ~(1 << day)
+            counts[a] -= 1
+            
+            if random.random() < 0.5:
+                # Taşıma: günü başka bir uygun doktora ver
+                c = self.pick(day, masks, counts, (a,))
+                if c is not None:
+                    individual[slot] = a = c
+            else:
+                # Takas: başka bir gündeki doktorla yer değiştir
+                other = random.randrange(size)
+                day2 = self.slot_day[other]
+                b = individual[other]
+                if day2 != day and b != a:
+                    masks[b] &= ~(1 << day2)
+                    counts[b] -= 1
+                    swapped = False
+                    if self.can_place(b, day, masks, counts):
+                        masks[b] |= 1 << day
+                        counts[b] += 1
+                        if self.can_place(a, day2, masks, counts):
+                            # b günü aldı; a aşağıda day2'ye yazılır
+                            individual[slot], individual[other] = b, a
+                            day = day2
+                            swapped = True
+                        else:
+                            masks[b] &= ~(1 << day)
+                            counts[b] -= 1
+                    if not swapped:
+                        masks[b] |= 1 << day2
+                        counts[b] += 1
+            
+            masks[a] |= 1 << day
+            counts[a] += 1
+        return individual,
 
 class NobetOptimizer:
     """Akıllı Nöbet Çizelge Optimizatörü"""
     
-    def __init__(self, preferences_data: Dict, month: int = 7, year: int = 2025):
-        self.preferences = preferences_data
-        self.month = month
-        self.year = year
-        self.days_in_month = 31  # Temmuz 2025
+    # rules parametresiyle değiştirilebilen çizelge kuralları
+    RULE_NAMES = ('MAX_SHIFTS_PER_DOCTOR', 'TARGET_SHIFTS_PER_DOCTOR',
+                  'WEEKDAY_DOCTORS_NEEDED', 'WEEKEND_DOCTORS_NEEDED')
+    
+    # Amaç fonksiyonu ağırlıkları (önbellek anahtarına girer)
+    WEIGHT_NAMES = ('PREFERENCE_WEIGHTS', 'IMBALANCE_WEIGHT', 'CONSECUTIVE_WEIGHT', 'STABILITY_WEIGHT',
+                    'COVERAGE_WEIGHT', 'HISTORY_WEEKEND_WEIGHT', 'HISTORY_NEGATIVE_WEIGHT', 'HISTORY_DEBT_LIMIT')
+    
+    def __init__(self, preferences_data: Dict, month: int = 7, year: int = 2025,
+                 months: int = 1, holidays=None,
+                 calendar: Optional[ScheduleCalendar] = None,
+                 ga_options: Optional[Dict] = None,
+                 local_search_options: Optional[Dict] = None,
+                 solver_options: Optional[Dict] = None,
+                 decomposition_options: Optional[Dict] = None,
+                 rules: Optional[Dict] = None,
+                 cache: Optional[ResultCache] = None,
+                 metrics_callback: Optional[Callable[[Dict], None]] = None,
+                 portfolio_options: Optional[Dict] = None,
+                 progress_callback: Optional[Callable[[Dict], None]] = None,
+                 history: Optional[Dict] = None,
+                 profiler: Optional[PhaseProfiler] = None):
+        self.metrics = OptimizationMetrics(metrics_callback, profiler)
+        self.progress_callback = progress_callback
+        self.calendar = calendar or ScheduleCalendar(year, month, months, holidays)
+        self.month = self.calendar.start.month
+        self.year = self.calendar.start.year
+        self.num_days = self.calendar.num_days
+        self.preferences = self.calendar.normalize_preferences(preferences_data)
         self.doctors = list(preferences_data.keys())
         self.num_doctors = len(self.doctors)
         
@@ -68,127 +941,484 @@ class NobetOptimizer:
         self.WEEKDAY_DOCTORS_NEEDED = 2
         self.WEEKEND_DOCTORS_NEEDED = 3
         
+        for rule, value in (rules or {}).items():
+            if rule not in self.RULE_NAMES:
+                raise ValueError(f"Bilinmeyen çizelge kuralı: {rule}")
+            setattr(self, rule, int(value))
+        
+        # Puanlama ağırlıkları (tüm motorlar için tek kaynak)
+        self.PREFERENCE_WEIGHTS = {'pozitif': 10, 'neutral': 1, 'negatif': -20}
+        self.IMBALANCE_WEIGHT = 5       # Hedeften sapan her nöbet için
+        self.CONSECUTIVE_WEIGHT = 15    # Her ardışık nöbet çifti için
+        self.STABILITY_WEIGHT = 3       # Artımlı çözümde korunan her eski atama için
+        self.COVERAGE_WEIGHT = 100      # Eksik/fazla her kadro slotu için (motorları karşılaştırırken)
+        self.HISTORY_WEEKEND_WEIGHT = 2     # Geçmişte payından fazla tutulan her tatil nöbeti için, tatil günü başına
+        self.HISTORY_NEGATIVE_WEIGHT = 2    # Geçmişte payından fazla yaşanan her negatif ihlali için, tercihli gün başına
+        self.HISTORY_DEBT_LIMIT = 5         # Puan düzeltmesine katılan en büyük geçmiş farkı
+        
+        # Aylar arası adalet: doktor başına birikmiş nöbet geçmişi
+        self.history = self.normalize_history(history)
+        
+        # Paylaşılan tercih indeksi
+        with self.metrics.phase('preprocess'):
+            self.pref_index = self.build_preference_index()
+        
+        # Genetic Algorithm ayarları (islands > 1 ise ada modeli kullanılır)
+        self.ga_options = {
+            'population_size': 50,
+            'generations': 100,
+            'islands': 1,
+            'workers': None,       # None: CPU sayısı
+            'migration_interval': 20,
+            'migrants': 2,
+            'seed': None,
+            'time_limit': None,    # saniye (None: yalnızca nesil sayısı)
+        }
+        self.ga_options.update(ga_options or {})
+        
+        # Yerel arama ayarları ('first' veya 'best' iyileştirme stratejisi)
+        self.local_search_options = {
+            'strategy': 'first',
+            'max_iterations': 10000,
+            'time_limit': 5.0,      # saniye (None: sınırsız)
+        }
+        self.local_search_options.update(local_search_options or {})
+        
+        # LP çözücü ayarları (None: sınırsız / çözücü varsayılanı)
+        self.solver_options = {
+            'backend': 'cbc',       # cbc, highs, glpk, gurobi, cplex, scip veya PuLP çözücü adı
+            'time_limit': None,     # saniye
+            'gap': None,            # göreli MIP gap (ör. 0.01)
+            'threads': None,
+            'msg': False,
+        }
+        self.solver_options.update(solver_options or {})
+        
+        # Zaman ayrıştırması: ufuk örtüşen hafta pencerelerine bölünüp paralel çözülür
+        self.decomposition_options = {
+            'mode': 'auto',         # auto (ufuk auto_days'ten uzunsa), on veya off
+            'auto_days': 120,
+            'window_days': 28,      # çekirdek pencere uzunluğu (tam haftalara yuvarlanır)
+            'overlap_days': 7,      # pencerenin iki yanına eklenen bağlam günleri
+            'workers': None,        # None: CPU sayısı
+        }
+        self.decomposition_options.update(decomposition_options or {})
+        
+        # Portföy: greedy taban çözümünden sonra LP ve GA + yerel arama eşzamanlı yarışır
+        self.portfolio_options = {
+            'enabled': False,
+            'deadline': 30.0,       # saniye
+            'workers': None,        # None: her kol ayrı süreçte; 1: sırayla aynı süreçte
+            'chunk_generations': 10,  # GA ara sonuç bildirme / durma kontrol aralığı
+        }
+        self.portfolio_options.update(portfolio_options or {})
+        
         # Optimizasyon sonuçları
         self.schedule = {}
+        self.lp_stats = {}
+        self.feasibility = {}
+        self.shift_floors = None    # check_feasibility'nin gevşettiği doktor başına LP alt sınırları
+        self.cache = cache
+        self.cache_hit = False
+        self._cache_key = None
+        self._cached_report = None
+        self.algorithm_used = None
         self.optimization_log = []
         self.quality_score = 0.0
+        self.deadline = None        # iş bitiş anı (time()); motor süre sınırları buna kısılır
         
+        if self.calendar.unknown_holiday_years:
+            years = ', '.join(str(year) for year in self.calendar.unknown_holiday_years)
+            self.optimization_log.append(
+                f"⚠️  {years} için dini bayram tarihleri bilinmiyor; bayram günleri tatil sayılmadı "
+                f"(holidays ile ekleyin)"
+            )
+    
+    def __getstate__(self):
+        # Geri çağırma fonksiyonları işçi süreçlere taşınmaz
+        state = dict(self.__dict__)
+        state['progress_callback'] = None
+        return state
+    
+    @property
+    def days_in_month(self) -> int:
+        """Eski ad: ufuktaki gün sayısı (num_days)"""
+        return self.num_days
+    
+    @property
+    def max_shifts(self) -> int:
+        """Ufuk boyunca doktor başına en fazla nöbet (her ay ayrıca MAX_SHIFTS_PER_DOCTOR ile sınırlı)"""
+        return self.MAX_SHIFTS_PER_DOCTOR * self.calendar.num_months
+    
+    @property
+    def min_shifts(self) -> int:
+        """Ufuk boyunca doktor başına en az nöbet (LP alt sınırı)"""
+        return max(1, (self.TARGET_SHIFTS_PER_DOCTOR - 2) * self.calendar.num_months)
+    
+    @property
+    def target_shifts(self) -> int:
+        """Ufuk boyunca doktor başına hedef nöbet sayısı"""
+        return self.TARGET_SHIFTS_PER_DOCTOR * self.calendar.num_months
+    
+    def time_left(self, limit: Optional[float]) -> Optional[float]:
+        """Motor süre sınırını iş bitiş anına (self.deadline) kalan süreyle kısar"""
+        if self.deadline is None:
+            return limit
+        remaining = max(0.0, self.deadline - time())
+        return remaining if limit is None else min(limit, remaining)
+    
+    def local_search_limit(self, remaining: float) -> float:
+        """Yerel arama süre sınırını kalan süreyle kısar (None: sınırsız)"""
+        limit = self.local_search_options['time_limit']
+        return remaining if limit is None else min(limit, remaining)
+    
     def get_weekday_type(self, day: int) -> str:
-        """Günün hafta içi/hafta sonu durumunu döndürür"""
-        # Temmuz 2025: 1. gün Salı
-        # 0=Pazartesi, 1=Salı, ..., 6=Pazar
-        weekday = (day) % 7  # 1 Temmuz = Salı (1)
-        return "weekend" if weekday in [5, 6] else "weekday"  # Cumartesi=5, Pazar=6
-    
-    def calculate_doctor_features(self, doctor: str) -> Dict:
-        """Doktor özelliklerini ML için hesaplar"""
-        prefs = self.preferences.get(doctor, {})
-        
-        features = {
-            'positive_count': len(prefs.get('pozitif', [])),
-            'negative_count': len(prefs.get('negatif', [])),
-            'flexibility_score': (31 - len(prefs.get('negatif', []))) / 31,
-            'weekend_preference': sum(1 for day in prefs.get('pozitif', []) 
-                                    if self.get_weekday_type(day) == "weekend"),
-            'weekday_preference': sum(1 for day in prefs.get('pozitif', []) 
-                                    if self.get_weekday_type(day) == "weekday"),
-            'has_special_notes': 1 if prefs.get('ozelSebepler', '').strip() else 0,
-            'preference_ratio': len(prefs.get('pozitif', [])) / max(1, len(prefs.get('negatif', [])))
+        """Günün hafta içi/hafta sonu/resmi tatil durumunu döndürür"""
+        return self.calendar.day_type(day)
+    
+    def build_preference_index(self) -> PreferenceIndex:
+        """Tercih indeksini ve günlük gerekli doktor sayılarını hazırlar"""
+        off_days = self.calendar.off_days
+        required_per_day = np.where(off_days, self.WEEKEND_DOCTORS_NEEDED, self.WEEKDAY_DOCTORS_NEEDED)
+        self.doctor_targets, weekend_adjustment, preference_adjustment = self.history_adjustments()
+        
+        return PreferenceIndex(self.preferences, self.doctors, self.num_days,
+                               required_per_day, off_days, self.PREFERENCE_WEIGHTS,
+                               weekend_adjustment, preference_adjustment)
+    
+    @staticmethod
+    def normalize_history(history: Optional[Dict]) -> Dict:
+        """Geçmişi (veya önceki raporun 'history' alanını) doktor başına sayılara getirir"""
+        history = history or {}
+        if isinstance(history.get('history'), dict):
+            history = history['history']
+        return {doctor: {key: int((row or {}).get(key, 0)) for key in HISTORY_FIELDS}
+                for doctor, row in history.items()}
+    
+    def history_adjustments(self) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+        """Geçmişten (hedef nöbet, tatil günü düzeltmesi, tercih düzeltmesi) hesaplar
+        
+        Doktorun geçmişi kadronun ay başına ortalamasından beklenen değerle karşılaştırılır;
+        geçmiş yoksa düzeltmeler None'dır.
+        """
+        targets = np.full(self.num_doctors, float(self.target_shifts))
+        rows = [self.history.get(doctor) for doctor in self.doctors]
+        known = np.array([row is not None for row in rows], dtype=bool)
+        if not known.any():
+            return targets, None, None
+        
+        months = np.array([max(1, row['months']) if row else 0 for row in rows], dtype=float)
+        
+        def debt(key):
+            values = np.array([row[key] if row else 0 for row in rows], dtype=float)
+            rate = values[known].sum() / months[known].sum()
+            return np.where(known, values - rate * months, 0.0)
+        
+        limit = self.HISTORY_DEBT_LIMIT
+        targets = np.clip(targets - debt('shifts'), self.min_shifts, self.max_shifts)
+        weekend_adjustment = -self.HISTORY_WEEKEND_WEIGHT * np.clip(debt('weekend_shifts'), -limit, limit)
+        preference_adjustment = self.HISTORY_NEGATIVE_WEIGHT * np.clip(debt('negatif_violations'), 0, limit)
+        return targets, weekend_adjustment, preference_adjustment
+    
+    def updated_history(self, schedule) -> Dict:
+        """Geçmişe bu çizelgenin sayılarını ekler; kadrodan ayrılanlarınki korunur"""
+        index = self.pref_index
+        matrix = self.as_schedule(schedule).matrix
+        totals = {
+            'shifts': matrix.sum(axis=1).tolist(),
+            'weekend_shifts': matrix[:, index.weekend].sum(axis=1).tolist(),
+            'negatif_violations': (matrix * index.negative_mask).sum(axis=1).tolist(),
+            'months': [self.calendar.num_months] * len(index.doctors),
         }
+        history = {doctor: dict(row) for doctor, row in self.history.items()}
+        for doctor_id, doctor in enumerate(index.doctors):
+            row = history.setdefault(doctor, dict.fromkeys(HISTORY_FIELDS, 0))
+            for key in HISTORY_FIELDS:
+                row[key] += int(totals[key][doctor_id])
+        return history
+    
+    def month_full(self, month_counts: Dict, doctor: str, day: int) -> bool:
+        """Doktor günün ayında MAX_SHIFTS_PER_DOCTOR'a ulaştı mı"""
+        month = int(self.calendar.month_of_day[day - 1])
+        return month_counts.get((doctor, month), 0) >= self.MAX_SHIFTS_PER_DOCTOR
+    
+    def count_month_shift(self, month_counts: Dict, doctor: str, day: int) -> None:
+        """Aylık nöbet sayacını artırır"""
+        key = (doctor, int(self.calendar.month_of_day[day - 1]))
+        month_counts[key] = month_counts.get(key, 0) + 1
+    
+    def as_schedule(self, schedule) -> Schedule:
+        """Sözlük biçimindeki çizelgeyi Schedule'a çevirir (aynı doktor sırasındaki Schedule aynen döner)"""
+        return Schedule.from_dict(schedule, self.pref_index.doctors, self.num_days)
+    
+    def get_required_doctors(self, day: int) -> int:
+        """Gün için gerekli doktor sayısı"""
+        return self.pref_index.required_by_day[day]
+    
+    def max_independent_shifts(self, available: np.ndarray, restart: Optional[np.ndarray] = None) -> np.ndarray:
+        """Ardışık nöbet yasağıyla seçilebilir günlerin doktor x gün maskesi
+        
+        Her kesintisiz müsait dizi ceil(uzunluk / 2) gün verir; restart günlerinde dizi yeniden başlar.
+        """
+        available = available.astype(np.int64)
+        position = np.cumsum(available, axis=1)
+        breaks = available == 0
+        if restart is not None:
+            breaks = breaks | restart
+        # Dizi başlangıcındaki kümülatif değer; dizideki gün sırası = position - start
+        start = np.maximum.accumulate(np.where(breaks, position - available, 0), axis=1)
+        return (available == 1) & ((position - start) % 2 == 1)
+    
+    def check_feasibility(self) -> Dict:
+        """Çözümden önce kısıtların sağlanabilirliğini sayma sınırlarıyla sınar
+        
+        Kontroller kesin sonuç vermez: sorun bulunmaması çözüm garantisi değildir.
+        """
+        check_start = perf_counter()
+        index = self.pref_index
+        calendar = self.calendar
+        required = index.required.astype(np.int64)
+        dates = [calendar.date_of(day).isoformat() for day in range(1, self.num_days + 1)]
+        month_starts = np.r_[True, np.diff(calendar.month_of_day) != 0]
+        month_first = np.flatnonzero(month_starts)
+        issues = []
+        
+        def add(rule, cause, message, days=(), doctors=()):
+            issues.append({'rule': rule, 'cause': cause, 'message': message,
+                           'days': [int(day) for day in days], 'doctors': list(doctors)})
+        
+        def blocking(doctor_mask):
+            """Sorundan sorumlu (negatif günleri olan) doktor adları"""
+            return [index.doctors[doctor_id] for doctor_id in np.flatnonzero(doctor_mask)]
         
-        return features
+        def capacity(available):
+            """Doktor başına ardışık nöbet ve aylık/ufuk sınırlarıyla en fazla nöbet"""
+            free_days = self.max_independent_shifts(available, month_starts)
+            per_month = np.minimum(np.add.reduceat(free_days, month_first, axis=1),
+                                   self.MAX_SHIFTS_PER_DOCTOR)
+            horizon = self.max_independent_shifts(available).sum(axis=1)
+            return per_month, np.minimum(np.minimum(per_month.sum(axis=1), horizon), self.max_shifts)
+        
+        def check(available, cause):
+            """Verilen müsaitlik maskesiyle coverage, consecutive ve capacity kontrolleri"""
+            found = len(issues)
+            negative = index.negative_mask if cause == 'negatif' else np.zeros_like(available)
+            
+            counts = available.sum(axis=0)
+            for day in np.flatnonzero(counts < required):
+                add('coverage', cause,
+                    f"{day + 1}. gün ({dates[day]}): {required[day]} doktor gerekli, {counts[day]} müsait",
+                    [day + 1], blocking(negative[:, day]))
+            
+            # Bir doktor ardışık iki günden yalnızca birini tutabilir
+            pair_counts = (available[:, :-1] | available[:, 1:]).sum(axis=0)
+            pair_required = required[:-1] + required[1:]
+            single_ok = (counts[:-1] >= required[:-1]) & (counts[1:] >= required[1:])
+            for day in np.flatnonzero((pair_counts < pair_required) & single_ok):
+                add('consecutive', cause,
+                    f"{day + 1}-{day + 2}. günler: ardışık nöbet yasağıyla {pair_required[day]} nöbet "
+                    f"için yalnızca {pair_counts[day]} doktor müsait",
+                    [day + 1, day + 2], blocking(negative[:, day] | negative[:, day + 1]))
+            
+            per_month, per_doctor = capacity(available)
+            if len(issues) == found:
+                demand = np.add.reduceat(required, month_first)
+                supply = per_month.sum(axis=0)
+                for month in np.flatnonzero(demand > supply):
+                    in_month = calendar.month_of_day == month
+                    add('capacity', cause,
+                        f"{calendar.months[month]} ayı: {demand[month]} nöbet gerekli, "
+                        f"kapasite {supply[month]}", np.flatnonzero(in_month) + 1,
+                        blocking(negative[:, in_month].any(axis=1)))
+                if len(issues) == found and required.sum() > per_doctor.sum():
+                    add('capacity', cause,
+                        f"Ufuk: {required.sum()} nöbet gerekli, kapasite {per_doctor.sum()}",
+                        doctors=blocking(negative.any(axis=1)))
+            return per_doctor
+        
+        check(np.ones((self.num_doctors, self.num_days), dtype=bool), 'rules')
+        if not issues:
+            per_doctor = check(~index.negative_mask, 'negatif')
+        rules_feasible = not any(issue['cause'] == 'rules' for issue in issues)
+        lp_feasible = not issues
+        
+        # LP alt sınırı: doktorun kapasitesini ve kadronun adil payını aşamaz
+        self.shift_floors = None
+        if lp_feasible:
+            floors = np.minimum(self.min_shifts, per_doctor)
+            unreachable = np.flatnonzero(floors < self.min_shifts)
+            if len(unreachable):
+                add('min_shifts', 'negatif',
+                    f"{len(unreachable)} doktor negatif günleri nedeniyle en az {self.min_shifts} nöbete ulaşamaz",
+                    doctors=[index.doctors[doctor_id] for doctor_id in unreachable])
+            total = int(required.sum())
+            if floors.sum() > total:
+                add('min_shifts', 'rules',
+                    f"{self.num_doctors} doktor x en az {self.min_shifts} nöbet, {total} nöbetlik kadroyu aşıyor")
+                floors = np.minimum(floors, total // max(1, self.num_doctors))
+            if len(issues):
+                self.shift_floors = floors
+        
+        check_time = perf_counter() - check_start
+        self.metrics.record('feasibility', check_time)
+        self.feasibility = {
+            'feasible': not issues,
+            'lp_feasible': lp_feasible,
+            'rules_feasible': rules_feasible,
+            'issues': issues,
+            'check_time': check_time,
+        }
+        return self.feasibility
     
-    def linear_programming_optimize(self) -> Optional[Dict]:
+    def log_feasibility(self, limit: int = 10) -> None:
+        """Ön kontrol sonucunu optimizasyon günlüğüne yazar (en fazla limit sorun)"""
+        feasibility = self.feasibility
+        issues = feasibility['issues']
+        if not issues:
+            self.optimization_log.append(f"✅ Ön kontrol: sorun yok ({feasibility['check_time'] * 1000:.1f} ms)")
+            return
+        self.optimization_log.append(f"🔎 Ön kontrol: {len(issues)} sorun ({feasibility['check_time'] * 1000:.1f} ms)")
+        for issue in issues[:limit]:
+            names = issue['doctors']
+            suffix = f" [{', '.join(names[:5])}{', ...' if len(names) > 5 else ''}]" if names else ""
+            self.optimization_log.append(f"⚠️  {issue['message']}{suffix}")
+        if len(issues) > limit:
+            self.optimization_log.append(f"⚠️  ... {len(issues) - limit} sorun daha")
+        if not feasibility['rules_feasible']:
+            self.optimization_log.append("⏭️  Kurallar sağlanamıyor: LP ve GA atlanıyor, greedy ile kısmi çizelge kurulacak")
+        elif not feasibility['lp_feasible']:
+            self.optimization_log.append("⏭️  Negatif günlerle LP kesin çözümsüz: LP atlanıyor")
+        elif self.shift_floors is not None:
+            low, high = int(self.shift_floors.min()), int(self.shift_floors.max())
+            floor = f"{low}" if low == high else f"{low}-{high}"
+            self.optimization_log.append(f"🔧 LP alt sınırı gevşetildi: doktor başına en az {floor} nöbet")
+    
+    def linear_programming_optimize(self, previous_schedule: Optional[Dict] = None,
+                                    days: Optional[Tuple[int, int]] = None,
+                                    shift_bounds: Optional[Tuple[int, int]] = None) -> Optional[Dict]:
         """Linear Programming ile optimal çizelge oluşturur"""
+        with self.metrics.phase('lp'):
+            return self._linear_programming_optimize(previous_schedule, days, shift_bounds)
+    
+    def _linear_programming_optimize(self, previous_schedule: Optional[Dict],
+                                     days: Optional[Tuple[int, int]],
+                                     shift_bounds: Optional[Tuple[int, int]]) -> Optional[Dict]:
         if not LP_AVAILABLE:
-            self.optimization_log.append("❌ Linear Programming kullanılamıyor")
+            self.optimization_log.append("❌ Linear Programming kullanılamıyor (pip install pulp)")
             return None
             
         try:
             self.optimization_log.append("🔧 Linear Programming başlatılıyor...")
+            pulp = import_engine('pulp')
+            
+            build_start = perf_counter()
+            index = self.pref_index
             
             # Problem tanımı
-            prob = LpProblem("Nobet_Cizelgesi", LpMaximize)
+            prob = pulp.LpProblem("Nobet_Cizelgesi", pulp.LpMaximize)
             
-            # Karar değişkenleri: x[doctor][day] = 1 if assigned, 0 otherwise
-            x = {}
-            for doctor in self.doctors:
-                x[doctor] = {}
-                for day in range(1, self.days_in_month + 1):
-                    x[doctor][day] = LpVariable(f"x_{doctor}_{day}", cat='Binary')
+            # Karar değişkenleri: x[(doctor_id, day)] = 1 if assigned, 0 otherwise
+            # Negatif günler kısıtla 0'a sabitlendiği için bu değişkenler hiç oluşturulmaz
+            first_day, last_day = days or (1, self.num_days)
+            doctor_ids, day_indices = np.nonzero(~index.negative_mask[:, first_day - 1:last_day])
+            day_indices += first_day - 1
+            keys = [(int(doctor_id), int(day_index) + 1) for doctor_id, day_index in zip(doctor_ids, day_indices)]
+            x = pulp.LpVariable.dicts("x", keys, cat='Binary')
+            # Geçmişe göre hedefi düşen/yükselen doktorun her nöbeti dengesizlik ağırlığıyla düzeltilir
+            doctor_weights = self.IMBALANCE_WEIGHT * (self.doctor_targets - self.target_shifts)
+            coefficients = (index.score_matrix[doctor_ids, day_indices] + doctor_weights[doctor_ids]).tolist()
+            
+            day_vars = {day: [] for day in range(first_day, last_day + 1)}
+            doctor_vars = {doctor_id: [] for doctor_id in range(self.num_doctors)}
+            month_vars = {}
+            month_of_day = self.calendar.month_of_day
+            for key in keys:
+                day_vars[key[1]].append(x[key])
+                doctor_vars[key[0]].append(x[key])
+                month_vars.setdefault((key[0], int(month_of_day[key[1] - 1])), []).append(x[key])
             
             # Objektif fonksiyon: Pozitif tercihleri maksimize et
-            objective = 0
-            for doctor in self.doctors:
-                prefs = self.preferences.get(doctor, {})
-                positive_days = prefs.get('pozitif', [])
-                negative_days = prefs.get('negatif', [])
-                
-                for day in range(1, self.days_in_month + 1):
-                    if day in positive_days:
-                        objective += 10 * x[doctor][day]  # Pozitif tercih bonusu
-                    elif day in negative_days:
-                        objective -= 5 * x[doctor][day]   # Negatif tercih penaltı
-                    else:
-                        objective += 1 * x[doctor][day]   # Nötr gün
+            objective = dict(zip(keys, coefficients))
             
-            prob += objective
+            # Artımlı çözüm: önceki atamayı koruma bonusu ve başlangıç çözümü
+            if previous_schedule:
+                previous = self.normalize_schedule(previous_schedule)
+                for key in keys:
+                    x[key].setInitialValue(0)
+                for day, doctors in previous.items():
+                    for doctor in doctors:
+                        key = (index.doctor_ids.get(doctor), day)
+                        if key in x:
+                            x[key].setInitialValue(1)
+                            objective[key] += self.STABILITY_WEIGHT
+            
+            prob += pulp.LpAffineExpression([(x[key], coef) for key, coef in objective.items()])
             
             # Kısıtlamalar
             
             # 1. Her gün gerekli doktor sayısı
-            for day in range(1, self.days_in_month + 1):
-                day_type = self.get_weekday_type(day)
-                required = self.WEEKEND_DOCTORS_NEEDED if day_type == "weekend" else self.WEEKDAY_DOCTORS_NEEDED
-                
-                prob += lpSum([x[doctor][day] for doctor in self.doctors]) == required
+            for day, variables in day_vars.items():
+                prob += pulp.lpSum(variables) == self.get_required_doctors(day)
             
-            # 2. Her doktor için maksimum nöbet sayısı
-            for doctor in self.doctors:
-                prob += lpSum([x[doctor][day] for day in range(1, self.days_in_month + 1)]) <= self.MAX_SHIFTS_PER_DOCTOR
-                prob += lpSum([x[doctor][day] for day in range(1, self.days_in_month + 1)]) >= max(1, self.TARGET_SHIFTS_PER_DOCTOR - 2)
+            # 2. Her doktor için maksimum nöbet sayısı (çok aylık ufukta her ay ayrıca)
+            min_shifts, max_shifts = shift_bounds or (
+                self.min_shifts if self.shift_floors is None else self.shift_floors, self.max_shifts)
+            floors = np.broadcast_to(min_shifts, self.num_doctors).tolist()
+            for doctor_id, variables in doctor_vars.items():
+                shifts = pulp.lpSum(variables)
+                prob += shifts <= max_shifts
+                if floors[doctor_id] > 0:
+                    prob += shifts >= floors[doctor_id]
+            if self.calendar.num_months > 1:
+                for variables in month_vars.values():
+                    if len(variables) > self.MAX_SHIFTS_PER_DOCTOR:
+                        prob += pulp.lpSum(variables) <= self.MAX_SHIFTS_PER_DOCTOR
             
             # 3. Ardışık nöbet yasağı (minimum 1 gün ara)
-            for doctor in self.doctors:
-                for day in range(1, self.days_in_month):
-                    prob += x[doctor][day] + x[doctor][day + 1] <= 1
-            
-            # 4. Negatif tercihleri mümkün oldukça kaçın
-            for doctor in self.doctors:
-                prefs = self.preferences.get(doctor, {})
-                negative_days = prefs.get('negatif', [])
-                for day in negative_days:
-                    if 1 <= day <= self.days_in_month:
-                        # Soft constraint: Negatif günlerde nöbet vermemeye çalış
-                        prob += x[doctor][day] <= 0.1
+            for doctor_id, day in keys:
+                following = x.get((doctor_id, day + 1))
+                if following is not None:
+                    prob += pulp.LpAffineExpression([(x[doctor_id, day], 1), (following, 1)]) <= 1
+            
+            build_time = perf_counter() - build_start
+            self.metrics.record('lp_build', build_time)
+            fixed = self.num_doctors * len(day_vars) - len(keys)
             
             # Çözümle
             self.optimization_log.append("⚡ LP çözümü hesaplanıyor...")
-            prob.solve(PULP_CBC_CMD(msg=0))
+            solve_start = perf_counter()
+            prob.solve(self.create_lp_solver(warm_start=bool(previous_schedule)))
+            solve_time = perf_counter() - solve_start
+            self.metrics.record('lp_solve', solve_time)
             
-            if prob.status == 1:  # Optimal
-                schedule = {}
-                total_satisfaction = 0
+            self.lp_stats = {
+                'build_time': build_time,
+                'solve_time': solve_time,
+                'variables': len(keys),
+                'fixed_variables': fixed,
+                'constraints': len(prob.constraints),
+                'status': pulp.LpStatus.get(prob.status, str(prob.status)),
+                'solution_status': prob.sol_status,
+            }
+            self.optimization_log.append(
+                f"⏱️  LP model kurulumu {build_time:.3f} sn, çözüm {solve_time:.3f} sn "
+                f"({len(keys)} değişken, {fixed} sabit değişken atlandı)"
+            )
+            
+            # Süre sınırına takılınca bulunan en iyi tamsayı çözüm de kabul edilir
+            has_solution = prob.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+            
+            if has_solution:
+                if prob.sol_status == pulp.LpSolutionIntegerFeasible:
+                    self.optimization_log.append("⏳ LP süre/gap sınırında durdu, en iyi bulunan çözüm kullanılıyor")
                 
-                for day in range(1, self.days_in_month + 1):
-                    assigned_doctors = []
-                    for doctor in self.doctors:
-                        if x[doctor][day].varValue == 1:
-                            assigned_doctors.append(doctor)
-                            
-                            # Memnuniyet skoru hesapla
-                            prefs = self.preferences.get(doctor, {})
-                            if day in prefs.get('pozitif', []):
-                                total_satisfaction += 10
-                            elif day in prefs.get('negatif', []):
-                                total_satisfaction -= 5
-                            else:
-                                total_satisfaction += 1
-                    
-                    schedule[day] = assigned_doctors
+                chosen = [key for key in keys
+                          if x[key].varValue is not None and x[key].varValue > 0.5]
+                schedule = Schedule.from_slots(index.doctors, self.num_days,
+                                               [doctor_id for doctor_id, _ in chosen],
+                                               [day - 1 for _, day in chosen])
                 
-                self.quality_score = total_satisfaction / (self.days_in_month * len(self.doctors))
-                self.optimization_log.append(f"✅ LP başarılı! Kalite skoru: {self.quality_score:.2f}")
+                self.optimization_log.append("✅ LP başarılı!")
                 
                 return schedule
             else:
@@ -199,293 +1429,1086 @@ class NobetOptimizer:
             self.optimization_log.append(f"❌ LP hatası: {str(e)}")
             return None
     
-    def genetic_algorithm_optimize(self) -> Optional[Dict]:
+    def create_lp_solver(self, warm_start: bool = False):
+        """solver_options'a göre PuLP çözücüsünü oluşturur (kurulu değilse CBC'ye düşer)"""
+        pulp = import_engine('pulp')
+        options = self.solver_options
+        backend = options['backend']
+        solver_name = SOLVER_BACKENDS.get(backend.lower(), backend)
+        
+        kwargs = {'msg': bool(options['msg'])}
+        time_limit = self.time_left(options['time_limit'])
+        if time_limit is not None:
+            kwargs['timeLimit'] = time_limit
+        if options['gap'] is not None:
+            kwargs['gapRel'] = options['gap']
+        if options['threads'] is not None:
+            kwargs['threads'] = options['threads']
+        if warm_start:
+            kwargs['warmStart'] = True
+        
+        try:
+            solver = pulp.getSolver(solver_name, **kwargs)
+            if solver.available():
+                return solver
+            self.optimization_log.append(f"⚠️  {backend} çözücüsü kurulu değil, CBC kullanılıyor")
+        except Exception as e:
+            self.optimization_log.append(f"⚠️  {backend} çözücüsü oluşturulamadı ({str(e)}), CBC kullanılıyor")
+        
+        return pulp.PULP_CBC_CMD(**kwargs)
+    
+    def use_decomposition(self) -> bool:
+        """Ufuk ayrıştırılarak mı çözülmeli (mode ve auto_days'e göre)"""
+        mode = self.decomposition_options['mode']
+        if mode == 'auto':
+            return self.num_days > self.decomposition_options['auto_days']
+        return mode == 'on'
+    
+    def decomposition_windows(self) -> List[Tuple[int, int, int, int]]:
+        """(çekirdek ilk, çekirdek son, pencere ilk, pencere son) listesi; çekirdekler tam haftalardır"""
+        options = self.decomposition_options
+        weeks = max(1, round(options['window_days'] / 7))
+        overlap = max(0, options['overlap_days'])
+        
+        week_starts = [1] + [day for day in range(2, self.num_days + 1) if self.calendar.weekday[day - 1] == 0]
+        core_starts = week_starts[::weeks]
+        # Bir haftadan kısa son parça önceki çekirdeğe katılır
+        if len(core_starts) > 1 and self.num_days - core_starts[-1] + 1 < 7:
+            core_starts.pop()
+        
+        windows = []
+        for i, core_first in enumerate(core_starts):
+            core_last = core_starts[i + 1] - 1 if i + 1 < len(core_starts) else self.num_days
+            windows.append((core_first, core_last, max(1, core_first - overlap),
+                            min(self.num_days, core_last + overlap)))
+        return windows
+    
+    def window_shift_bounds(self, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Pencere için ufuk sınırlarından orantılı doktor başına (en az, en fazla) nöbet"""
+        share = (last_day - first_day + 1) / self.num_days
+        demand = int(self.pref_index.required[first_day - 1:last_day].sum())
+        max_shifts = max(int(np.ceil(self.max_shifts * share)), -(-demand // max(1, self.num_doctors)))
+        min_shifts = min(int(self.min_shifts * share), max_shifts)
+        return min_shifts, max_shifts
+    
+    def solve_window(self, first_day: int, last_day: int,
+                     shift_bounds: Tuple[int, int]) -> Optional[Dict]:
+        """Tek bir pencereyi LP ile çözer; alt sınır çözümsüz kılarsa onsuz yeniden dener"""
+        schedule = self.linear_programming_optimize(days=(first_day, last_day), shift_bounds=shift_bounds)
+        if schedule is None and shift_bounds[0] > 0:
+            schedule = self.linear_programming_optimize(days=(first_day, last_day),
+                                                        shift_bounds=(0, shift_bounds[1]))
+        return schedule
+    
+    def trim_excess_shifts(self, schedule: Dict) -> List[int]:
+        """Nöbet sınırını aşan doktorları en düşük puanlı günlerinden çıkarır; boş günleri döndürür"""
+        index = self.pref_index
+        month_of_day = self.calendar.month_of_day
+        days_by_doctor = {}
+        for day, doctors in schedule.items():
+            for doctor in doctors:
+                days_by_doctor.setdefault(doctor, []).append(day)
+        
+        freed = set()
+        for doctor, days in days_by_doctor.items():
+            doctor_id = index.doctor_ids[doctor]
+            days.sort(key=lambda day: index.score(doctor_id, day))
+            removed = set()
+            if self.calendar.num_months > 1:
+                for month in range(self.calendar.num_months):
+                    in_month = [day for day in days if month_of_day[day - 1] == month]
+                    removed.update(in_month[:max(0, len(in_month) - self.MAX_SHIFTS_PER_DOCTOR)])
+            kept = [day for day in days if day not in removed]
+            removed.update(kept[:max(0, len(kept) - self.max_shifts)])
+            
+            for day in removed:
+                schedule[day].remove(doctor)
+            freed.update(removed)
+        
+        return sorted(freed)
+    
+    def decomposition_optimize(self) -> Optional[Dict]:
+        """Ufku örtüşen hafta pencerelerine bölüp pencereleri paralel LP ile çözer"""
+        if not LP_AVAILABLE:
+            self.optimization_log.append("❌ Ayrıştırma LP gerektirir (pip install pulp)")
+            return None
+        
+        windows = self.decomposition_windows()
+        workers = self.decomposition_options['workers'] or os.cpu_count() or 1
+        workers = max(1, min(workers, len(windows)))
+        self.optimization_log.append(
+            f"🧩 Ayrıştırma: {len(windows)} pencere "
+            f"(~{self.decomposition_options['window_days']} gün, ±{self.decomposition_options['overlap_days']} gün örtüşme), "
+            f"{workers} işçi"
+        )
+        
+        with self.metrics.phase('decomposition'):
+            tasks = [(first, last, self.window_shift_bounds(first, last)) for _, _, first, last in windows]
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_optimizer_worker,
+                                         initargs=(self,)) as executor:
+                    parts = list(executor.map(_solve_window, *zip(*tasks)))
+            else:
+                parts = [self.solve_window(*task) for task in tasks]
+            self.metrics.count('decomposition_windows', len(windows))
+            
+            # Çekirdek günlerini birleştir; çözümsüz pencerelerin günleri onarımda doldurulur
+            schedule = {day: [] for day in range(1, self.num_days + 1)}
+            affected = set()
+            for (core_first, core_last, _, _), part in zip(windows, parts):
+                core_days = range(core_first, core_last + 1)
+                if part is None:
+                    self.optimization_log.append(f"⚠️  Pencere {core_first}-{core_last} çözülemedi, onarılacak")
+                    affected.update(core_days)
+                    continue
+                for day in core_days:
+                    schedule[day] = list(part[day])
+            
+            # Pencere sınırında ardışık nöbet: sonraki günden çıkar
+            for core_first, _, _, _ in windows[1:]:
+                for doctor in set(schedule[core_first]) & set(schedule[core_first - 1]):
+                    schedule[core_first].remove(doctor)
+                    affected.add(core_first)
+            affected.update(self.trim_excess_shifts(schedule))
+            
+            if affected:
+                self.optimization_log.append(f"🔧 Birleştirme sonrası {len(affected)} gün onarılıyor")
+                schedule = self.repair_schedule(schedule, sorted(affected), [])
+        
+        self.optimization_log.append("✅ Ayrıştırma tamamlandı!")
+        return self.as_schedule(schedule)
+    
+    def build_ga_slot_days(self) -> np.ndarray:
+        """GA bireyindeki her slotun ait olduğu günü (0 tabanlı) döndürür"""
+        return self.pref_index.slot_days
+    
+    def evaluate_population(self, population_matrix: np.ndarray,
+                            score_matrix: np.ndarray, slot_days: np.ndarray) -> np.ndarray:
+        """Tüm popülasyonu (birey x slot -> doktor indeksi) tek seferde değerlendirir"""
+        population_matrix = np.asarray(population_matrix, dtype=np.intp)
+        if population_matrix.ndim == 1:
+            population_matrix = population_matrix[np.newaxis, :]
+        pop_size = population_matrix.shape[0]
+        rows = np.arange(pop_size)[:, np.newaxis]
+        
+        # Tercih puanları: pozitif / negatif / nötr
+        scores = score_matrix[population_matrix, slot_days].sum(axis=1)
+        
+        # Nöbet sayısı dengesizliği penaltı
+        flat = (rows * self.num_doctors + population_matrix).ravel()
+        shift_counts = np.bincount(flat, minlength=pop_size * self.num_doctors)
+        shift_counts = shift_counts.reshape(pop_size, self.num_doctors)
+        scores -= np.abs(shift_counts - self.doctor_targets).sum(axis=1) * self.IMBALANCE_WEIGHT
+        
+        # Ardışık nöbet penaltı (aynı gün tekrarları bir kez sayılır)
+        occupancy = np.zeros((pop_size, self.num_doctors, self.num_days), dtype=bool)
+        occupancy[rows, population_matrix, slot_days] = True
+        consecutive = (occupancy[:, :, :-1] & occupancy[:, :, 1:]).sum(axis=(1, 2))
+        scores -= consecutive * self.CONSECUTIVE_WEIGHT
+        
+        return scores
+    
+    def create_ga_toolbox(self):
+        """DEAP toolbox'ını (birey üretimi ve operatörler) hazırlar"""
+        ensure_deap_types()
+        base, creator, tools, _ = load_deap()
+        toolbox = base.Toolbox()
+        
+        all_doctors = list(range(self.num_doctors))
+        operators = ScheduleOperators(self)
+        
+        def create_individual():
+            """Rastgele bir çizelge oluştur (slot başına doktor indeksi), sonra kurallara göre onar"""
+            individual = []
+            for day in range(1, self.num_days + 1):
+                required = self.get_required_doctors(day)
+                
+                # Negatif tercihi olanları filtrele
+                filtered_doctors = [i for i in all_doctors if not self.pref_index.is_negative(i, day)]
+                available_doctors = filtered_doctors if len(filtered_doctors) >= required else all_doctors
+                
+                selected = random.sample(available_doctors, min(required, len(available_doctors)))
+                individual.extend(selected)
+            
+            return operators.repair(individual)
+        
+        # GA operatörleri (gün hizalı, uygunluğu koruyan)
+        toolbox.register("individual", tools.initIterate, creator.Individual, create_individual)
+        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+        toolbox.register("evaluate", lambda individual: self.evaluate_individuals([individual])[0])
+        toolbox.register("mate", operators.crossover)
+        toolbox.register("mutate", operators.mutate, indpb=0.1)
+        toolbox.register("repair", operators.repair)
+        
+        def clone(individual):
+            """deepcopy yerine hızlı kopya (birey düz bir tamsayı listesidir)"""
+            copy = creator.Individual(individual)
+            copy.fitness.values = individual.fitness.values
+            return copy
+        
+        toolbox.register("clone", clone)
+        toolbox.register("select", tools.selTournament, tournsize=3)
+        
+        return toolbox
+    
+    def evaluate_individuals(self, individuals: List[List[int]]) -> List[Tuple[float]]:
+        """Bireyleri toplu olarak değerlendirir (DEAP fitness tuple listesi)"""
+        scores = self.evaluate_population(np.array(individuals, dtype=np.intp),
+                                          self.pref_index.score_matrix, self.build_ga_slot_days())
+        return [(float(score),) for score in scores]
+    
+    def evolve_population(self, toolbox, population: List, generations: int,
+                          start_generation: int = 0, log_progress: bool = True,
+                          deadline: Optional[float] = None) -> List:
+        """Popülasyonu verilen nesil sayısı kadar (deadline anına, perf_counter, kadar) evrimleştirir"""
+        _, _, _, algorithms = load_deap()
+        CXPB, MUTPB = 0.7, 0.3
+        
+        for ind, fit in zip(population, self.evaluate_individuals(population)):
+            ind.fitness.values = fit
+        self.metrics.count('ga_evaluations', len(population))
+        
+        for gen in range(start_generation, start_generation + generations):
+            if deadline is not None and perf_counter() >= deadline:
+                if log_progress:
+                    self.optimization_log.append(f"⏱️  GA süre sınırı: {gen - start_generation}. nesilde durdu")
+                break
+            offspring = algorithms.varAnd(population, toolbox, CXPB, MUTPB)
+            fits = self.evaluate_individuals(offspring)
+            
+            for fit, ind in zip(fits, offspring):
+                ind.fitness.values = fit
+            self.metrics.count('ga_evaluations', len(offspring))
+            self.metrics.count('ga_generations')
+            
+            population = toolbox.select(offspring, k=len(population))
+            
+            if log_progress and gen % 20 == 0:
+                best_fitness = max([ind.fitness.values[0] for ind in population])
+                self.optimization_log.append(f"  Nesil {gen}: En iyi skor = {best_fitness:.1f}")
+        
+        return population
+    
+    def individual_to_schedule(self, individual: List[int]) -> Schedule:
+        """Slot bazlı bireyi çizelgeye çevirir"""
+        return Schedule.from_slots(self.pref_index.doctors, self.num_days, individual, self.build_ga_slot_days())
+    
+    def genetic_algorithm_optimize(self, population_size: Optional[int] = None,
+                                   generations: Optional[int] = None,
+                                   deadline: Optional[float] = None) -> Optional[Dict]:
         """Genetic Algorithm ile çizelge oluşturur"""
+        with self.metrics.phase('ga'):
+            return self._genetic_algorithm_optimize(population_size, generations, deadline)
+    
+    def _genetic_algorithm_optimize(self, population_size: Optional[int],
+                                    generations: Optional[int],
+                                    deadline: Optional[float]) -> Optional[Dict]:
         if not GA_AVAILABLE:
-            self.optimization_log.append("❌ Genetic Algorithm kullanılamıyor")
+            self.optimization_log.append("❌ Genetic Algorithm kullanılamıyor (pip install deap)")
             return None
             
         try:
             self.optimization_log.append("🧬 Genetic Algorithm başlatılıyor...")
             
-            # DEAP için setup
-            creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-            creator.create("Individual", list, fitness=creator.FitnessMax)
+            population_size = population_size or self.ga_options['population_size']
+            generations = generations or self.ga_options['generations']
+            if deadline is None:
+                time_limit = self.time_left(self.ga_options['time_limit'])
+                deadline = None if time_limit is None else perf_counter() + time_limit
             
-            toolbox = base.Toolbox()
-            
-            def create_individual():
-                """Rastgele bir çizelge oluştur"""
-                individual = []
-                for day in range(1, self.days_in_month + 1):
-                    day_type = self.get_weekday_type(day)
-                    required = self.WEEKEND_DOCTORS_NEEDED if day_type == "weekend" else self.WEEKDAY_DOCTORS_NEEDED
-                    
-                    # Bu gün için doktorları seç
-                    available_doctors = list(self.doctors)
-                    
-                    # Negatif tercihi olanları filtrele
-                    filtered_doctors = []
-                    for doctor in available_doctors:
-                        prefs = self.preferences.get(doctor, {})
-                        if day not in prefs.get('negatif', []):
-                            filtered_doctors.append(doctor)
-                    
-                    if len(filtered_doctors) >= required:
-                        available_doctors = filtered_doctors
-                    
-                    selected = random.sample(available_doctors, min(required, len(available_doctors)))
-                    individual.extend(selected)
+            if self.ga_options['islands'] > 1:
+                best_individual, best_fitness = self.island_model_optimize(population_size, generations, deadline)
+            else:
+                if self.ga_options['seed'] is not None:
+                    random.seed(self.ga_options['seed'])
                 
-                return individual
-            
-            def evaluate_individual(individual):
-                """Çizelge kalitesini değerlendir"""
-                schedule = {}
-                idx = 0
-                total_score = 0
+                toolbox = self.create_ga_toolbox()
+                population = toolbox.population(n=population_size)
                 
-                # Individual'ı schedule'a çevir
-                for day in range(1, self.days_in_month + 1):
-                    day_type = self.get_weekday_type(day)
-                    required = self.WEEKEND_DOCTORS_NEEDED if day_type == "weekend" else self.WEEKDAY_DOCTORS_NEEDED
-                    
-                    schedule[day] = individual[idx:idx + required]
-                    idx += required
+                self.optimization_log.append("🔄 GA nesilleri hesaplanıyor...")
+                population = self.evolve_population(toolbox, population, generations, deadline=deadline)
                 
-                # Kalite skorunu hesapla
-                doctor_shift_counts = {doctor: 0 for doctor in self.doctors}
+                # En iyi çözümü al
+                best = max(population, key=lambda x: x.fitness.values[0])
+                best_individual, best_fitness = list(best), best.fitness.values[0]
+            
+            schedule = self.individual_to_schedule(best_individual)
+            
+            self.optimization_log.append(f"✅ GA başarılı! En iyi uygunluk: {best_fitness:.1f}")
+            
+            return schedule
+            
+        except Exception as e:
+            self.optimization_log.append(f"❌ GA hatası: {str(e)}")
+            return None
+    
+    def island_model_optimize(self, population_size: int, generations: int,
+                              deadline: Optional[float] = None) -> Tuple[List[int], float]:
+        """Ada modeli: bağımsız popülasyonlar paralel evrilir, periyodik göç yapılır"""
+        islands = self.ga_options['islands']
+        workers = self.ga_options['workers'] or os.cpu_count() or 1
+        workers = max(1, min(workers, islands))
+        interval = max(1, self.ga_options['migration_interval'])
+        migrants = max(0, min(self.ga_options['migrants'], population_size - 1))
+        base_seed = self.ga_options['seed'] if self.ga_options['seed'] is not None else random.randrange(2 ** 31)
+        
+        self.optimization_log.append(
+            f"🏝️  Ada modeli: {islands} ada, {workers} işçi, {interval} nesilde bir göç (seed={base_seed})"
+        )
+        
+        # Başlangıç popülasyonları her ada için ayrı tohumla üretilir
+        toolbox = self.create_ga_toolbox()
+        populations = []
+        for island in range(islands):
+            random.seed(base_seed + island)
+            populations.append([list(ind) for ind in toolbox.population(n=population_size)])
+        
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_optimizer_worker,
+                                       initargs=(self,)) if workers > 1 else None
+        try:
+            results = []
+            done = 0
+            epoch = 0
+            while done < generations and (deadline is None or perf_counter() < deadline or not results):
+                epoch_generations = min(interval, generations - done)
+                # İşçilerin saatleri farklı olabileceği için bitiş anı kalan süre olarak gönderilir
+                time_left = None if deadline is None else max(0.0, deadline - perf_counter())
+                tasks = [(populations[island], epoch_generations, done,
+                          base_seed + 7919 * (epoch + 1) + island, time_left) for island in range(islands)]
                 
-                for day, doctors in schedule.items():
-                    for doctor in doctors:
-                        doctor_shift_counts[doctor] += 1
-                        
-                        prefs = self.preferences.get(doctor, {})
-                        if day in prefs.get('pozitif', []):
-                            total_score += 10  # Pozitif tercih bonusu
-                        elif day in prefs.get('negatif', []):
-                            total_score -= 20  # Negatif tercih penaltı
-                        else:
-                            total_score += 1   # Nötr gün
+                if executor is not None:
+                    results = list(executor.map(_evolve_island, *zip(*tasks)))
+                else:
+                    results = [self.evolve_island(*task) for task in tasks]
                 
-                # Nöbet sayısı dengesizliği penaltı
-                target_shifts = self.TARGET_SHIFTS_PER_DOCTOR
-                for count in doctor_shift_counts.values():
-                    deviation = abs(count - target_shifts)
-                    total_score -= deviation * 5
+                # İşçilerdeki sayaçlar kaybolduğu için burada eklenir (seri çalışmada evolve_population sayar)
+                if executor is not None:
+                    self.metrics.count('ga_evaluations', islands * population_size * (epoch_generations + 1))
+                    self.metrics.count('ga_generations', islands * epoch_generations)
                 
-                # Ardışık nöbet penaltı
-                for day in range(1, self.days_in_month):
-                    current_doctors = set(schedule.get(day, []))
-                    next_doctors = set(schedule.get(day + 1, []))
-                    consecutive = current_doctors.intersection(next_doctors)
-                    total_score -= len(consecutive) * 15
+                done += epoch_generations
+                epoch += 1
                 
-                return (total_score,)
-            
-            # GA operatörleri
-            toolbox.register("individual", tools.initIterate, creator.Individual, create_individual)
-            toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-            toolbox.register("evaluate", evaluate_individual)
-            toolbox.register("mate", tools.cxTwoPoint)
-            toolbox.register("mutate", tools.mutShuffleIndexes, indpb=0.1)
-            toolbox.register("select", tools.selTournament, tournsize=3)
-            
-            # GA parametreleri
-            population = toolbox.population(n=50)
-            CXPB, MUTPB, NGEN = 0.7, 0.3, 100
-            
-            self.optimization_log.append("🔄 GA nesilleri hesaplanıyor...")
-            
-            # Evrimi çalıştır
-            for gen in range(NGEN):
-                offspring = algorithms.varAnd(population, toolbox, CXPB, MUTPB)
-                fits = toolbox.map(toolbox.evaluate, offspring)
+                # Halka topolojisinde göç: her adanın en iyileri bir sonrakinin en kötülerinin yerine geçer
+                if migrants and done < generations:
+                    for island in range(islands):
+                        source = results[island]
+                        target = results[(island + 1) % islands]
+                        target[-migrants:] = [(list(ind), fit) for ind, fit in source[:migrants]]
                 
-                for fit, ind in zip(fits, offspring):
-                    ind.fitness.values = fit
+                populations = [[ind for ind, _ in result] for result in results]
+                best_fitness = max(result[0][1] for result in results)
+                self.optimization_log.append(f"  Nesil {done}: En iyi skor = {best_fitness:.1f}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        best_individual, best_fitness = max((result[0] for result in results), key=lambda item: item[1])
+        return best_individual, best_fitness
+    
+    def evolve_island(self, population: List[List[int]], generations: int,
+                      start_generation: int, seed: int,
+                      time_left: Optional[float] = None) -> List[Tuple[List[int], float]]:
+        """Tek bir adayı evrimleştirir; sonucu skora göre azalan sırada döndürür"""
+        deadline = None if time_left is None else perf_counter() + time_left
+        random.seed(seed)
+        toolbox = self.create_ga_toolbox()
+        _, creator, _, _ = load_deap()
+        population = [creator.Individual(ind) for ind in population]
+        population = self.evolve_population(toolbox, population, generations,
+                                            start_generation, log_progress=False, deadline=deadline)
+        
+        ranked = sorted(population, key=lambda ind: ind.fitness.values[0], reverse=True)
+        return [(list(ind), ind.fitness.values[0]) for ind in ranked]
+    
+    def local_search_enhance(self, schedule: Dict) -> Dict:
+        """Çizelgeyi yerel arama ile iyileştirir"""
+        try:
+            self.optimization_log.append("🤖 Yerel arama iyileştirmesi başlatılıyor...")
+            return self.local_search_optimize(schedule)
+            
+        except Exception as e:
+            self.optimization_log.append(f"⚠️  Yerel arama hatası: {str(e)}")
+            return schedule
+    
+    def local_search_optimize(self, schedule: Dict, strategy: Optional[str] = None,
+                              max_iterations: Optional[int] = None,
+                              time_limit: Optional[float] = None,
+                              days: Optional[List[int]] = None) -> Dict:
+        """Takas ve taşıma komşuluklarında O(1) delta değerlendirmeli yerel arama"""
+        with self.metrics.phase('local_search'):
+            return self._local_search_optimize(schedule, strategy, max_iterations, time_limit, days)
+    
+    def _local_search_optimize(self, schedule: Dict, strategy: Optional[str],
+                               max_iterations: Optional[int], time_limit: Optional[float],
+                               days: Optional[List[int]]) -> Dict:
+        options = self.local_search_options
+        strategy = strategy or options['strategy']
+        max_iterations = options['max_iterations'] if max_iterations is None else max_iterations
+        time_limit = self.time_left(options['time_limit'] if time_limit is None else time_limit)
+        deadline = float('inf') if time_limit is None else perf_counter() + time_limit
+        
+        index = self.pref_index
+        score = index.score_rows
+        day_order = sorted(days) if days else list(range(1, self.num_days + 1))
+        days = self.num_days
+        target = self.doctor_targets.tolist()
+        max_shifts = self.max_shifts
+        month_max = self.MAX_SHIFTS_PER_DOCTOR
+        month_masks = self.calendar.month_masks
+        day_month = [0] + [month_masks[month] for month in self.calendar.month_of_day.tolist()]
+        multi_month = len(month_masks) > 1
+        imbalance_weight = self.IMBALANCE_WEIGHT
+        consecutive_weight = self.CONSECUTIVE_WEIGHT
+        
+        # Durum: gün başına doktor indeksleri, doktor başına gün bit maskesi ve nöbet sayısı
+        schedule = self.as_schedule(schedule)
+        slots = {day: schedule.doctor_ids_on(day) for day in range(1, days + 1)}
+        masks = [0] * self.num_doctors
+        counts = [0] * self.num_doctors
+        for day, doctor_ids in slots.items():
+            for doctor_id in doctor_ids:
+                masks[doctor_id] |= 1 << day
+                counts[doctor_id] += 1
+        neighbours = [0] + [(1 << (day - 1)) | (1 << (day + 1)) for day in range(1, days + 1)]
+        
+        def removal_gain(doctor_id, day):
+            """Doktor günden çıkarılınca ortadan kalkan ihlal sayısı (ardışık nöbet veya çift atama)"""
+            if slots[day].count(doctor_id) > 1:
+                return 1
+            return (masks[doctor_id] & neighbours[day]).bit_count()
+        
+        def remaining_mask(doctor_id, day):
+            """Doktor günden çıkarıldıktan sonraki gün maskesi"""
+            if slots[day].count(doctor_id) > 1:
+                return masks[doctor_id]
+            return masks[doctor_id] & ~(1 << day)
+        
+        def month_full(mask, day):
+            """Maske, günün ayında aylık nöbet sınırına ulaşmış mı"""
+            return multi_month and (mask & day_month[day]).bit_count() >= month_max
+        
+        def candidate_moves(start):
+            """(delta, hamle) çiftlerini day_order[start]'tan başlayarak döngüsel sırayla üretir"""
+            for offset in range(len(day_order)):
+                day1 = day_order[(start + offset) % len(day_order)]
                 
-                population = toolbox.select(offspring, k=len(population))
+                # Taşıma komşuluğu
+                for pos1, a in enumerate(slots[day1]):
+                    gain_a = removal_gain(a, day1)
+                    base = (-score[a][day1 - 1] + consecutive_weight * gain_a
+                            - imbalance_weight * (abs(counts[a] - 1 - target[a]) - abs(counts[a] - target[a])))
+                    for c in range(self.num_doctors):
+                        if (masks[c] >> day1) & 1 or counts[c] >= max_shifts or masks[c] & neighbours[day1]:
+                            continue
+                        if month_full(masks[c], day1):
+                            continue
+                        delta = base + score[c][day1 - 1] - imbalance_weight * (
+                            abs(counts[c] + 1 - target[c]) - abs(counts[c] - target[c]))
+                        yield delta, ('move', day1, pos1, c)
                 
-                if gen % 20 == 0:
-                    best_fitness = max([ind.fitness.values[0] for ind in population])
-                    self.optimization_log.append(f"  Nesil {gen}: En iyi skor = {best_fitness:.1f}")
-            
-            # En iyi çözümü al
-            best_individual = max(population, key=lambda x: x.fitness.values[0])
-            
-            # Schedule'a çevir
-            schedule = {}
-            idx = 0
-            for day in range(1, self.days_in_month + 1):
-                day_type = self.get_weekday_type(day)
-                required = self.WEEKEND_DOCTORS_NEEDED if day_type == "weekend" else self.WEEKDAY_DOCTORS_NEEDED
+                # Takas komşuluğu
+                for day2 in day_order:
+                    if day2 <= day1:
+                        continue
+                    for pos1, a in enumerate(slots[day1]):
+                        if (masks[a] >> day2) & 1:
+                            continue
+                        if remaining_mask(a, day1) & neighbours[day2]:
+                            continue
+                        if month_full(remaining_mask(a, day1), day2):
+                            continue
+                        gain_a = removal_gain(a, day1)
+                        for pos2, b in enumerate(slots[day2]):
+                            if (masks[b] >> day1) & 1:
+                                continue
+                            if remaining_mask(b, day2) & neighbours[day1]:
+                                continue
+                            if month_full(remaining_mask(b, day2), day1):
+                                continue
+                            delta = (score[a][day2 - 1] + score[b][day1 - 1]
+                                     - score[a][day1 - 1] - score[b][day2 - 1]
+                                     + consecutive_weight * (gain_a + removal_gain(b, day2)))
+                            yield delta, ('swap', day1, pos1, day2, pos2)
                 
-                schedule[day] = best_individual[idx:idx + required]
-                idx += required
+                if perf_counter() > deadline:
+                    return
+        
+        def apply(move):
+            """Hamleyi bit maskeleri ve nöbet sayılarıyla birlikte uygular"""
+            if move[0] == 'move':
+                _, day, pos, c = move
+                a = slots[day][pos]
+                masks[a] = remaining_mask(a, day)
+                slots[day][pos] = c
+                counts[a] -= 1
+                counts[c] += 1
+                masks[c] |= 1 << day
+            else:
+                _, day1, pos1, day2, pos2 = move
+                a = slots[day1][pos1]
+                b = slots[day2][pos2]
+                masks[a] = remaining_mask(a, day1) | (1 << day2)
+                masks[b] = remaining_mask(b, day2) | (1 << day1)
+                slots[day1][pos1] = b
+                slots[day2][pos2] = a
+        
+        iterations = 0
+        total_gain = 0.0
+        start = 0
+        while iterations < max_iterations and perf_counter() <= deadline:
+            chosen = None
+            evaluated = 0
+            if strategy == 'best':
+                best_delta = 1e-9
+                for delta, move in candidate_moves(start):
+                    evaluated += 1
+                    if delta > best_delta:
+                        best_delta, chosen = delta, move
+            else:
+                for delta, move in candidate_moves(start):
+                    evaluated += 1
+                    if delta > 1e-9:
+                        best_delta, chosen = delta, move
+                        break
+            self.metrics.count('ls_moves_evaluated', evaluated)
             
-            self.quality_score = best_individual.fitness.values[0] / (self.days_in_month * len(self.doctors))
-            self.optimization_log.append(f"✅ GA başarılı! Kalite skoru: {self.quality_score:.2f}")
+            if chosen is None:
+                break
             
-            return schedule
+            apply(chosen)
+            self.metrics.count('ls_moves_accepted')
+            iterations += 1
+            total_gain += best_delta
+            start = day_order.index(chosen[1])
+        
+        self.optimization_log.append(
+            f"✅ Yerel arama ({strategy}) ile {iterations} iyileştirme yapıldı (+{total_gain:.1f} puan)"
+        )
+        
+        return Schedule.from_slots(index.doctors, days,
+                                   [doctor_id for doctor_ids in slots.values() for doctor_id in doctor_ids],
+                                   [day - 1 for day, doctor_ids in slots.items() for _ in doctor_ids])
+    
+    def evaluate_schedule(self, schedule: Dict) -> float:
+        """Motorlardan bağımsız ortak amaç değeri (GA uygunluğu + kadro cezası)"""
+        return float(self.evaluate_matrices(self.as_schedule(schedule).matrix[np.newaxis])[0])
+    
+    def evaluate_matrices(self, assigned: np.ndarray) -> np.ndarray:
+        """evaluate_schedule'ın toplu hali: (aday x doktor x gün) atama tensöründen aday başına amaç"""
+        index = self.pref_index
+        assigned = np.asarray(assigned, dtype=np.intp)
+        occupied = assigned > 0
+        
+        return (np.einsum('knd,nd->k', assigned, index.score_matrix)
+                - self.IMBALANCE_WEIGHT * np.abs(assigned.sum(axis=2) - self.doctor_targets).sum(axis=1)
+                - self.CONSECUTIVE_WEIGHT * (occupied[:, :, :-1] & occupied[:, :, 1:]).sum(axis=(1, 2))
+                - self.COVERAGE_WEIGHT * np.abs(assigned.sum(axis=1) - index.required).sum(axis=1))
+    
+    def apply_edits(self, matrix: np.ndarray, edits: List[Dict]) -> None:
+        """Düzenleme işlemlerini ({'doctor', 'from', 'to'}, 'add', 'remove') matrise yerinde uygular"""
+        index = self.pref_index
+        for edit in edits:
+            doctor_id = index.doctor_ids.get(edit.get('doctor'))
+            if doctor_id is None:
+                raise ValueError(f"Bilinmeyen doktor: {edit.get('doctor')}")
+            operations = [(key, delta) for key, delta in (('from', -1), ('remove', -1), ('to', 1), ('add', 1))
+                          if key in edit]
+            if not operations:
+                raise ValueError(f"Geçersiz düzenleme: {edit}")
+            for key, delta in operations:
+                day = self.calendar.day_number(edit[key])
+                if not 1 <= day <= self.num_days:
+                    raise ValueError(f"Ufuk dışı gün: {edit[key]}")
+                if delta < 0 and matrix[doctor_id, day - 1] == 0:
+                    raise ValueError(f"{edit['doctor']} {day}. günde nöbetli değil")
+                matrix[doctor_id, day - 1] += delta
+    
+    def score_schedules(self, candidates, base=None, doctor_stats: bool = True) -> List[Dict]:
+        """Aday çizelgeleri veya düzenlemeleri çözmeden, tek seferde vektörel puanlar"""
+        if isinstance(candidates, Mapping):
+            candidates = [candidates]
+        index = self.pref_index
+        base = self.schedule if base is None else base
+        base_matrix = self.as_schedule(base).matrix if base else None
+        
+        tensor = np.zeros((len(candidates), self.num_doctors, self.num_days), dtype=np.int16)
+        for k, candidate in enumerate(candidates):
+            if not isinstance(candidate, Schedule) and isinstance(candidate, Mapping) and 'edits' in candidate:
+                if base_matrix is None:
+                    raise ValueError("Düzenlemeler için temel çizelge (base) gerekli")
+                tensor[k] = base_matrix
+                try:
+                    self.apply_edits(tensor[k], candidate['edits'])
+                except ValueError as e:
+                    raise ValueError(f"Aday {k}: {str(e)}") from e
+            else:
+                tensor[k] = self.as_schedule(candidate).matrix
+        
+        objectives = self.evaluate_matrices(tensor)
+        base_objective = self.evaluate_matrices(base_matrix[np.newaxis])[0] if base_matrix is not None else None
+        
+        # Kural ihlalleri: tüm adaylar için tek seferde, sonra adaya göre gruplanır
+        occupied = tensor > 0
+        counts = tensor.sum(axis=2)
+        month_first = np.flatnonzero(np.r_[True, np.diff(self.calendar.month_of_day) != 0])
+        month_counts = np.add.reduceat(tensor, month_first, axis=2)
+        over = (counts > self.max_shifts) | (month_counts > self.MAX_SHIFTS_PER_DOCTOR).any(axis=2)
+        coverage = occupied.sum(axis=1) != index.required
+        positive = (tensor * index.positive_mask).sum(axis=2)
+        negative = (tensor * index.negative_mask).sum(axis=2)
+        
+        def grouped(mask):
+            """(aday, ...) indeksli ihlalleri aday başına listeye ayırır"""
+            groups = [[] for _ in candidates]
+            for position in np.argwhere(mask).tolist():
+                groups[position[0]].append(position[1:])
+            return groups
+        
+        doctors = index.doctors
+        coverage_days = grouped(coverage)
+        consecutive = grouped(occupied[:, :, :-1] & occupied[:, :, 1:])
+        duplicate = grouped(tensor > 1)
+        over_doctors = grouped(over)
+        counts_rows, positive_rows, negative_rows = counts.tolist(), positive.tolist(), negative.tolist()
+        
+        results = []
+        for k in range(len(candidates)):
+            violations = {
+                'coverage': [day + 1 for day, in coverage_days[k]],
+                'duplicate': [{'doctor': doctors[n], 'day': day + 1} for n, day in duplicate[k]],
+                'consecutive': [{'doctor': doctors[n], 'day': day + 1} for n, day in consecutive[k]],
+                'max_shifts': [doctors[n] for n, in over_doctors[k]],
+            }
+            result = {
+                'objective': float(objectives[k]),
+                'delta': None if base_objective is None else float(objectives[k] - base_objective),
+                'valid': not any(violations.values()),
+                'violations': violations,
+                'negatif_assignments': int(sum(negative_rows[k])),
+            }
+            if doctor_stats:
+                result['doctor_stats'] = {
+                    doctor: {
+                        'total_shifts': counts_rows[k][n],
+                        'positive_matches': positive_rows[k][n],
+                        'negative_matches': negative_rows[k][n],
+                        'satisfaction_score': self.satisfaction_score(positive_rows[k][n], negative_rows[k][n],
+                                                                      counts_rows[k][n]),
+                    }
+                    for n, doctor in enumerate(doctors)
+                }
+            results.append(result)
+        return results
+    
+    def schedule_to_individual(self, schedule: Dict) -> List[int]:
+        """Çizelgeyi slot bazlı GA bireyine çevirir; eksik slotlar rastgele doktorla doldurulur"""
+        schedule = self.as_schedule(schedule)
+        individual = []
+        for day in range(1, self.num_days + 1):
+            required = self.get_required_doctors(day)
+            ids = schedule.doctor_ids_on(day)[:required]
+            while len(ids) < required:
+                ids.append(random.randrange(self.num_doctors))
+            individual.extend(ids)
+        return individual
+    
+    def run_portfolio_arm(self, arm: str, time_left: float, incumbent: Optional[Dict],
+                          report: Callable[[str, Dict], None],
+                          should_stop: Callable[[], bool]) -> Dict:
+        """Portföyün bir kolunu ('lp' veya 'search') çalıştırır; {'schedule', 'optimal', 'log'} döndürür"""
+        log_start = len(self.optimization_log)
+        deadline = perf_counter() + time_left
+        optimal = False
+        
+        if arm == 'lp':
+            limit = self.solver_options['time_limit']
+            self.solver_options = dict(self.solver_options,
+                                       time_limit=time_left if limit is None else min(limit, time_left))
+            schedule = self.linear_programming_optimize()
+            if schedule is not None:
+                optimal = self.lp_stats.get('solution_status') == import_engine('pulp').LpSolutionOptimal
+        else:
+            schedule = self.portfolio_search(deadline, incumbent, report, should_stop)
+        
+        return {'schedule': schedule, 'optimal': optimal, 'log': self.optimization_log[log_start:]}
+    
+    def portfolio_search(self, deadline: float, incumbent: Optional[Dict],
+                         report: Callable[[str, Dict], None],
+                         should_stop: Callable[[], bool]) -> Optional[Dict]:
+        """GA'yı mevcut en iyi çözümle tohumlayıp parça parça evrimleştirir, sonra yerel arama yapar"""
+        schedule = incumbent
+        if GA_AVAILABLE:
+            if self.ga_options['seed'] is not None:
+                random.seed(self.ga_options['seed'])
+            toolbox = self.create_ga_toolbox()
+            population = toolbox.population(n=self.ga_options['population_size'])
+            if incumbent:
+                population[0][:] = toolbox.repair(self.schedule_to_individual(incumbent))
             
-        except Exception as e:
-            self.optimization_log.append(f"❌ GA hatası: {str(e)}")
-            return None
+            chunk = max(1, self.portfolio_options['chunk_generations'])
+            best, best_fitness = None, float('-inf')
+            done = 0
+            while done < self.ga_options['generations'] and not should_stop() and perf_counter() < deadline:
+                population = self.evolve_population(toolbox, population, chunk, done, log_progress=False,
+                                                    deadline=deadline)
+                done += chunk
+                # Turnuva seçimi en iyiyi koruyamadığı için en iyi birey ayrıca saklanır
+                leader = max(population, key=lambda ind: ind.fitness.values[0])
+                if leader.fitness.values[0] > best_fitness:
+                    best, best_fitness = list(leader), leader.fitness.values[0]
+                    schedule = self.individual_to_schedule(best)
+                    report('genetic_algorithm', schedule)
+            self.optimization_log.append(f"🧬 Portföy GA: {done} nesil, en iyi skor {best_fitness:.1f}")
+        
+        remaining = deadline - perf_counter()
+        if schedule and remaining > 0 and not should_stop():
+            schedule = self.local_search_optimize(
+                schedule, time_limit=self.local_search_limit(remaining))
+            report('local_search', schedule)
+        return schedule
     
-    def machine_learning_enhance(self, schedule: Dict) -> Dict:
-        """Machine Learning ile çizelgeyi iyileştirir"""
-        if not ML_AVAILABLE:
-            self.optimization_log.append("⚠️  ML iyileştirme atlandı")
-            return schedule
+    def portfolio_optimize(self, deadline: Optional[float] = None,
+                           progress_callback: Optional[Callable[[Dict], None]] = None) -> Optional[Dict]:
+        """Greedy taban çözümü üstünde LP ve GA + yerel aramayı süre sınırına kadar yarıştırır"""
+        options = self.portfolio_options
+        budget = self.time_left(options['deadline'] if deadline is None else deadline)
+        callback = progress_callback or self.progress_callback
+        start = perf_counter()
+        end = start + budget
+        best = {'schedule': None, 'objective': float('-inf'), 'engine': None}
+        
+        def offer(engine, schedule):
+            """Aday çözümü ortak amaçla değerlendirir, daha iyiyse en iyi çözüm yapar"""
+            if not schedule:
+                return
+            objective = self.evaluate_schedule(schedule)
+            improved = objective > best['objective']
+            if improved:
+                best.update(schedule=schedule, objective=objective, engine=engine)
+            self.metrics.count('portfolio_incumbents')
+            if callback is not None:
+                callback({'type': 'progress', 'engine': engine, 'objective': objective,
+                          'best_objective': best['objective'], 'improved': improved,
+                          'elapsed': perf_counter() - start})
+        
+        arms = (['lp'] if LP_AVAILABLE and self.feasibility.get('lp_feasible', True) else []) + ['search']
+        workers = options['workers'] or len(arms)
+        self.optimization_log.append(
+            f"🏁 Portföy: {', '.join(arms)} ({'paralel' if workers > 1 else 'sıralı'}), süre sınırı {budget:.1f} sn"
+        )
+        
+        with self.metrics.phase('portfolio'):
+            offer('greedy', self.simple_greedy_algorithm())
+            incumbent = best['schedule']
+            proved_optimal = False
             
-        try:
-            self.optimization_log.append("🤖 ML iyileştirmesi başlatılıyor...")
-            
-            # Doktor özelliklerini hesapla
-            doctor_features = {}
-            for doctor in self.doctors:
-                doctor_features[doctor] = self.calculate_doctor_features(doctor)
-            
-            # Memnuniyet skorları hesapla
-            satisfaction_scores = {}
-            for doctor in self.doctors:
-                total_satisfaction = 0
-                prefs = self.preferences.get(doctor, {})
-                
-                assigned_days = [day for day, doctors in schedule.items() if doctor in doctors]
+            if workers > 1:
+                queue = multiprocessing.Queue()
+                stop_event = multiprocessing.Event()
+                executor = ProcessPoolExecutor(max_workers=len(arms), initializer=_init_portfolio_worker,
+                                               initargs=(self, queue, stop_event))
                 
-                for day in assigned_days:
-                    if day in prefs.get('pozitif', []):
-                        total_satisfaction += 10
-                    elif day in prefs.get('negatif', []):
-                        total_satisfaction -= 10
-                    else:
-                        total_satisfaction += 5
+                def drain():
+                    while not queue.empty():
+                        offer(*queue.get())
                 
-                satisfaction_scores[doctor] = total_satisfaction
-            
-            # Basit takas optimizasyonu
-            improved_schedule = schedule.copy()
-            improvements = 0
-            
-            for day1 in range(1, self.days_in_month + 1):
-                for day2 in range(day1 + 2, self.days_in_month + 1):  # En az 1 gün ara
-                    # Gün tiplerini kontrol et
-                    if self.get_weekday_type(day1) != self.get_weekday_type(day2):
-                        continue
-                    
-                    doctors1 = improved_schedule[day1]
-                    doctors2 = improved_schedule[day2]
-                    
-                    # Takas dene
-                    for i, doctor1 in enumerate(doctors1):
-                        for j, doctor2 in enumerate(doctors2):
-                            # Takas yap
-                            new_doctors1 = doctors1.copy()
-                            new_doctors2 = doctors2.copy()
-                            new_doctors1[i] = doctor2
-                            new_doctors2[j] = doctor1
-                            
-                            # Yeni memnuniyeti hesapla
-                            old_satisfaction = 0
-                            new_satisfaction = 0
-                            
-                            # Doctor1 için
-                            prefs1 = self.preferences.get(doctor1, {})
-                            if day1 in prefs1.get('pozitif', []):
-                                old_satisfaction += 10
-                            elif day1 in prefs1.get('negatif', []):
-                                old_satisfaction -= 10
-                            
-                            if day2 in prefs1.get('pozitif', []):
-                                new_satisfaction += 10
-                            elif day2 in prefs1.get('negatif', []):
-                                new_satisfaction -= 10
-                            
-                            # Doctor2 için
-                            prefs2 = self.preferences.get(doctor2, {})
-                            if day2 in prefs2.get('pozitif', []):
-                                old_satisfaction += 10
-                            elif day2 in prefs2.get('negatif', []):
-                                old_satisfaction -= 10
-                            
-                            if day1 in prefs2.get('pozitif', []):
-                                new_satisfaction += 10
-                            elif day1 in prefs2.get('negatif', []):
-                                new_satisfaction -= 10
-                            
-                            # İyileştirme varsa uygula
-                            if new_satisfaction > old_satisfaction:
-                                improved_schedule[day1] = new_doctors1
-                                improved_schedule[day2] = new_doctors2
-                                improvements += 1
-            
-            self.optimization_log.append(f"✅ ML ile {improvements} iyileştirme yapıldı")
-            return improved_schedule
+                try:
+                    futures = {executor.submit(_run_portfolio_arm, arm, end - perf_counter(), incumbent): arm
+                               for arm in arms}
+                    pending = set(futures)
+                    while pending and not proved_optimal:
+                        remaining = end - perf_counter()
+                        if remaining <= 0:
+                            break
+                        finished, pending = wait(pending, timeout=min(0.1, remaining), return_when=FIRST_COMPLETED)
+                        drain()
+                        for future in finished:
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                self.optimization_log.append(f"❌ Portföy kolu {futures[future]} hatası: {str(e)}")
+                                continue
+                            self.optimization_log.extend(result['log'])
+                            offer('linear_programming' if futures[future] == 'lp' else 'local_search',
+                                  result['schedule'])
+                            proved_optimal |= result['optimal']
+                    drain()
+                finally:
+                    # Kaybeden kollar durma olayını ancak parça aralarında görür; beklemeden sonlandırılır.
+                    # LP süre sınırı kalan süreye kısıldığı için CBC alt süreci de en geç süre sonunda biter
+                    stop_event.set()
+                    terminate_executor(executor)
+            else:
+                for arm in arms:
+                    if proved_optimal or perf_counter() >= end:
+                        break
+                    result = self.run_portfolio_arm(arm, end - perf_counter(), best['schedule'], offer,
+                                                    lambda: perf_counter() >= end)
+                    offer('linear_programming' if arm == 'lp' else 'local_search', result['schedule'])
+                    proved_optimal |= result['optimal']
             
-        except Exception as e:
-            self.optimization_log.append(f"⚠️  ML hatası: {str(e)}")
-            return schedule
+            # LP optimal bitirdiyse kalan sürede en iyi çözüm cilalanır
+            remaining = end - perf_counter()
+            if best['engine'] == 'linear_programming' and remaining > 0:
+                offer('local_search', self.local_search_optimize(
+                    best['schedule'], time_limit=self.local_search_limit(remaining)))
+        
+        self.optimization_log.append(
+            f"🏁 Portföy bitti ({perf_counter() - start:.2f} sn): en iyi {best['engine']}, "
+            f"amaç {best['objective']:.1f}{', LP optimal' if proved_optimal else ''}"
+        )
+        self.algorithm_used = f"portfolio:{best['engine']}"
+        return best['schedule']
+    
+    def cache_key(self) -> str:
+        """Tercihler, takvim, kurallar ve çözücü ayarlarından kanonik önbellek anahtarı"""
+        # Doktor sırası indeksi ve sonucu etkilediği için verildiği sırayla (liste olarak) anahtarlanır
+        preferences = []
+        for doctor in self.doctors:
+            prefs = self.preferences.get(doctor, {})
+            preferences.append([doctor, {
+                'pozitif': sorted({int(day) for day in prefs.get('pozitif', [])}),
+                'negatif': sorted({int(day) for day in prefs.get('negatif', [])}),
+            }])
+        
+        return ResultCache.make_key({
+            'preferences': preferences,
+            'calendar': self.calendar.key(),
+            'history': {doctor: self.history[doctor] for doctor in sorted(self.history)},
+            'rules': {rule: getattr(self, rule) for rule in self.RULE_NAMES},
+            'weights': {name: getattr(self, name) for name in self.WEIGHT_NAMES},
+            'ga_options': {k: v for k, v in self.ga_options.items() if k != 'workers'},
+            'local_search_options': self.local_search_options,
+            'solver_options': {k: v for k, v in self.solver_options.items() if k != 'msg'},
+            'decomposition_options': {k: v for k, v in self.decomposition_options.items() if k != 'workers'},
+            'portfolio_options': {k: v for k, v in self.portfolio_options.items() if k != 'workers'},
+        })
+    
+    def restore_cached_report(self, report: Dict) -> None:
+        """Önbellekten gelen raporla optimizatör durumunu doldurur"""
+        self.cache_hit = True
+        self._cached_report = report
+        self.schedule = self.as_schedule(report['schedule'])
+        self.quality_score = report['quality_metrics']['quality_score']
+        self.algorithm_used = report['quality_metrics'].get('algorithm_used')
+        self.optimization_log.append("♻️  Sonuç önbellekten alındı")
     
     def generate_optimal_schedule(self) -> Dict:
         """Ana optimizasyon fonksiyonu"""
+        if self.cache is not None:
+            self._cache_key = self.cache_key()
+            cached = self.cache.get(self._cache_key)
+            self.metrics.count('cache_hits' if cached is not None else 'cache_misses')
+            if cached is not None:
+                self.restore_cached_report(cached)
+                return self.schedule
+        
         self.optimization_log.append("🚀 Akıllı çizelge optimizasyonu başlatılıyor...")
-        self.optimization_log.append(f"📊 {len(self.doctors)} doktor, {self.days_in_month} gün")
+        self.optimization_log.append(f"📊 {len(self.doctors)} doktor, {self.num_days} gün")
         
-        # 1. Linear Programming dene
-        schedule = self.linear_programming_optimize()
+        # 0. Ön kontrol: çözümsüzlüğü kesin olan motorlar hiç çalıştırılmaz
+        feasibility = self.check_feasibility()
+        self.log_feasibility()
         
-        # 2. LP başarısız olursa GA kullan
-        if schedule is None:
+        # Portföy modu: motorlar süre sınırı içinde yarışır, cilalama kendi içinde yapılır
+        if self.portfolio_options['enabled']:
+            schedule = self.portfolio_optimize()
+            if schedule:
+                self.accept_schedule(schedule)
+            return schedule
+        
+        # 1. Linear Programming dene (uzun ufukta pencerelere ayrıştırarak)
+        if not feasibility['lp_feasible']:
+            schedule = None
+        elif self.use_decomposition():
+            schedule = self.decomposition_optimize()
+            self.algorithm_used = 'decomposition'
+        else:
+            schedule = self.linear_programming_optimize()
+            self.algorithm_used = 'linear_programming'
+        
+        # 2. LP başarısız olursa GA kullan (kurallar hiç sağlanamıyorsa GA da sonuçsuz kalır)
+        if schedule is None and feasibility['rules_feasible']:
             self.optimization_log.append("🔄 LP başarısız, GA'ya geçiliyor...")
             schedule = self.genetic_algorithm_optimize()
+            self.algorithm_used = 'genetic_algorithm'
         
         # 3. Hala çözüm yoksa basit algoritma
         if schedule is None:
             self.optimization_log.append("🔄 GA başarısız, basit algoritma kullanılıyor...")
             schedule = self.simple_greedy_algorithm()
+            self.algorithm_used = 'greedy'
         
-        # 4. ML ile iyileştir
+        # 4. Yerel arama ile iyileştir
         if schedule:
-            schedule = self.machine_learning_enhance(schedule)
-            self.schedule = schedule
+            schedule = self.local_search_enhance(schedule)
+            self.accept_schedule(schedule)
         
         return schedule
     
+    def accept_schedule(self, schedule: Dict) -> None:
+        """Seçilen son çizelgeyi kaydeder; kalite skoru her yolda ortak amaçtan (evaluate_schedule) hesaplanır"""
+        self.schedule = schedule
+        self.quality_score = self.evaluate_schedule(schedule) / (self.num_days * len(self.doctors))
+        self.optimization_log.append(f"🎯 Kalite skoru: {self.quality_score:.2f}")
+    
+    @staticmethod
+    def normalize_schedule(schedule: Dict) -> Dict:
+        """JSON'dan gelen çizelgenin gün anahtarlarını tamsayıya çevirir"""
+        return {int(day): list(doctors) for day, doctors in schedule.items()}
+    
+    def apply_preference_changes(self, preference_changes: Dict) -> None:
+        """Doktor tercih değişikliklerini uygular (None değeri doktoru çıkarır) ve indeksi yeniler"""
+        self.preferences = dict(self.preferences)
+        for doctor, prefs in preference_changes.items():
+            if prefs is None:
+                self.preferences.pop(doctor, None)
+            else:
+                self.preferences.update(self.calendar.normalize_preferences({doctor: prefs}))
+        
+        self.doctors = list(self.preferences.keys())
+        self.num_doctors = len(self.doctors)
+        self.pref_index = self.build_preference_index()
+        self.feasibility = {}
+        self.shift_floors = None
+    
+    def find_affected_days(self, old_index: PreferenceIndex, preference_changes: Dict,
+                           previous_schedule: Dict) -> List[int]:
+        """Tercih değişikliğinden etkilenen günleri bulur"""
+        empty_row = np.zeros(self.num_days, dtype=bool)
+        new_index = self.pref_index
+        affected = set()
+        
+        for doctor in preference_changes:
+            rows = []
+            for index in (old_index, new_index):
+                doctor_id = index.doctor_ids.get(doctor)
+                if doctor_id is None:
+                    rows.append((empty_row, empty_row))
+                else:
+                    rows.append((index.positive_mask[doctor_id], index.negative_mask[doctor_id]))
+            (old_pos, old_neg), (new_pos, new_neg) = rows
+            changed = (old_pos != new_pos) | (old_neg != new_neg)
+            affected.update(int(day) + 1 for day in np.flatnonzero(changed))
+            
+            # Çıkarılan doktorun tüm nöbet günleri yeniden doldurulmalı
+            if doctor not in new_index.doctor_ids:
+                affected.update(day for day, doctors in previous_schedule.items() if doctor in doctors)
+        
+        return sorted(day for day in affected if 1 <= day <= self.num_days)
+    
+    def repair_schedule(self, previous_schedule: Dict, affected_days: List[int],
+                        changed_doctors: List[str]) -> Dict:
+        """Önceki çizelgeyi yalnızca etkilenen günlerde onarır"""
+        index = self.pref_index
+        schedule = {day: [doctor for doctor in previous_schedule.get(day, []) if doctor in index.doctor_ids]
+                    for day in range(1, self.num_days + 1)}
+        
+        # Değişen doktorları yeni negatif günlerinden çıkar
+        changed = set(changed_doctors)
+        for day in affected_days:
+            schedule[day] = [doctor for doctor in schedule[day]
+                             if doctor not in changed or not index.is_negative(index.doctor_ids[doctor], day)]
+        
+        doctor_shift_counts = {doctor: 0 for doctor in self.doctors}
+        month_counts = {}
+        for day, doctors in schedule.items():
+            for doctor in doctors:
+                doctor_shift_counts[doctor] += 1
+                self.count_month_shift(month_counts, doctor, day)
+        
+        # Boşalan yerleri kurallara uyan en iyi adaylarla doldur
+        for day in affected_days:
+            required = self.get_required_doctors(day)
+            while len(schedule[day]) < required:
+                candidates = [
+                    doctor for doctor in self.doctors
+                    if doctor not in schedule[day]
+                    and doctor not in schedule.get(day - 1, [])
+                    and doctor not in schedule.get(day + 1, [])
+                    and doctor_shift_counts[doctor] < self.max_shifts
+                    and not self.month_full(month_counts, doctor, day)
+                ] or [doctor for doctor in self.doctors if doctor not in schedule[day]]
+                if not candidates:
+                    break
+                
+                best = max(candidates, key=lambda doctor: (
+                    index.score(index.doctor_ids[doctor], day)
+                    + (self.doctor_targets[index.doctor_ids[doctor]] - doctor_shift_counts[doctor]) * self.IMBALANCE_WEIGHT
+                ))
+                schedule[day].append(best)
+                doctor_shift_counts[best] += 1
+                self.count_month_shift(month_counts, best, day)
+        
+        return self.local_search_optimize(schedule, days=affected_days)
+    
+    def incremental_optimize(self, previous_schedule: Dict, preference_changes: Dict,
+                             mode: str = 'repair') -> Dict:
+        """Birkaç doktorun tercihi değiştiğinde çizelgeyi artımlı olarak günceller"""
+        previous = self.normalize_schedule(previous_schedule)
+        old_index = self.pref_index
+        self._cache_key = None
+        self.apply_preference_changes(preference_changes)
+        affected_days = self.find_affected_days(old_index, preference_changes, previous)
+        
+        self.optimization_log.append(
+            f"♻️  Artımlı çözüm ({mode}): {len(preference_changes)} doktor değişti, "
+            f"{len(affected_days)} gün etkilendi"
+        )
+        
+        if mode == 'warm_start':
+            schedule = None
+            if self.check_feasibility()['lp_feasible']:
+                schedule = self.linear_programming_optimize(previous_schedule=previous)
+        else:
+            schedule = self.repair_schedule(previous, affected_days, list(preference_changes))
+        self.algorithm_used = f"incremental_{mode}"
+        
+        if not schedule:
+            self.optimization_log.append("🔄 Artımlı çözüm başarısız, tam çözüme geçiliyor...")
+            return self.generate_optimal_schedule()
+        
+        churn = sum(len(set(previous.get(day, [])) - set(doctors)) for day, doctors in schedule.items())
+        self.optimization_log.append(f"✅ Artımlı çözüm tamamlandı: {churn} atama değişti")
+        
+        self.accept_schedule(schedule)
+        return schedule
+    
     def simple_greedy_algorithm(self) -> Dict:
         """Basit greedy algoritma"""
+        with self.metrics.phase('greedy'):
+            return self._simple_greedy_algorithm()
+    
+    def _simple_greedy_algorithm(self) -> Dict:
         try:
             self.optimization_log.append("🎯 Basit greedy algoritma başlatılıyor...")
             
-            schedule = {}
+            index = self.pref_index
+            targets = self.doctor_targets.tolist()
+            schedule = Schedule(index.doctors, self.num_days)
             doctor_shift_counts = {doctor: 0 for doctor in self.doctors}
+            month_counts = {}
             
-            for day in range(1, self.days_in_month + 1):
-                day_type = self.get_weekday_type(day)
-                required = self.WEEKEND_DOCTORS_NEEDED if day_type == "weekend" else self.WEEKDAY_DOCTORS_NEEDED
+            for day in range(1, self.num_days + 1):
+                required = self.get_required_doctors(day)
                 
                 # Uygun doktorları bul
                 available_doctors = []
                 for doctor in self.doctors:
                     # Ardışık nöbet kontrolü
-                    if day > 1 and doctor in schedule.get(day - 1, []):
+                    if day > 1 and schedule.is_assigned(index.doctor_ids[doctor], day - 1):
                         continue
-                    if doctor_shift_counts[doctor] < self.MAX_SHIFTS_PER_DOCTOR:
+                    if (doctor_shift_counts[doctor] < self.max_shifts
+                            and not self.month_full(month_counts, doctor, day)):
                         available_doctors.append(doctor)
                 
                 # Tercihlere göre sırala
                 def doctor_priority(doctor):
-                    prefs = self.preferences.get(doctor, {})
-                    score = 0
-                    
-                    if day in prefs.get('pozitif', []):
-                        score += 10
-                    elif day in prefs.get('negatif', []):
-                        score -= 10
+                    score = index.score(index.doctor_ids[doctor], day)
                     
                     # Az nöbet tutmuş doktorları öncelendir
-                    score += (self.TARGET_SHIFTS_PER_DOCTOR - doctor_shift_counts[doctor]) * 2
+                    score += (targets[index.doctor_ids[doctor]] - doctor_shift_counts[doctor]) * 2
                     
                     return score
                 
@@ -493,10 +2516,11 @@ class NobetOptimizer:
                 
                 # Gerekli sayıda doktor seç
                 selected = available_doctors[:required]
-                schedule[day] = selected
                 
                 for doctor in selected:
+                    schedule.assign(index.doctor_ids[doctor], day)
                     doctor_shift_counts[doctor] += 1
+                    self.count_month_shift(month_counts, doctor, day)
             
             self.optimization_log.append("✅ Basit algoritma tamamlandı")
             return schedule
@@ -505,26 +2529,102 @@ class NobetOptimizer:
             self.optimization_log.append(f"❌ Basit algoritma hatası: {str(e)}")
             return {}
     
+    @staticmethod
+    def satisfaction_score(positive_matches: int, negative_matches: int, total_shifts: int) -> float:
+        """Doktorun nöbet başına memnuniyet puanı"""
+        return (positive_matches * 10 - negative_matches * 10) / max(1, total_shifts)
+    
+    def write_report_stream(self, stream, day_masks: bool = False) -> Dict:
+        """Raporu bellekte kurmadan JSON Lines kayıtları olarak yazar; 'summary' kaydını döndürür"""
+        report_start = perf_counter()
+        index = self.pref_index
+        schedule = self.as_schedule(self.schedule)
+        doctors = list(index.doctors)
+        shifts = [0] * len(doctors)
+        positive = [0] * len(doctors)
+        negative = [0] * len(doctors)
+        masks = [0] * len(doctors)
+        
+        def emit(record):
+            stream.write(dumps_json(record) + "\n")
+        
+        emit({'type': 'header', 'format': 'stream', 'doctors': doctors, 'calendar': self.calendar.as_dict()})
+        for day in range(1, self.num_days + 1):
+            ids = schedule.doctor_ids_on(day)
+            for doctor_id in ids:
+                shifts[doctor_id] += 1
+                positive[doctor_id] += index.is_positive(doctor_id, day)
+                negative[doctor_id] += index.is_negative(doctor_id, day)
+                masks[doctor_id] |= 1 << day
+            emit({'type': 'day', 'day': day, 'doctors': ids})
+        
+        for doctor_id in range(len(doctors)):
+            record = {
+                'type': 'doctor',
+                'id': doctor_id,
+                'total_shifts': shifts[doctor_id],
+                'positive_matches': positive[doctor_id],
+                'negative_matches': negative[doctor_id],
+                'satisfaction_score': self.satisfaction_score(positive[doctor_id], negative[doctor_id],
+                                                              shifts[doctor_id]),
+            }
+            if day_masks:
+                record['day_mask'] = format(masks[doctor_id], 'x')
+            emit(record)
+        
+        total_shifts = sum(shifts)
+        self.metrics.record('report', perf_counter() - report_start)
+        summary = {
+            'type': 'summary',
+            'optimization_log': self.optimization_log,
+            'quality_metrics': {
+                'overall_satisfaction': (sum(positive) * 10 - sum(negative) * 10) / max(1, total_shifts),
+                'quality_score': self.quality_score,
+                'total_shifts': total_shifts,
+                'algorithm_used': self.algorithm_used or "Bilinmiyor"
+            },
+            'feasibility': self.feasibility,
+            'history': self.updated_history(schedule),
+            'cache_hit': self.cache_hit,
+            'metrics': self.metrics.as_dict(),
+        }
+        emit(summary)
+        return summary
+    
     def generate_report(self) -> Dict:
         """Çizelge raporu oluşturur"""
         if not self.schedule:
             return {"error": "Çizelge oluşturulamadı"}
         
-        # İstatistikler hesapla
+        if self._cached_report is not None:
+            report = dict(self._cached_report)
+            # Önbellek işareti restore_cached_report'ta bu çalıştırmanın günlüğüne eklenmiştir
+            report['optimization_log'] = report['optimization_log'] + self.optimization_log
+            report['cache_hit'] = True
+            report['metrics'] = self.metrics.as_dict()
+            return report
+        
+        report_start = perf_counter()
+        
+        # İstatistikler hesapla (doktor x gün matrisi üzerinde vektörel)
+        index = self.pref_index
+        schedule = self.as_schedule(self.schedule)
+        shift_counts = schedule.shift_counts().tolist()
+        positive_counts = (schedule.matrix * index.positive_mask).sum(axis=1).tolist()
+        negative_counts = (schedule.matrix * index.negative_mask).sum(axis=1).tolist()
+        
         doctor_stats = {}
-        for doctor in self.doctors:
-            assigned_days = [day for day, doctors in self.schedule.items() if doctor in doctors]
-            prefs = self.preferences.get(doctor, {})
-            
-            positive_matches = len([day for day in assigned_days if day in prefs.get('pozitif', [])])
-            negative_matches = len([day for day in assigned_days if day in prefs.get('negatif', [])])
+        for doctor_id, doctor in enumerate(index.doctors):
+            positive_matches = positive_counts[doctor_id]
+            negative_matches = negative_counts[doctor_id]
             
             doctor_stats[doctor] = {
-                'total_shifts': len(assigned_days),
-                'assigned_days': assigned_days,
+                'total_shifts': shift_counts[doctor_id],
+                'assigned_days': schedule.days_of(doctor_id),
                 'positive_matches': positive_matches,
                 'negative_matches': negative_matches,
-                'satisfaction_score': (positive_matches * 10 - negative_matches * 10) / max(1, len(assigned_days))
+                'satisfaction_score': self.satisfaction_score(positive_matches, negative_matches,
+                                                              shift_counts[doctor_id])
             }
         
         # Genel istatistikler
@@ -532,48 +2632,446 @@ class NobetOptimizer:
                                for stats in doctor_stats.values())
         average_satisfaction = total_satisfaction / sum(stats['total_shifts'] for stats in doctor_stats.values())
         
-        return {
-            'schedule': self.schedule,
+        report = {
+            'schedule': schedule.to_dict(),
             'doctor_stats': doctor_stats,
             'optimization_log': self.optimization_log,
             'quality_metrics': {
                 'overall_satisfaction': average_satisfaction,
                 'quality_score': self.quality_score,
-                'total_shifts': sum(len(doctors) for doctors in self.schedule.values()),
-                'algorithm_used': self.optimization_log[-2] if len(self.optimization_log) > 1 else "Bilinmiyor"
-            }
+                'total_shifts': sum(shift_counts),
+                'algorithm_used': self.algorithm_used or "Bilinmiyor"
+            },
+            'calendar': self.calendar.as_dict(),
+            'feasibility': self.feasibility,
+            'history': self.updated_history(schedule),
+            'cache_hit': False
         }
+        
+        self.metrics.record('report', perf_counter() - report_start)
+        report['metrics'] = self.metrics.as_dict()
+        if self.metrics.callback is not None:
+            self.metrics.callback({'type': 'report', 'metrics': report['metrics']})
+        
+        # Yalnızca tam çözümler önbelleğe yazılır (artımlı çözümler değil)
+        if self.cache is not None and self._cache_key is not None:
+            self.cache.put(self._cache_key, report)
+        
+        return report
+
+def dumps_json(data, indent: bool = False) -> str:
+    """JSON metni üretir; orjson kuruluysa onu kullanır"""
+    if ORJSON_AVAILABLE:
+        orjson = import_engine('orjson')
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+def compact_report(report: Dict, day_masks: bool = False) -> Dict:
+    """Raporu sıkı biçime çevirir: doktorlar tek isim tablosunda, atamalar tamsayı kimliklerle"""
+    if 'error' in report:
+        return report
+    
+    doctors = list(report['doctor_stats'])
+    doctor_ids = {doctor: i for i, doctor in enumerate(doctors)}
+    schedule = {int(day): names for day, names in report['schedule'].items()}
+    stats = report['doctor_stats'].values()
+    
+    compact = {'format': 'compact', 'doctors': doctors}
+    if day_masks:
+        masks = [0] * len(doctors)
+        for day, names in schedule.items():
+            for name in names:
+                masks[doctor_ids[name]] |= 1 << day
+        compact['day_masks'] = [format(mask, 'x') for mask in masks]
+    else:
+        compact['schedule'] = [[doctor_ids[name] for name in schedule.get(day, [])]
+                               for day in range(1, max(schedule, default=0) + 1)]
+    compact['doctor_stats'] = {key: [row[key] for row in stats]
+                               for key in ('total_shifts', 'positive_matches', 'negative_matches',
+                                           'satisfaction_score')}
+    compact.update({key: value for key, value in report.items()
+                    if key not in ('schedule', 'doctor_stats')})
+    return compact
+
+def solve_job(job: Dict, defaults: Optional[Dict] = None) -> Dict:
+    """Tek bir toplu çizelgeleme işini çözer; hata durumunda hata kaydı döndürür"""
+    defaults = defaults or {}
+    job_id = job.get('id') if isinstance(job, dict) else None
+    
+    try:
+        if not isinstance(job, dict) or not isinstance(job.get('preferences'), dict):
+            raise ValueError("İş 'preferences' nesnesi içermeli")
+        
+        options = {}
+        for key in ('ga_options', 'local_search_options', 'solver_options', 'decomposition_options',
+                    'portfolio_options'):
+            options[key] = dict(defaults.get(key) or {})
+            options[key].update(job.get(key) or {})
+        
+        optimizer = NobetOptimizer(job['preferences'],
+                                   month=job.get('month', 7),
+                                   year=job.get('year', 2025),
+                                   months=job.get('months', 1),
+                                   holidays=job.get('holidays'),
+                                   rules=job.get('rules'),
+                                   history=job.get('history'),
+                                   cache=get_result_cache(defaults.get('cache')),
+                                   **options)
+        # Servis, işin tüm motorlarının bitmesi gereken anı (time()) iletir
+        optimizer.deadline = job.get('deadline')
+        
+        if not optimizer.generate_optimal_schedule():
+            return {'id': job_id, 'success': False, 'error': "Çizelge oluşturulamadı",
+                    'feasibility': optimizer.feasibility,
+                    'optimization_log': optimizer.optimization_log}
+        
+        report = optimizer.generate_report()
+        output = dict(defaults.get('output') or {})
+        output.update(job.get('output') or {})
+        if output.get('format') == 'compact':
+            report = compact_report(report, output.get('day_masks', False))
+        
+        return {'id': job_id, 'success': True, 'report': report}
+        
+    except Exception as e:
+        return {'id': job_id, 'success': False, 'error': str(e)}
+
+def score_job(job: Dict) -> Dict:
+    """Çözmeden aday çizelgeleri puanlar (NobetOptimizer.score_schedules)"""
+    job_id = job.get('id') if isinstance(job, dict) else None
+    
+    try:
+        if not isinstance(job, dict) or not isinstance(job.get('preferences'), dict):
+            raise ValueError("İş 'preferences' nesnesi içermeli")
+        if not isinstance(job.get('candidates'), (list, dict)):
+            raise ValueError("İş 'candidates' listesi içermeli")
+        
+        optimizer = NobetOptimizer(job['preferences'],
+                                   month=job.get('month', 7),
+                                   year=job.get('year', 2025),
+                                   months=job.get('months', 1),
+                                   holidays=job.get('holidays'),
+                                   rules=job.get('rules'),
+                                   history=job.get('history'))
+        results = optimizer.score_schedules(job['candidates'], base=job.get('base') or {},
+                                            doctor_stats=job.get('doctor_stats', True))
+        return {'id': job_id, 'success': True, 'results': results}
+        
+    except Exception as e:
+        return {'id': job_id, 'success': False, 'error': str(e)}
+
+def run_batch(input_stream, output_stream, workers: Optional[int] = None,
+              defaults: Optional[Dict] = None, store=None) -> Tuple[int, int]:
+    """JSONL işlerini çözer, her sonucu bitince tek satır yazar; (başarılı, başarısız) döndürür
+    
+    Girdi satır satır okunur ve en fazla 2 x workers iş bekler; açık kalan stdin de kullanılabilir.
+    """
+    counts = {True: 0, False: 0}
+    
+    def emit(result, job=None):
+        if store is not None and result['success'] and isinstance(job, dict) and job.get('tenant'):
+            try:
+                result['version'] = store.save_report(job['tenant'], result['report'])
+            except Exception as e:
+                result['storage_error'] = str(e)
+        output_stream.write(dumps_json(result) + "\n")
+        output_stream.flush()
+        counts[bool(result['success'])] += 1
+    
+    def parse(line_number, line):
+        """Satırı işe çevirir; hatada hata kaydını yazıp None döndürür"""
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            emit({'id': None, 'line': line_number, 'success': False, 'error': f"JSON format hatası: {str(e)}"})
+            return None
+        if isinstance(job, dict) and 'id' not in job:
+            job['id'] = line_number
+        if store is not None and isinstance(job, dict) and job.get('tenant') and 'preferences' not in job:
+            from schedule_storage import period_key
+            try:
+                period = period_key(job.get('year', 2025), job.get('month', 7))
+                preferences = store.load_preferences(job['tenant'], period)
+                if not preferences:
+                    raise ValueError(f"Depoda tercih bulunamadı: {job['tenant']} {period}")
+            except Exception as e:
+                emit({'id': job['id'], 'success': False, 'error': f"Tercihler okunamadı: {str(e)}"})
+                return None
+            job['preferences'] = preferences
+        return job
+    
+    workers = max(1, workers or os.cpu_count() or 1)
+    
+    if workers == 1:
+        for line_number, line in enumerate(input_stream, 1):
+            job = parse(line_number, line) if line.strip() else None
+            if job is not None:
+                emit(solve_job(job, defaults), job)
+        return counts[True], counts[False]
+    
+    # Okuma ayrı iş parçacığında yapılır: stdin beklenirken biten sonuçlar da hemen yazılır.
+    # Satırlar, sonuçlar ve dosya sonu tek kuyruktan gelir; depo ve çıktı yalnızca bu
+    # iş parçacığında kullanılır. Semafor okunmuş ama bitmemiş iş sayısını sınırlar.
+    import queue
+    import threading
+    events = queue.Queue()
+    slots = threading.Semaphore(2 * workers)
+    
+    def read_lines():
+        try:
+            for line_number, line in enumerate(input_stream, 1):
+                slots.acquire()
+                events.put(('line', line_number, line))
+            events.put(('eof', None, None))
+        except Exception as e:
+            events.put(('eof', None, e))
+    
+    # Okuyucu iş parçacığı stdin kilidini tutarken fork edilen işçi stdin'i kapatırken kilitlenir
+    context = (multiprocessing.get_context('forkserver')
+               if 'forkserver' in multiprocessing.get_all_start_methods() else None)
+    reader = threading.Thread(target=read_lines, name='batch-reader', daemon=True)
+    reader.start()
+    in_flight = 0
+    reading = True
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        while reading or in_flight:
+            # ('line', satır no, metin) | ('result', iş, future) | ('eof', None, okuma hatası)
+            kind, key, value = events.get()
+            if kind == 'eof':
+                reading = False
+                if value is not None:
+                    raise value
+                continue
+            if kind == 'line':
+                job = parse(key, value) if value.strip() else None
+                if job is None:
+                    slots.release()
+                    continue
+                try:
+                    future = executor.submit(solve_job, job, defaults)
+                except Exception as e:
+                    # Bozulan havuza yeni iş verilemez; iş hata kaydıyla biter
+                    emit({'id': job.get('id') if isinstance(job, dict) else None, 'success': False,
+                          'error': str(e)}, job)
+                    slots.release()
+                    continue
+                future.add_done_callback(lambda future, job=job: events.put(('result', job, future)))
+                in_flight += 1
+                continue
+            try:
+                result = value.result()
+            except Exception as e:
+                # İşçi süreci çökse bile diğer işler devam eder
+                result = {'id': key.get('id') if isinstance(key, dict) else None, 'success': False,
+                          'error': str(e)}
+            emit(result, key)
+            in_flight -= 1
+            slots.release()
+    
+    return counts[True], counts[False]
+
+def print_startup_profile(main_start: float):
+    """Modül yükleme ve motor içe aktarma sürelerini stderr'e yazar"""
+    print("⏱️  Başlangıç profili:", file=sys.stderr)
+    print(f"  modül yükleme: {(main_start - _MODULE_START) * 1000:.1f} ms", file=sys.stderr)
+    for name, elapsed in IMPORT_TIMES.items():
+        print(f"  import {name}: {elapsed * 1000:.1f} ms", file=sys.stderr)
 
 def main():
     """Ana çalıştırma fonksiyonu"""
+    main_start = perf_counter()
     parser = argparse.ArgumentParser(description='NöbetSihirbazı Akıllı Çizelge Optimizatörü')
-    parser.add_argument('--input', '-i', required=True, help='Tercihler JSON dosyası')
-    parser.add_argument('--output', '-o', default='optimized_schedule.json', help='Çıktı dosyası')
+    parser.add_argument('--input', '-i', help='Tercihler JSON dosyası')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Çıktı dosyası (varsayılan: optimized_schedule.json, toplu modda stdout)')
+    parser.add_argument('--batch', '-b', help="Toplu mod: JSONL iş dosyası ('-' ile stdin)")
+    parser.add_argument('--workers', type=int, default=None, help='Toplu mod işçi süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--format', choices=['full', 'compact', 'stream'], default='full',
+                        help='Çıktı biçimi: full (girintili), compact (kimlikli, girintisiz) veya stream (JSON Lines)')
+    parser.add_argument('--day-masks', action='store_true',
+                        help='compact/stream biçiminde gün listeleri yerine bit maskeleri yaz')
     parser.add_argument('--verbose', '-v', action='store_true', help='Detaylı log')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Modül ve motor içe aktarma sürelerini stderr'e yaz (girdi yoksa yalnızca ölç)")
+    parser.add_argument('--month', type=int, default=7, help='Ufkun ilk ayı (1-12)')
+    parser.add_argument('--year', type=int, default=2025, help='Ufkun ilk ayının yılı')
+    parser.add_argument('--months', type=int, default=1, help='Ufuktaki ay sayısı (ör. çeyrek için 3)')
+    parser.add_argument('--holiday', action='append', default=[],
+                        help='Ek tatil günü (ISO tarih, tekrarlanabilir)')
+    parser.add_argument('--no-public-holidays', action='store_true',
+                        help='Resmi tatilleri hafta sonu kadrosuyla tutma')
+    parser.add_argument('--seed', type=int, default=None, help='GA rastgelelik tohumu (tekrarlanabilir sonuç)')
+    parser.add_argument('--ga-islands', type=int, default=1, help='GA ada (bağımsız popülasyon) sayısı')
+    parser.add_argument('--ga-workers', type=int, default=None, help='Ada modeli işçi süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--ga-migration-interval', type=int, default=20, help='Adalar arası göç aralığı (nesil)')
+    parser.add_argument('--ls-strategy', choices=['first', 'best'], default='first', help='Yerel arama iyileştirme stratejisi')
+    parser.add_argument('--ls-time-limit', type=float, default=5.0, help='Yerel arama süre sınırı (saniye)')
+    parser.add_argument('--solver', default='cbc', help='LP çözücüsü (cbc, highs, glpk, gurobi, cplex, scip)')
+    parser.add_argument('--time-limit', type=float, default=None, help='LP çözüm süre sınırı (saniye)')
+    parser.add_argument('--mip-gap', type=float, default=None, help='LP göreli MIP gap toleransı')
+    parser.add_argument('--threads', type=int, default=None, help='LP çözücü iş parçacığı sayısı')
+    parser.add_argument('--decompose', choices=['auto', 'on', 'off'], default='auto',
+                        help='Ufku örtüşen hafta pencerelerine bölerek çöz (auto: 120 günden uzunsa)')
+    parser.add_argument('--window-days', type=int, default=28, help='Ayrıştırma pencere uzunluğu (gün)')
+    parser.add_argument('--window-overlap', type=int, default=7, help='Pencereler arası örtüşme (gün)')
+    parser.add_argument('--decompose-workers', type=int, default=None,
+                        help='Ayrıştırma işçi süreç sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--portfolio', action='store_true',
+                        help='LP ve GA + yerel aramayı eşzamanlı yarıştır, süre sınırında en iyisini döndür')
+    parser.add_argument('--deadline', type=float, default=30.0, help='Portföy süre sınırı (saniye)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Her fazı cProfile ve yığın örneklemesiyle profille; <çıktı>.profile dizinine yaz')
+    parser.add_argument('--metrics-prometheus', help='Ölçümleri Prometheus metin biçiminde bu dosyaya yaz')
+    parser.add_argument('--check-feasibility', action='store_true',
+                        help='Çözmeden yalnızca ön kontrolü çalıştır; sorunlu gün ve doktorları yazdır')
+    parser.add_argument('--store', help="Çizelge deposu: SQLite dosyası veya 'supabase' (SUPABASE_URL/SUPABASE_KEY)")
+    parser.add_argument('--tenant', default='default', help='Depodaki kurum kimliği')
+    parser.add_argument('--cache-dir', help='Sonuç önbelleği dizini (aynı problem tekrar çözülmez)')
+    parser.add_argument('--cache-size-mb', type=float, default=100, help='Disk önbelleği boyut sınırı (MB)')
+    parser.add_argument('--history', help='Aylar arası adalet için doktor geçmişi JSON dosyası (veya önceki ayın raporu)')
+    parser.add_argument('--previous-schedule', help='Artımlı çözüm için önceki çizelge/rapor JSON dosyası')
+    parser.add_argument('--changes', help='Artımlı çözüm için değişen doktor tercihleri JSON dosyası')
+    parser.add_argument('--incremental-mode', choices=['repair', 'warm_start'], default='repair',
+                        help='Artımlı çözüm yöntemi')
     
     args = parser.parse_args()
     
+    if args.profile_startup:
+        atexit.register(print_startup_profile, main_start)
+        if not args.input and not args.batch:
+            # Yalnızca ölçüm: motor kütüphanelerinin ilk içe aktarma maliyeti
+            for name, available in (('pulp', LP_AVAILABLE), ('deap.algorithms', GA_AVAILABLE)):
+                if available:
+                    import_engine(name)
+            return 0
+    
+    if not args.input and not args.batch and not args.store:
+        parser.error("--input, --batch veya --store gerekli")
+    
+    options = {
+        'ga_options': {
+            'seed': args.seed,
+            'islands': args.ga_islands,
+            'workers': args.ga_workers,
+            'migration_interval': args.ga_migration_interval,
+        },
+        'local_search_options': {
+            'strategy': args.ls_strategy,
+            'time_limit': args.ls_time_limit,
+        },
+        'solver_options': {
+            'backend': args.solver,
+            'time_limit': args.time_limit,
+            'gap': args.mip_gap,
+            'threads': args.threads,
+        },
+        'decomposition_options': {
+            'mode': args.decompose,
+            'window_days': args.window_days,
+            'overlap_days': args.window_overlap,
+            'workers': args.decompose_workers,
+        },
+        'portfolio_options': {
+            'enabled': args.portfolio,
+            'deadline': args.deadline,
+        },
+    }
+    
+    cache_options = None
+    if args.cache_dir:
+        cache_options = {'directory': args.cache_dir, 'max_disk_bytes': int(args.cache_size_mb * 1024 * 1024)}
+    
+    if args.batch:
+        if args.profile:
+            parser.error("--profile toplu modda kullanılamaz (işler ayrı süreçlerde çözülür)")
+        if args.format == 'stream':
+            parser.error("--format stream toplu modda kullanılamaz (her iş tek satırdır)")
+        output = {'format': args.format, 'day_masks': args.day_masks}
+        return run_batch_cli(args, dict(options, cache=cache_options, output=output))
+    
+    args.output = args.output or 'optimized_schedule.json'
+    store = None
+    
     try:
-        # Tercihleri yükle
-        with open(args.input, 'r', encoding='utf-8') as f:
-            preferences_data = json.load(f)
+        # Tercihleri yükle (--input yoksa depodan)
+        if args.store:
+            from schedule_storage import open_store, period_key
+            store = open_store(args.store)
+        if args.input:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                preferences_data = json.load(f)
+        else:
+            preferences_data = store.load_preferences(args.tenant, period_key(args.year, args.month))
+            if not preferences_data:
+                print(f"❌ Depoda tercih bulunamadı: {args.tenant} {period_key(args.year, args.month)}")
+                return 1
         
         print("🚀 NöbetSihirbazı Akıllı Optimizasyon Başlatılıyor...")
         print(f"📊 {len(preferences_data)} doktor tercihi yüklendi")
         
+        history = None
+        if args.history:
+            with open(args.history, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        
         # Optimizatörü başlat
-        optimizer = NobetOptimizer(preferences_data)
+        calendar = ScheduleCalendar(args.year, args.month, args.months, args.holiday,
+                                    include_public_holidays=not args.no_public_holidays)
+        profiler = PhaseProfiler() if args.profile else None
+        optimizer = NobetOptimizer(preferences_data, calendar=calendar, history=history,
+                                   cache=get_result_cache(cache_options), profiler=profiler, **options)
+        
+        if args.check_feasibility:
+            feasibility = optimizer.check_feasibility()
+            optimizer.log_feasibility(limit=len(feasibility['issues']))
+            for log in optimizer.optimization_log:
+                print(f"  {log}")
+            return 0 if feasibility['lp_feasible'] else 1
         
         # Çizelgeyi oluştur
-        schedule = optimizer.generate_optimal_schedule()
+        if args.previous_schedule and args.changes:
+            with open(args.previous_schedule, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            with open(args.changes, 'r', encoding='utf-8') as f:
+                changes = json.load(f)
+            schedule = optimizer.incremental_optimize(previous.get('schedule', previous), changes,
+                                                      mode=args.incremental_mode)
+        else:
+            schedule = optimizer.generate_optimal_schedule()
         
         if schedule:
-            # Raporu oluştur
-            report = optimizer.generate_report()
-            
-            # Sonuçları kaydet
+            # Raporu oluştur ve kaydet
             with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+                if args.format == 'stream':
+                    report = optimizer.write_report_stream(f, args.day_masks)
+                else:
+                    report = optimizer.generate_report()
+                    if args.format == 'compact':
+                        f.write(dumps_json(compact_report(report, args.day_masks)))
+                    else:
+                        f.write(dumps_json(report, indent=True))
+            
+            if args.metrics_prometheus:
+                with open(args.metrics_prometheus, 'w', encoding='utf-8') as f:
+                    f.write(optimizer.metrics.to_prometheus())
+            
+            if profiler is not None:
+                profile_dir = os.path.splitext(args.output)[0] + '.profile'
+                profiler.write(profile_dir)
+                print(f"🔬 Profil: {profile_dir}/ (summary.txt, *.pstats, profile.collapsed)")
+            
+            if store is not None:
+                version = store.save_report(args.tenant, {
+                    'schedule': optimizer.as_schedule(optimizer.schedule).to_dict(),
+                    'calendar': optimizer.calendar.as_dict(),
+                    'quality_metrics': report['quality_metrics'],
+                })
+                print(f"🗄️  Depoya yazıldı: {args.tenant} sürüm {version}")
             
             print(f"✅ Optimizasyon tamamlandı!")
             print(f"📁 Sonuç dosyası: {args.output}")
@@ -588,8 +3086,8 @@ def main():
             print("❌ Çizelge oluşturulamadı!")
             return 1
             
-    except FileNotFoundError:
-        print(f"❌ Dosya bulunamadı: {args.input}")
+    except FileNotFoundError as e:
+        print(f"❌ Dosya bulunamadı: {e.filename or args.input}")
         return 1
     except json.JSONDecodeError:
         print(f"❌ JSON format hatası: {args.input}")
@@ -597,8 +3095,42 @@ def main():
     except Exception as e:
         print(f"❌ Beklenmeyen hata: {str(e)}")
         return 1
+    finally:
+        if store is not None:
+            store.close()
     
     return 0
 
+def run_batch_cli(args, options: Dict) -> int:
+    """--batch modunu çalıştırır; durum mesajları stderr'e yazılır"""
+    input_stream = output_stream = store = None
+    try:
+        if args.store:
+            from schedule_storage import open_store
+            try:
+                store = open_store(args.store)
+            except Exception as e:
+                print(f"❌ Depo açılamadı: {str(e)}", file=sys.stderr)
+                return 1
+        input_stream = sys.stdin if args.batch == '-' else open(args.batch, 'r', encoding='utf-8')
+        output_stream = (sys.stdout if args.output in (None, '-')
+                         else open(args.output, 'w', encoding='utf-8'))
+        
+        print("🚀 NöbetSihirbazı toplu optimizasyon başlatılıyor...", file=sys.stderr)
+        succeeded, failed = run_batch(input_stream, output_stream, args.workers, options, store)
+        print(f"✅ Toplu mod tamamlandı: {succeeded} başarılı, {failed} başarısız", file=sys.stderr)
+        
+    except FileNotFoundError:
+        print(f"❌ Dosya bulunamadı: {args.batch}", file=sys.stderr)
+        return 1
+    finally:
+        for stream in (input_stream, output_stream):
+            if stream is not None and stream not in (sys.stdin, sys.stdout):
+                stream.close()
+        if store is not None:
+            store.close()
+    
+    return 0 if failed == 0 else 2
+
 if __name__ == "__main__":
     exit(main()) 
\ No newline at end of file
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NöbetSihirbazı - Çizelge Deposu
+===============================
+
+Doktor tercihlerini ve optimizatör sonuçlarını kurum (tenant), dönem
+(ufkun ilk ayı, "2025-07") ve sürüm anahtarıyla saklar. Her kayıt yeni bir
+sürüm açar; önceki sürümler ve diğer kurumların çizelgeleri üzerine
+yazılmaz. Bir çizelgenin tüm günleri tek toplu upsert ile yazılır.
+
+Depolar:
+    SQLiteScheduleStore    Yerel dosya (veya ':memory:'), test ve tek makine için
+    SupabaseScheduleStore  supabase-schema.sql'deki tablolar, PostgREST üzerinden
+
+Kullanım:
+    python schedule_optimizer.py --store nobet.db --tenant acil --month 7 --year 2025
+    python schedule_optimizer.py --batch jobs.jsonl --store supabase
+    python schedule_storage.py nobet.db versions acil 2025-07
+    python schedule_storage.py nobet.db schedule acil 2025-07 --version 2
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from schedule_optimizer import ScheduleCalendar, dumps_json
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenant_preferences (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    doctor_name TEXT NOT NULL,
+    positive_days TEXT NOT NULL DEFAULT '[]',
+    negative_days TEXT NOT NULL DEFAULT '[]',
+    special_notes TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (tenant_id, period, doctor_name)
+);
+CREATE TABLE IF NOT EXISTS schedule_versions (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    num_days INTEGER NOT NULL,
+    algorithm TEXT,
+    quality_score REAL,
+    quality_metrics TEXT,
+    calendar TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (tenant_id, period, version)
+);
+CREATE TABLE IF NOT EXISTS schedule_days (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    day_number INTEGER NOT NULL,
+    day_date TEXT,
+    assigned_doctors TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (tenant_id, period, version, day_number),
+    FOREIGN KEY (tenant_id, period, version)
+        REFERENCES schedule_versions (tenant_id, period, version) ON DELETE CASCADE
+);
+"""
+
+
+class StorageError(Exception):
+    """Depo okuma/yazma hatası (status: varsa HTTP durum kodu)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def period_key(year: int, month: int) -> str:
+    """Dönem anahtarı: ufkun ilk ayı ('2025-07')"""
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+def report_schedule(report: Dict) -> Dict[int, List[str]]:
+    """Tam veya sıkı (compact) rapordan gün -> doktor adları çizelgesi"""
+    if report.get('format') == 'compact':
+        doctors = report['doctors']
+        if 'day_masks' in report:
+            schedule = {day: [] for day in range(1, report['calendar']['days'] + 1)}
+            for doctor, mask in zip(doctors, report['day_masks']):
+                mask = int(mask, 16)
+                for day in schedule:
+                    if mask >> day & 1:
+                        schedule[day].append(doctor)
+            return schedule
+        return {day: [doctors[doctor_id] for doctor_id in ids]
+                for day, ids in enumerate(report['schedule'], 1)}
+    return {int(day): list(doctors) for day, doctors in report['schedule'].items()}
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class ScheduleStore(ABC):
+    """Depo arayüzü; alt sınıflar satır düzeyindeki okuma/yazmaları uygular
+
+    Tercihler NobetOptimizer'ın beklediği biçimde ({'pozitif', 'negatif',
+    'ozelSebepler'}) okunur ve yazılır.
+    """
+
+    def load_preferences(self, tenant: str, period: str) -> Dict:
+        """Kurumun dönem tercihlerini doktor adına göre döndürür"""
+        return {row['doctor_name']: {'pozitif': list(row['positive_days']),
+                                     'negatif': list(row['negative_days']),
+                                     'ozelSebepler': row['special_notes'] or ''}
+                for row in self.fetch_preferences(tenant, period)}
+
+    def save_preferences(self, tenant: str, period: str, preferences: Dict) -> int:
+        """Tercihleri tek toplu upsert ile yazar; yazılan doktor sayısını döndürür
+
+        ISO tarihli tercih günleri ("2025-08-15") dönemin ilk gününden
+        itibaren gün numarasına çevrilerek saklanır.
+        """
+        year, month = (int(part) for part in period.split('-'))
+        preferences = ScheduleCalendar(year, month).normalize_preferences(preferences)
+        now = utc_now()
+        rows = [{'tenant_id': tenant, 'period': period, 'doctor_name': doctor,
+                 'positive_days': [int(day) for day in prefs.get('pozitif', [])],
+                 'negative_days': [int(day) for day in prefs.get('negatif', [])],
+                 'special_notes': prefs.get('ozelSebepler', '') or '',
+                 'updated_at': now}
+                for doctor, prefs in preferences.items()]
+        if rows:
+            self.upsert_preferences(rows)
+        return len(rows)
+
+    def save_report(self, tenant: str, report: Dict) -> int:
+        """Optimizatör raporunu yeni sürüm olarak yazar; sürüm numarasını döndürür
+
+        Dönem ve gün tarihleri raporun 'calendar' bloğundan alınır.
+        """
+        calendar = report['calendar']
+        start = date.fromisoformat(calendar['start'])
+        period = period_key(start.year, start.month)
+        schedule = report_schedule(report)
+        quality = report.get('quality_metrics') or {}
+        header = {
+            'tenant_id': tenant,
+            'period': period,
+            'num_days': calendar['days'],
+            'algorithm': quality.get('algorithm_used'),
+            'quality_score': quality.get('quality_score'),
+            'quality_metrics': quality,
+            'calendar': calendar,
+            'created_at': utc_now(),
+        }
+        days = [{'day_number': day,
+                 'day_date': (start + timedelta(days=day - 1)).isoformat(),
+                 'assigned_doctors': schedule.get(day, [])}
+                for day in range(1, calendar['days'] + 1)]
+        return self.insert_version(header, days)
+
+    def load_schedule(self, tenant: str, period: str, version: Optional[int] = None) -> Optional[Dict]:
+        """Sürümün (varsayılan: en son) çizelgesini {'version', 'schedule', ...} olarak döndürür"""
+        if version is None:
+            versions = self.list_versions(tenant, period)
+            if not versions:
+                return None
+            version = versions[-1]['version']
+        days = self.fetch_days(tenant, period, version)
+        if not days:
+            return None
+        return {'tenant': tenant, 'period': period, 'version': version,
+                'schedule': {row['day_number']: list(row['assigned_doctors']) for row in days}}
+
+    # Alt sınıfların uyguladığı satır işlemleri
+
+    @abstractmethod
+    def fetch_preferences(self, tenant: str, period: str) -> List[Dict]:
+        """Kurumun dönem tercih satırları"""
+
+    @abstractmethod
+    def upsert_preferences(self, rows: List[Dict]) -> None:
+        """Tercih satırlarını (tenant, dönem, doktor) anahtarıyla toplu yazar"""
+
+    @abstractmethod
+    def insert_version(self, header: Dict, days: List[Dict]) -> int:
+        """Başlığı bir sonraki sürüm numarasıyla ve günleri tek seferde yazar"""
+
+    @abstractmethod
+    def list_versions(self, tenant: str, period: str) -> List[Dict]:
+        """Sürüm başlıkları, sürüm numarasına göre artan"""
+
+    @abstractmethod
+    def fetch_days(self, tenant: str, period: str, version: int) -> List[Dict]:
+        """Sürümün gün satırları, gün numarasına göre artan"""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteScheduleStore(ScheduleStore):
+    """Supabase şemasının yerel SQLite karşılığı (diziler JSON metin olarak saklanır)"""
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SQLITE_SCHEMA)
+
+    def fetch_preferences(self, tenant: str, period: str) -> List[Dict]:
+        rows = self.connection.execute(
+            "SELECT doctor_name, positive_days, negative_days, special_notes FROM tenant_preferences "
+            "WHERE tenant_id = ? AND period = ? ORDER BY doctor_name", (tenant, period))
+        return [dict(row, positive_days=json.loads(row['positive_days']),
+                     negative_days=json.loads(row['negative_days'])) for row in rows]
+
+    def upsert_preferences(self, rows: List[Dict]) -> None:
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "INSERT INTO tenant_preferences (tenant_id, period, doctor_name, positive_days, "
+                "negative_days, special_notes, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (tenant_id, period, doctor_name) DO UPDATE SET "
+                "positive_days = excluded.positive_days, negative_days = excluded.negative_days, "
+                "special_notes = excluded.special_notes, updated_at = excluded.updated_at",
+                [(row['tenant_id'], row['period'], row['doctor_name'], json.dumps(row['positive_days']),
+                  json.dumps(row['negative_days']), row['special_notes'], row['updated_at'])
+                 for row in rows])
+
+    def insert_version(self, header: Dict, days: List[Dict]) -> int:
+        # BEGIN IMMEDIATE: sürüm numarası eşzamanlı yazıcılar arasında tekil kalır
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            version = self.connection.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM schedule_versions WHERE tenant_id = ? AND period = ?",
+                (header['tenant_id'], header['period'])).fetchone()[0]
+            self.connection.execute(
+                "INSERT INTO schedule_versions (tenant_id, period, version, num_days, algorithm, quality_score, "
+                "quality_metrics, calendar, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (header['tenant_id'], header['period'], version, header['num_days'], header['algorithm'],
+                 header['quality_score'], dumps_json(header['quality_metrics']), dumps_json(header['calendar']),
+                 header['created_at']))
+            self.connection.executemany(
+                "INSERT INTO schedule_days (tenant_id, period, version, day_number, day_date, assigned_doctors) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(header['tenant_id'], header['period'], version, row['day_number'], row['day_date'],
+                  json.dumps(row['assigned_doctors'], ensure_ascii=False)) for row in days])
+        return version
+
+    def list_versions(self, tenant: str, period: str) -> List[Dict]:
+        rows = self.connection.execute(
+            "SELECT version, num_days, algorithm, quality_score, created_at FROM schedule_versions "
+            "WHERE tenant_id = ? AND period = ? ORDER BY version", (tenant, period))
+        return [dict(row) for row in rows]
+
+    def fetch_days(self, tenant: str, period: str, version: int) -> List[Dict]:
+        rows = self.connection.execute(
+            "SELECT day_number, assigned_doctors FROM schedule_days "
+            "WHERE tenant_id = ? AND period = ? AND version = ? ORDER BY day_number", (tenant, period, version))
+        return [dict(row, assigned_doctors=json.loads(row['assigned_doctors'])) for row in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class SupabaseScheduleStore(ScheduleStore):
+    """supabase-schema.sql tablolarına PostgREST (REST) üzerinden erişir
+
+    Toplu yazmalar tek POST isteğinde dizi gövdesiyle ve
+    'Prefer: resolution=merge-duplicates' ile upsert olarak yapılır. RLS
+    politikaları sürüm yazmayı yalnızca service_role'e açtığı için anahtar
+    (SUPABASE_KEY) service_role anahtarı olmalıdır; tarayıcıdaki anon anahtar
+    kullanılmaz.
+    """
+
+    VERSION_RETRIES = 5
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None, timeout: float = 30.0):
+        self.url = (url or os.environ.get('SUPABASE_URL') or os.environ.get('VITE_SUPABASE_URL') or '').rstrip('/')
+        self.key = key or os.environ.get('SUPABASE_KEY')
+        if not self.url or not self.key:
+            raise StorageError("Supabase için SUPABASE_URL ve SUPABASE_KEY (service_role) ortam değişkenleri gerekli")
+        self.timeout = timeout
+
+    def request(self, method: str, table: str, params: Optional[Dict] = None,
+                body=None, prefer: Optional[str] = None):
+        """PostgREST isteği gönderir; JSON yanıtı (veya None) döndürür"""
+        url = f"{self.url}/rest/v1/{table}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        headers = {'apikey': self.key, 'Authorization': f"Bearer {self.key}",
+                   'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if prefer:
+            headers['Prefer'] = prefer
+        data = dumps_json(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = response.read()
+        except urllib.error.HTTPError as e:
+            raise StorageError(f"Supabase {method} {table}: {e.code} {e.read().decode('utf-8', 'replace')}",
+                               e.code) from e
+        except urllib.error.URLError as e:
+            raise StorageError(f"Supabase bağlantı hatası: {e.reason}") from e
+        return json.loads(payload) if payload else None
+
+    @staticmethod
+    def match(tenant: str, period: str, **extra) -> Dict:
+        params = {'tenant_id': f"eq.{tenant}", 'period': f"eq.{period}"}
+        params.update(extra)
+        return params
+
+    def fetch_preferences(self, tenant: str, period: str) -> List[Dict]:
+        return self.request('GET', 'tenant_preferences', self.match(
+            tenant, period, select='doctor_name,positive_days,negative_days,special_notes',
+            order='doctor_name'))
+
+    def upsert_preferences(self, rows: List[Dict]) -> None:
+        self.request('POST', 'tenant_preferences', {'on_conflict': 'tenant_id,period,doctor_name'},
+                     rows, prefer='resolution=merge-duplicates,return=minimal')
+
+    def insert_version(self, header: Dict, days: List[Dict]) -> int:
+        # Sürüm başlığı düz INSERT ile yazılır; eşzamanlı yazıcıyla çakışırsa (409) sonraki numara denenir
+        for _ in range(self.VERSION_RETRIES):
+            versions = self.list_versions(header['tenant_id'], header['period'])
+            version = versions[-1]['version'] + 1 if versions else 1
+            try:
+                self.request('POST', 'schedule_versions', body=dict(header, version=version),
+                             prefer='return=minimal')
+                break
+            except StorageError as e:
+                if e.status != 409:
+                    raise
+        else:
+            raise StorageError("Sürüm numarası ayrılamadı (eşzamanlı yazma)")
+
+        rows = [dict(row, tenant_id=header['tenant_id'], period=header['period'], version=version)
+                for row in days]
+        try:
+            self.request('POST', 'schedule_days', {'on_conflict': 'tenant_id,period,version,day_number'},
+                         rows, prefer='resolution=merge-duplicates,return=minimal')
+        except StorageError:
+            # Günleri yazılamayan yarım sürüm bırakılmaz
+            self.request('DELETE', 'schedule_versions',
+                         self.match(header['tenant_id'], header['period'], version=f"eq.{version}"))
+            raise
+        return version
+
+    def list_versions(self, tenant: str, period: str) -> List[Dict]:
+        return self.request('GET', 'schedule_versions', self.match(
+            tenant, period, select='version,num_days,algorithm,quality_score,created_at', order='version'))
+
+    def fetch_days(self, tenant: str, period: str, version: int) -> List[Dict]:
+        return self.request('GET', 'schedule_days', self.match(
+            tenant, period, version=f"eq.{version}", select='day_number,assigned_doctors',
+            order='day_number'))
+
+
+def open_store(spec: str) -> ScheduleStore:
+    """'supabase' veya SQLite dosya yolu ('sqlite:' öneki isteğe bağlı) ile depo açar"""
+    if spec == 'supabase':
+        return SupabaseScheduleStore()
+    if spec.startswith('sqlite:'):
+        spec = spec[len('sqlite:'):]
+    return SQLiteScheduleStore(spec)
+
+
+def main():
+    """Depodaki sürümleri ve çizelgeleri inceleme aracı"""
+    parser = argparse.ArgumentParser(description='NöbetSihirbazı çizelge deposu')
+    parser.add_argument('store', help="Depo: SQLite dosyası veya 'supabase'")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    versions_parser = subparsers.add_parser('versions', help='Dönemin sürümlerini listele')
+    schedule_parser = subparsers.add_parser('schedule', help='Sürümün çizelgesini yazdır')
+    import_parser = subparsers.add_parser('import-preferences', help='Tercih JSON dosyasını depoya yükle')
+    for sub in (versions_parser, schedule_parser, import_parser):
+        sub.add_argument('tenant', help='Kurum kimliği')
+        sub.add_argument('period', help="Dönem ('2025-07')")
+    schedule_parser.add_argument('--version', type=int, default=None, help='Sürüm (varsayılan: en son)')
+    import_parser.add_argument('input', help='Tercihler JSON dosyası')
+
+    args = parser.parse_args()
+
+    try:
+        store = open_store(args.store)
+        try:
+            if args.command == 'versions':
+                result = store.list_versions(args.tenant, args.period)
+            elif args.command == 'schedule':
+                result = store.load_schedule(args.tenant, args.period, args.version)
+                if result is None:
+                    print("❌ Çizelge bulunamadı", file=sys.stderr)
+                    return 1
+            else:
+                with open(args.input, 'r', encoding='utf-8') as f:
+                    count = store.save_preferences(args.tenant, args.period, json.load(f))
+                print(f"✅ {count} doktor tercihi yüklendi", file=sys.stderr)
+                return 0
+        finally:
+            store.close()
+    except (StorageError, sqlite3.Error, OSError, ValueError) as e:
+        print(f"❌ Depo hatası: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(dumps_json(result, indent=True))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
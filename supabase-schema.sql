@@ -20,10 +20,53 @@ CREATE TABLE schedule (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- 2b. Çok kurumlu (tenant) tablolar: optimizatör deposu (schedule_storage.py)
+-- Tercihler ve çizelgeler kurum + dönem ("2025-07") ile ayrılır; her optimizasyon
+-- sonucu yeni bir sürümdür, eski sürümler ve diğer kurumlar üzerine yazılmaz.
+CREATE TABLE tenant_preferences (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    doctor_name VARCHAR(255) NOT NULL,
+    positive_days INTEGER[] DEFAULT '{}',
+    negative_days INTEGER[] DEFAULT '{}',
+    special_notes TEXT DEFAULT '',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, period, doctor_name)
+);
+
+CREATE TABLE schedule_versions (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    num_days INTEGER NOT NULL,
+    algorithm TEXT,
+    quality_score DOUBLE PRECISION,
+    quality_metrics JSONB,
+    calendar JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (tenant_id, period, version)
+);
+
+-- Bir çizelgenin tüm günleri tek toplu upsert ile yazılır
+CREATE TABLE schedule_days (
+    tenant_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    day_number INTEGER NOT NULL,
+    day_date DATE,
+    assigned_doctors TEXT[] DEFAULT '{}',
+    PRIMARY KEY (tenant_id, period, version, day_number),
+    FOREIGN KEY (tenant_id, period, version)
+        REFERENCES schedule_versions (tenant_id, period, version) ON DELETE CASCADE
+);
+
 -- 3. Row Level Security (RLS) Policies
 -- Herkesin okuma/yazma iznini etkinleştir (basit versiyon)
 ALTER TABLE doctor_preferences ENABLE ROW LEVEL SECURITY;
 ALTER TABLE schedule ENABLE ROW LEVEL SECURITY;
+ALTER TABLE tenant_preferences ENABLE ROW LEVEL SECURITY;
+ALTER TABLE schedule_versions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE schedule_days ENABLE ROW LEVEL SECURITY;
 
 -- Genel okuma/yazma politikaları
 CREATE POLICY "Anyone can read doctor_preferences" ON doctor_preferences FOR SELECT USING (true);
@@ -36,6 +79,29 @@ CREATE POLICY "Anyone can insert schedule" ON schedule FOR INSERT WITH CHECK (tr
 CREATE POLICY "Anyone can update schedule" ON schedule FOR UPDATE USING (true);
 CREATE POLICY "Anyone can delete schedule" ON schedule FOR DELETE USING (true);
 
+-- Optimizatör deposu politikaları: kurum ayrımı JWT'deki tenant_id talebiyle yapılır
+-- (app_metadata.tenant_id; kullanıcı oluşturulurken sunucu tarafında atanır).
+-- Sürüm ve gün yazma/silme yalnızca RLS'i atlayan service_role anahtarıyla
+-- (optimizatör, SUPABASE_KEY) yapılabilir; bu tablolara yazma politikası yoktur.
+CREATE OR REPLACE FUNCTION current_tenant_id()
+RETURNS TEXT AS $$
+    SELECT COALESCE(auth.jwt() -> 'app_metadata' ->> 'tenant_id', auth.jwt() ->> 'tenant_id');
+$$ LANGUAGE sql STABLE;
+
+CREATE POLICY "Tenant members can read tenant_preferences" ON tenant_preferences
+    FOR SELECT TO authenticated USING (tenant_id = current_tenant_id());
+CREATE POLICY "Tenant members can insert tenant_preferences" ON tenant_preferences
+    FOR INSERT TO authenticated WITH CHECK (tenant_id = current_tenant_id());
+CREATE POLICY "Tenant members can update tenant_preferences" ON tenant_preferences
+    FOR UPDATE TO authenticated USING (tenant_id = current_tenant_id())
+    WITH CHECK (tenant_id = current_tenant_id());
+
+CREATE POLICY "Tenant members can read schedule_versions" ON schedule_versions
+    FOR SELECT TO authenticated USING (tenant_id = current_tenant_id());
+
+CREATE POLICY "Tenant members can read schedule_days" ON schedule_days
+    FOR SELECT TO authenticated USING (tenant_id = current_tenant_id());
+
 -- 4. Realtime için tablo yayınını etkinleştir
 ALTER PUBLICATION supabase_realtime ADD TABLE doctor_preferences;
 ALTER PUBLICATION supabase_realtime ADD TABLE schedule;
@@ -59,6 +125,11 @@ CREATE TRIGGER update_doctor_preferences_updated_at
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_tenant_preferences_updated_at
+    BEFORE UPDATE ON tenant_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 -- 7. Test verisi ekle (opsiyonel)
 INSERT INTO doctor_preferences (doctor_name, positive_days, negative_days, special_notes) 
 VALUES 
@@ -70,12 +141,12 @@ VALUES
 SELECT table_name 
 FROM information_schema.tables 
 WHERE table_schema = 'public' 
-AND table_name IN ('doctor_preferences', 'schedule');
+AND table_name IN ('doctor_preferences', 'schedule', 'tenant_preferences', 'schedule_versions', 'schedule_days');
 
 -- Policies kontrol et
 SELECT tablename, policyname, cmd, qual 
 FROM pg_policies 
-WHERE tablename IN ('doctor_preferences', 'schedule');
+WHERE tablename IN ('doctor_preferences', 'schedule', 'tenant_preferences', 'schedule_versions', 'schedule_days');
 
 -- Test verilerini görüntüle
 SELECT * FROM doctor_preferences;
@@ -0,0 +1,17 @@
+import pytest
+
+from schedule_benchmark import generate_preferences
+from schedule_optimizer import NobetOptimizer
+
+
+@pytest.fixture
+def preferences():
+    """12 doktorlu, Temmuz 2025 için sabit tohumlu sentetik tercihler"""
+    return generate_preferences(12, horizon=31, seed=3)
+
+
+@pytest.fixture
+def optimizer(preferences):
+    optimizer = NobetOptimizer(preferences, ga_options={'seed': 1})
+    optimizer.schedule = optimizer.simple_greedy_algorithm()
+    return optimizer
@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from schedule_optimizer import run_batch
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def job_line(preferences, job_id):
+    return json.dumps({'id': job_id, 'preferences': preferences}) + "\n"
+
+
+def test_batch_results_and_errors(preferences):
+    lines = [job_line(preferences, 'a'), "{bozuk\n", "\n", json.dumps({'id': 'b'}) + "\n",
+             json.dumps({'preferences': preferences, 'rules': {'FOO': 1}}) + "\n"]
+    output = io.StringIO()
+    
+    assert run_batch(io.StringIO(''.join(lines)), output, workers=2) == (1, 3)
+    results = {result['id']: result for result in map(json.loads, output.getvalue().splitlines())}
+    assert results['a']['success'] and results['a']['report']['schedule']
+    assert results[None]['line'] == 2
+    assert 'preferences' in results['b']['error']
+    assert 'FOO' in results[5]['error']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_streams_while_input_open(preferences, workers):
+    """Açık kalan stdin'de her iş sonucu bir sonraki satır beklenmeden yazılır"""
+    process = subprocess.Popen([sys.executable, 'schedule_optimizer.py', '--batch', '-', '--workers', str(workers)],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True, cwd=ROOT)
+    try:
+        process.stdin.write(job_line(preferences, 'a'))
+        process.stdin.flush()
+        assert json.loads(process.stdout.readline())['id'] == 'a'
+        
+        process.stdin.write("{bozuk\n")
+        process.stdin.flush()
+        assert json.loads(process.stdout.readline())['line'] == 2
+        
+        process.stdin.write(job_line(preferences, 'b'))
+        process.stdin.close()
+        assert json.loads(process.stdout.readline())['id'] == 'b'
+        assert process.wait(30) == 2
+    finally:
+        process.kill()
+        process.wait()
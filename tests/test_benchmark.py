@@ -0,0 +1,37 @@
+import tracemalloc
+
+import pytest
+
+from schedule_benchmark import compare_runs, generate_preferences, run_engine
+from schedule_optimizer import NobetOptimizer
+
+
+def test_time_is_measured_without_tracing(monkeypatch):
+    tracing = []
+    greedy = NobetOptimizer.simple_greedy_algorithm
+    
+    def traced_greedy(self):
+        tracing.append(tracemalloc.is_tracing())
+        return greedy(self)
+    
+    monkeypatch.setattr(NobetOptimizer, 'simple_greedy_algorithm', traced_greedy)
+    result = run_engine(generate_preferences(10, horizon=14, seed=1), 14, 'greedy', seed=1)
+    
+    assert tracing == [False, True]
+    assert result['success'] and result['wall_time'] > 0 and result['peak_memory_kb'] > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        run_engine(generate_preferences(5, horizon=7), 7, 'yok', seed=1)
+
+
+def test_compare_flags_slower_and_worse_runs():
+    row = {'case': 'c', 'engine': 'lp', 'success': True, 'wall_time': 1.0, 'objective': 10.0,
+           'violations': {'coverage': 0}}
+    slower = dict(row, wall_time=1.5, objective=8.0, violations={'coverage': 2})
+    
+    assert compare_runs({'results': [row]}, {'results': [row]}) == []
+    regression, = compare_runs({'results': [row]}, {'results': [slower]})
+    assert len(regression['reasons']) == 3
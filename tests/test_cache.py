@@ -0,0 +1,89 @@
+import os
+
+from schedule_optimizer import NobetOptimizer, ResultCache
+
+
+def same_schedule(report, other):
+    """Önbellekten gelen rapor JSON'dan okunduğu için gün anahtarları metindir"""
+    return NobetOptimizer.normalize_schedule(report['schedule']) == NobetOptimizer.normalize_schedule(other['schedule'])
+
+
+def solve(preferences, cache, **kwargs):
+    optimizer = NobetOptimizer(preferences, cache=cache, **kwargs)
+    optimizer.generate_optimal_schedule()
+    return optimizer, optimizer.generate_report()
+
+
+def test_memory_layer_is_lru():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', {'value': 1})
+    cache.put('b', {'value': 2})
+    assert cache.get('a') == {'value': 1}
+    cache.put('c', {'value': 3})
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == {'value': 1} and cache.get('c') == {'value': 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_layer_persists_and_evicts(tmp_path):
+    ResultCache(directory=str(tmp_path)).put('a' * 64, {'value': 1})
+    
+    fresh = ResultCache(directory=str(tmp_path))
+    assert fresh.get('a' * 64) == {'value': 1}
+    
+    small = ResultCache(directory=str(tmp_path), max_disk_bytes=40)
+    small.put('b' * 64, {'value': 'x' * 30})
+    assert not os.path.exists(tmp_path / f"{'a' * 64}.json")
+
+
+def test_key_is_canonical():
+    assert ResultCache.make_key({'a': 1, 'b': [1, 2]}) == ResultCache.make_key({'b': [1, 2], 'a': 1})
+    assert ResultCache.make_key({'a': [1, 2]}) != ResultCache.make_key({'a': [2, 1]})
+
+
+def test_optimizer_cache_hit(preferences):
+    cache = ResultCache()
+    first, first_report = solve(preferences, cache)
+    second, second_report = solve(preferences, cache)
+    
+    assert not first.cache_hit and second.cache_hit
+    assert second_report['cache_hit'] and same_schedule(second_report, first_report)
+    assert second.quality_score == first.quality_score
+    assert sum('önbellek' in line for line in second_report['optimization_log']) == 1
+
+
+def test_cache_persists_across_processes(preferences, tmp_path):
+    _, report = solve(preferences, ResultCache(directory=str(tmp_path)))
+    
+    optimizer, cached = solve(preferences, ResultCache(directory=str(tmp_path)))
+    assert optimizer.cache_hit and same_schedule(cached, report)
+
+
+def test_key_depends_on_doctor_order_and_weights(preferences):
+    base = NobetOptimizer(preferences).cache_key()
+    reordered = NobetOptimizer(dict(reversed(list(preferences.items())))).cache_key()
+    reweighted = NobetOptimizer(preferences)
+    reweighted.HISTORY_WEEKEND_WEIGHT += 1
+    
+    assert base == NobetOptimizer(dict(preferences)).cache_key()
+    assert base != reordered
+    assert base != reweighted.cache_key()
+    assert base != NobetOptimizer(preferences, rules={'MAX_SHIFTS_PER_DOCTOR': 9}).cache_key()
+
+
+def test_corrupt_disk_entry_is_a_miss(preferences, tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    key = NobetOptimizer(preferences, cache=cache).cache_key()
+    for content in ('{"schedule": {"1": [', 'null'):
+        (tmp_path / f"{key}.json").write_text(content, encoding='utf-8')
+        
+        optimizer, report = solve(preferences, ResultCache(directory=str(tmp_path)))
+        assert not optimizer.cache_hit and report['schedule']
+        # Bozuk kayıt silinip yerine yeni sonuç yazılır
+        assert ResultCache(directory=str(tmp_path)).get(key)['schedule']
+    
+    (tmp_path / f"{key}.json").write_text('{', encoding='utf-8')
+    cache = ResultCache(directory=str(tmp_path))
+    assert cache.get(key) is None and (cache.hits, cache.misses) == (0, 1)
+    assert not (tmp_path / f"{key}.json").exists()
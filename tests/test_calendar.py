@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+
+from schedule_optimizer import NobetOptimizer, ScheduleCalendar, public_holidays
+
+
+def test_public_holidays_in_july():
+    calendar = ScheduleCalendar(2025, 7)
+    
+    assert calendar.num_days == 31
+    assert calendar.holiday_names == {15: "Demokrasi ve Milli Birlik Günü"}
+    assert calendar.day_type(15) == 'holiday'
+    assert calendar.day_type(5) == 'weekend'     # 5 Temmuz 2025 Cumartesi
+    assert calendar.day_type(7) == 'weekday'
+    assert calendar.off_days.sum() == calendar.weekend.sum() + 1
+
+
+def test_religious_holidays_and_custom_days():
+    assert all(public_holidays(2025)[date(2025, 6, day)] == "Kurban Bayramı" for day in range(6, 10))
+    
+    calendar = ScheduleCalendar(2025, 6, holidays={'2025-06-20': "Kurum tatili", 25: "Seminer"},
+                                include_public_holidays=False)
+    
+    assert calendar.holiday_names == {20: "Kurum tatili", 25: "Seminer"}
+
+
+def test_multi_month_horizon_numbering():
+    calendar = ScheduleCalendar(2025, 11, months=3)
+    
+    assert calendar.num_days == 30 + 31 + 31
+    assert calendar.months == ('2025-11', '2025-12', '2026-01')
+    assert calendar.num_months == 3
+    assert calendar.date_of(31) == date(2025, 12, 1)
+    assert calendar.day_number('2026-01-01') == 62
+    assert calendar.day_number(date(2025, 11, 30)) == 30
+    assert calendar.month_of_day[30] == 1 and calendar.month_of_day[61] == 2
+    # Yılbaşı ikinci yılın tatil listesinden gelir
+    assert calendar.holiday_names[62] == "Yılbaşı"
+    assert calendar.as_dict()['holidays']['62']['date'] == '2026-01-01'
+
+
+@pytest.mark.parametrize('kwargs', [{'month': 13}, {'month': 1, 'months': 0}, {'month': 1, 'num_days': 0}])
+def test_invalid_horizons(kwargs):
+    with pytest.raises(ValueError):
+        ScheduleCalendar(2025, **kwargs)
+
+
+def test_optimizer_uses_weekend_staffing_on_holidays(preferences):
+    optimizer = NobetOptimizer(preferences, month=7, year=2025)
+    
+    assert optimizer.get_required_doctors(15) == optimizer.WEEKEND_DOCTORS_NEEDED
+    assert optimizer.get_required_doctors(14) == optimizer.WEEKDAY_DOCTORS_NEEDED
+
+
+def test_multi_month_preferences_and_limits(preferences):
+    preferences = dict(preferences)
+    doctor = next(iter(preferences))
+    preferences[doctor] = {'pozitif': ['2025-08-15'], 'negatif': ['2025-09-01'], 'ozelSebepler': ''}
+    optimizer = NobetOptimizer(preferences, month=7, year=2025, months=3)
+    
+    assert optimizer.num_days == 31 + 31 + 30
+    assert optimizer.preferences[doctor]['pozitif'] == [46]
+    assert optimizer.preferences[doctor]['negatif'] == [63]
+    assert optimizer.max_shifts == 3 * optimizer.MAX_SHIFTS_PER_DOCTOR
+    assert optimizer.pref_index.is_positive(0, 46) and optimizer.pref_index.is_negative(0, 63)
+
+
+def test_multi_month_schedule_respects_monthly_cap(preferences):
+    optimizer = NobetOptimizer(preferences, month=7, year=2025, months=2)
+    schedule = optimizer.as_schedule(optimizer.generate_optimal_schedule())
+    
+    july, august = schedule.matrix[:, :31].sum(axis=1), schedule.matrix[:, 31:].sum(axis=1)
+    assert (july <= optimizer.MAX_SHIFTS_PER_DOCTOR).all()
+    assert (august <= optimizer.MAX_SHIFTS_PER_DOCTOR).all()
+    assert (schedule.coverage() == optimizer.pref_index.required).all()
+
+
+def test_unknown_religious_holiday_year_is_reported(preferences):
+    assert ScheduleCalendar(2025, 7).unknown_holiday_years == ()
+    assert ScheduleCalendar(2027, 12, months=2).unknown_holiday_years == (2028,)
+    assert ScheduleCalendar(2030, 7, include_public_holidays=False).unknown_holiday_years == ()
+    
+    optimizer = NobetOptimizer(preferences, year=2030)
+    warnings = [line for line in optimizer.optimization_log if 'dini bayram' in line]
+    assert len(warnings) == 1 and '2030' in warnings[0]
+    optimizer.generate_optimal_schedule()
+    assert warnings[0] in optimizer.generate_report()['optimization_log']
+    
+    assert not any('dini bayram' in line for line in NobetOptimizer(preferences).optimization_log)
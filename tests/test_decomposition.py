@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from schedule_benchmark import generate_preferences
+from schedule_optimizer import NobetOptimizer
+
+
+@pytest.fixture
+def quarter():
+    """Temmuz-Eylül 2025 (92 gün), 20 doktor"""
+    return NobetOptimizer(generate_preferences(20, horizon=92, seed=4), months=3,
+                          decomposition_options={'mode': 'on', 'workers': 1})
+
+
+def hard_violations(optimizer, schedule):
+    matrix = optimizer.as_schedule(schedule).matrix.astype(int)
+    occupied = matrix > 0
+    months = optimizer.calendar.month_of_day
+    month_counts = np.stack([matrix[:, months == month].sum(axis=1) for month in range(optimizer.calendar.num_months)])
+    return {
+        'coverage': int(np.abs(occupied.sum(axis=0) - optimizer.pref_index.required).sum()),
+        'consecutive': int((occupied[:, :-1] & occupied[:, 1:]).sum()),
+        'month_max': int(np.maximum(month_counts - optimizer.MAX_SHIFTS_PER_DOCTOR, 0).sum()),
+    }
+
+
+def test_windows_cover_horizon_once(quarter):
+    windows = quarter.decomposition_windows()
+    cores = [day for first, last, _, _ in windows for day in range(first, last + 1)]
+    
+    assert cores == list(range(1, quarter.num_days + 1))
+    for core_first, core_last, first, last in windows:
+        assert first <= core_first <= core_last <= last
+        assert core_first == 1 or quarter.calendar.weekday[core_first - 1] == 0   # Pazartesi
+
+
+def test_window_shift_bounds_are_proportional(quarter):
+    low, high = quarter.window_shift_bounds(1, 46)
+    
+    assert high >= int(np.ceil(quarter.max_shifts / 2)) and low <= high
+    assert quarter.window_shift_bounds(1, quarter.num_days)[1] >= quarter.max_shifts
+
+
+def test_decomposition_schedule_respects_hard_rules(quarter):
+    schedule = quarter.generate_optimal_schedule()
+    
+    assert quarter.algorithm_used == 'decomposition'
+    assert hard_violations(quarter, schedule) == {'coverage': 0, 'consecutive': 0, 'month_max': 0}
+    assert quarter.metrics.counters['decomposition_windows'] == len(quarter.decomposition_windows())
+
+
+def test_trim_excess_shifts_frees_worst_days(preferences):
+    optimizer = NobetOptimizer(preferences, rules={'MAX_SHIFTS_PER_DOCTOR': 2})
+    doctor = optimizer.doctors[0]
+    schedule = {day: [doctor] if day in (1, 3, 5) else [] for day in range(1, optimizer.num_days + 1)}
+    worst = min((1, 3, 5), key=lambda day: optimizer.pref_index.score(0, day))
+    
+    assert optimizer.trim_excess_shifts(schedule) == [worst]
+    assert schedule[worst] == []
+
+
+def test_auto_mode_uses_horizon_length(preferences):
+    assert not NobetOptimizer(preferences).use_decomposition()
+    assert NobetOptimizer(preferences, decomposition_options={'auto_days': 20}).use_decomposition()
+    assert not NobetOptimizer(preferences, decomposition_options={'mode': 'off', 'auto_days': 20}).use_decomposition()
+
+
+def test_parallel_windows_match_serial_rules():
+    optimizer = NobetOptimizer(generate_preferences(20, horizon=92, seed=4), months=3,
+                               decomposition_options={'mode': 'on', 'workers': 2})
+    schedule = optimizer.generate_optimal_schedule()
+    
+    assert hard_violations(optimizer, schedule) == {'coverage': 0, 'consecutive': 0, 'month_max': 0}
@@ -0,0 +1,81 @@
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def with_negative_day(preferences, day, doctors=None):
+    """Verilen doktorlara (varsayılan: hepsi) day gününü negatif olarak ekler"""
+    result = {}
+    for doctor, prefs in preferences.items():
+        prefs = dict(prefs)
+        if doctors is None or doctor in doctors:
+            prefs['pozitif'] = [value for value in prefs['pozitif'] if value != day]
+            prefs['negatif'] = sorted(set(prefs['negatif']) | {day})
+        result[doctor] = prefs
+    return result
+
+
+def test_feasible_preferences(preferences):
+    feasibility = NobetOptimizer(preferences).check_feasibility()
+    
+    assert feasibility['feasible'] and feasibility['lp_feasible'] and feasibility['rules_feasible']
+    assert feasibility['issues'] == []
+
+
+def test_negative_day_blocks_coverage(preferences):
+    optimizer = NobetOptimizer(with_negative_day(preferences, 5))
+    feasibility = optimizer.check_feasibility()
+    
+    assert not feasibility['lp_feasible']
+    assert feasibility['rules_feasible']
+    coverage = [issue for issue in feasibility['issues'] if issue['rule'] == 'coverage']
+    assert [issue['days'] for issue in coverage] == [[5]]
+    assert coverage[0]['cause'] == 'negatif'
+    assert sorted(coverage[0]['doctors']) == sorted(preferences)
+
+
+def test_negative_day_skips_lp(preferences):
+    optimizer = NobetOptimizer(with_negative_day(preferences, 5), ga_options={'seed': 1, 'generations': 5})
+    
+    assert optimizer.generate_optimal_schedule()
+    assert optimizer.algorithm_used != 'linear_programming'
+
+
+def test_consecutive_rule_infeasible(preferences):
+    two_doctors = dict(list(preferences.items())[:2])
+    feasibility = NobetOptimizer(two_doctors).check_feasibility()
+    
+    assert not feasibility['rules_feasible'] and not feasibility['lp_feasible']
+    rules = {issue['rule'] for issue in feasibility['issues'] if issue['cause'] == 'rules'}
+    assert 'consecutive' in rules
+
+
+def test_capacity_issue(preferences):
+    feasibility = NobetOptimizer(preferences, rules={'MAX_SHIFTS_PER_DOCTOR': 2}).check_feasibility()
+    
+    capacity = [issue for issue in feasibility['issues'] if issue['rule'] == 'capacity']
+    assert capacity and capacity[0]['cause'] == 'rules'
+    assert capacity[0]['days'] == list(range(1, 32))
+
+
+def test_min_shifts_floor_is_relaxed(preferences):
+    doctor = next(iter(preferences))
+    blocked = preferences
+    for day in range(1, 29):
+        blocked = with_negative_day(blocked, day, [doctor])
+    optimizer = NobetOptimizer(blocked)
+    feasibility = optimizer.check_feasibility()
+    
+    assert feasibility['lp_feasible']
+    issues = [issue for issue in feasibility['issues'] if issue['rule'] == 'min_shifts']
+    assert issues and issues[0]['doctors'] == [doctor]
+    assert optimizer.shift_floors[0] < optimizer.min_shifts
+    assert (optimizer.shift_floors[1:] == optimizer.min_shifts).all()
+
+
+@pytest.mark.parametrize('rules', [{'WEEKDAY_DOCTORS_NEEDED': 2}, {'WEEKEND_DOCTORS_NEEDED': 4}])
+def test_feasibility_recorded_in_report(preferences, rules):
+    optimizer = NobetOptimizer(preferences, rules=rules)
+    optimizer.generate_optimal_schedule()
+    
+    assert optimizer.generate_report()['feasibility'] == optimizer.feasibility
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def scalar_fitness(optimizer, individual):
+    """Slot slot hesaplanan başvuru uygunluğu"""
+    index = optimizer.pref_index
+    slot_days = optimizer.build_ga_slot_days().tolist()
+    score = sum(index.score(doctor_id, day + 1) for doctor_id, day in zip(individual, slot_days))
+    counts = np.bincount(individual, minlength=optimizer.num_doctors)
+    score -= optimizer.IMBALANCE_WEIGHT * np.abs(counts - optimizer.doctor_targets).sum()
+    days = [{day for doctor_id, day in zip(individual, slot_days) if doctor_id == d}
+            for d in range(optimizer.num_doctors)]
+    score -= optimizer.CONSECUTIVE_WEIGHT * sum(day + 1 in doctor_days for doctor_days in days for day in doctor_days)
+    return score
+
+
+def test_batch_fitness_matches_scalar_reference(optimizer):
+    rng = np.random.default_rng(0)
+    population = rng.integers(0, optimizer.num_doctors, size=(20, len(optimizer.build_ga_slot_days())))
+    
+    fitness = optimizer.evaluate_individuals(population.tolist())
+    
+    assert [value for value, in fitness] == pytest.approx([scalar_fitness(optimizer, ind) for ind in population])
+
+
+def test_fitness_matches_common_objective_for_full_individuals(optimizer):
+    individual = optimizer.schedule_to_individual(optimizer.schedule)
+    
+    fitness, = optimizer.evaluate_individuals([individual])[0]
+    assert fitness == pytest.approx(optimizer.evaluate_schedule(optimizer.individual_to_schedule(individual)))
+
+
+def test_single_individual_and_population_agree(optimizer):
+    individual = optimizer.schedule_to_individual(optimizer.schedule)
+    score_matrix, slot_days = optimizer.pref_index.score_matrix, optimizer.build_ga_slot_days()
+    
+    single = optimizer.evaluate_population(np.array(individual), score_matrix, slot_days)
+    batch = optimizer.evaluate_population(np.array([individual, individual]), score_matrix, slot_days)
+    assert single.shape == (1,) and batch.tolist() == [single[0], single[0]]
+
+
+def test_genetic_algorithm_is_seeded(preferences):
+    results = []
+    for _ in range(2):
+        optimizer = NobetOptimizer(preferences, ga_options={'seed': 7, 'generations': 10, 'population_size': 20})
+        results.append(optimizer.genetic_algorithm_optimize())
+    
+    assert results[0] == results[1]
+    assert results[0].coverage().tolist() == optimizer.pref_index.required.tolist()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from schedule_benchmark import generate_preferences
+from schedule_optimizer import HISTORY_FIELDS, NobetOptimizer
+
+
+def history_row(shifts=0, weekend_shifts=0, negatif_violations=0, months=1):
+    return {'shifts': shifts, 'weekend_shifts': weekend_shifts,
+            'negatif_violations': negatif_violations, 'months': months}
+
+
+def test_no_history_keeps_flat_targets(preferences):
+    optimizer = NobetOptimizer(preferences)
+    targets, weekend_adjustment, preference_adjustment = optimizer.history_adjustments()
+    
+    assert (targets == optimizer.target_shifts).all()
+    assert weekend_adjustment is None and preference_adjustment is None
+    assert (optimizer.doctor_targets == optimizer.target_shifts).all()
+
+
+def test_normalize_history_accepts_previous_report(preferences):
+    doctor = next(iter(preferences))
+    report = {'history': {doctor: {'shifts': '7', 'months': 1}}}
+    
+    assert NobetOptimizer.normalize_history(report) == {doctor: history_row(shifts=7)}
+    assert NobetOptimizer.normalize_history(None) == {}
+
+
+def test_overworked_doctor_gets_lower_target_and_weekend_penalty(preferences):
+    doctors = list(preferences)
+    history = {doctor: history_row(shifts=7, weekend_shifts=2) for doctor in doctors}
+    history[doctors[0]] = history_row(shifts=10, weekend_shifts=6)
+    optimizer = NobetOptimizer(preferences, history=history)
+    plain = NobetOptimizer(preferences)
+    
+    # Kadro ortalaması ayda 7.25 nöbet: fazla tutan hedefin altına (min_shifts'e kadar), diğerleri üstüne
+    targets = optimizer.doctor_targets
+    assert targets[0] == pytest.approx(max(optimizer.min_shifts, optimizer.target_shifts - 2.75))
+    assert targets[1:] == pytest.approx(np.full(len(doctors) - 1, optimizer.target_shifts + 0.25))
+    
+    weekend = optimizer.pref_index.weekend
+    difference = optimizer.pref_index.score_matrix - plain.pref_index.score_matrix
+    assert (difference[0, weekend] < 0).all() and (difference[0, ~weekend] == 0).all()
+    assert (difference[1:, weekend] > 0).all()
+
+
+def test_negative_violation_debt_strengthens_preferences(preferences):
+    doctors = list(preferences)
+    history = {doctor: history_row(shifts=7) for doctor in doctors}
+    history[doctors[0]] = history_row(shifts=7, negatif_violations=3)
+    optimizer = NobetOptimizer(preferences, history=history)
+    plain = NobetOptimizer(preferences)
+    
+    index, base = optimizer.pref_index, plain.pref_index
+    assert (index.score_matrix[0][index.negative_mask[0]] < base.score_matrix[0][base.negative_mask[0]]).all()
+    assert (index.score_matrix[1:] == base.score_matrix[1:]).all()
+
+
+def test_updated_history_accumulates(preferences):
+    doctors = list(preferences)
+    history = {doctors[0]: history_row(shifts=5, weekend_shifts=1), 'Dr. Ayrılan': history_row(shifts=9)}
+    optimizer = NobetOptimizer(preferences, history=history)
+    schedule = optimizer.generate_optimal_schedule()
+    matrix = optimizer.as_schedule(schedule).matrix
+    
+    updated = optimizer.updated_history(schedule)
+    
+    assert updated['Dr. Ayrılan'] == history_row(shifts=9)
+    assert updated[doctors[0]]['shifts'] == 5 + int(matrix[0].sum())
+    assert updated[doctors[0]]['months'] == 2
+    assert sum(updated[doctor]['shifts'] for doctor in doctors) == 5 + int(matrix.sum())
+    assert set(updated[doctors[1]]) == set(HISTORY_FIELDS)
+    assert optimizer.generate_report()['history'] == updated
+
+
+def test_rolling_history_evens_out_workload():
+    def spread(use_history):
+        history, totals = {}, {}
+        for month in range(1, 7):
+            optimizer = NobetOptimizer(generate_preferences(12, horizon=31, seed=month),
+                                       month=month, year=2025, history=history if use_history else None)
+            schedule = optimizer.as_schedule(optimizer.generate_optimal_schedule())
+            history = optimizer.updated_history(schedule)
+            matrix = schedule.matrix
+            for doctor_id, doctor in enumerate(optimizer.doctors):
+                weekend = int(matrix[doctor_id, optimizer.pref_index.weekend].sum())
+                totals[doctor] = totals.get(doctor, 0) + weekend
+        return max(totals.values()) - min(totals.values())
+    
+    assert spread(True) < spread(False)
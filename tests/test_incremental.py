@@ -0,0 +1,39 @@
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def changed_preferences(preferences):
+    """İlk doktorun ilk pozitif gününü negatife çevirir: (değişiklikler, doktor, gün)"""
+    doctor, prefs = next(iter(preferences.items()))
+    day = prefs['pozitif'][0]
+    changes = {doctor: dict(prefs, pozitif=prefs['pozitif'][1:], negatif=sorted(prefs['negatif'] + [day]))}
+    return changes, doctor, day
+
+
+@pytest.mark.parametrize('mode', ['repair', 'warm_start'])
+def test_incremental_score_matches_full_solve(preferences, mode):
+    changes, _, _ = changed_preferences(preferences)
+    previous_schedule = NobetOptimizer(preferences).generate_optimal_schedule().to_dict()
+    
+    incremental = NobetOptimizer(preferences)
+    schedule = incremental.incremental_optimize(previous_schedule, changes, mode=mode)
+    full = NobetOptimizer(dict(preferences, **changes))
+    full_schedule = full.generate_optimal_schedule()
+    
+    # İki yol da skoru aynı ortak amaçtan hesaplar; aynı amaç değeri aynı skoru verir
+    assert incremental.algorithm_used == f"incremental_{mode}"
+    for optimizer, result in ((incremental, schedule), (full, full_schedule)):
+        expected = full.evaluate_schedule(result) / (full.num_days * full.num_doctors)
+        assert optimizer.quality_score == pytest.approx(expected)
+
+
+def test_incremental_repair_respects_new_negative_day(preferences):
+    changes, doctor, day = changed_preferences(preferences)
+    previous_schedule = NobetOptimizer(preferences).generate_optimal_schedule().to_dict()
+    
+    schedule = NobetOptimizer(preferences).incremental_optimize(previous_schedule, changes)
+    
+    assert doctor not in schedule[day]
+    churn = sum(len(set(previous_schedule[d]) - set(schedule[d])) for d in previous_schedule)
+    assert churn <= 3
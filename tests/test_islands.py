@@ -0,0 +1,59 @@
+from time import perf_counter
+
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def island_optimizer(preferences, **ga_options):
+    options = {'seed': 5, 'islands': 3, 'workers': 1, 'population_size': 12, 'generations': 12,
+               'migration_interval': 4, 'migrants': 2}
+    options.update(ga_options)
+    return NobetOptimizer(preferences, ga_options=options)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_island_model_is_valid_and_counted(preferences, workers):
+    optimizer = island_optimizer(preferences, workers=workers)
+    schedule = optimizer.genetic_algorithm_optimize()
+    
+    assert schedule.coverage().tolist() == optimizer.pref_index.required.tolist()
+    assert any('Ada modeli: 3 ada' in line for line in optimizer.optimization_log)
+    assert sum(line.startswith('  Nesil') for line in optimizer.optimization_log) == 3
+    # Sayaçlar tüm adaların toplamıdır; seri ve paralel çalışmada aynıdır
+    assert optimizer.metrics.counters['ga_generations'] == 3 * 12
+    assert optimizer.metrics.counters['ga_evaluations'] == 3 * 12 * (12 + 3)
+
+
+def test_island_model_same_result_serial_and_parallel(preferences):
+    serial = island_optimizer(preferences).genetic_algorithm_optimize()
+    parallel = island_optimizer(preferences, workers=2).genetic_algorithm_optimize()
+    
+    assert serial == parallel
+
+
+def test_ring_migration_replaces_worst(preferences, monkeypatch):
+    optimizer = island_optimizer(preferences, islands=3, migrants=1)
+    received = []
+    
+    def fake_evolve_island(population, generations, start_generation, seed, time_left=None):
+        received.append(population)
+        island = (len(received) - 1) % 3
+        # Skora göre azalan sıra: adanın en iyisi [island] * n, en kötüsü [-1] * n
+        return [([island] * 4, 10.0 + island), ([9] * 4, 5.0), ([-1] * 4, 0.0)]
+    
+    monkeypatch.setattr(optimizer, 'evolve_island', fake_evolve_island)
+    best, fitness = optimizer.island_model_optimize(3, 8)
+    
+    # İkinci turda her adanın en kötüsü önceki adanın en iyisiyle değişmiş olmalı
+    assert [population[-1] for population in received[3:6]] == [[2] * 4, [0] * 4, [1] * 4]
+    assert (best, fitness) == ([2] * 4, 12.0)
+
+
+def test_island_model_stops_at_deadline(preferences):
+    optimizer = island_optimizer(preferences, generations=10 ** 6, migration_interval=5)
+    start = perf_counter()
+    best, fitness = optimizer.island_model_optimize(12, 10 ** 6, deadline=perf_counter() + 1.0)
+    
+    assert perf_counter() - start < 5.0
+    assert len(best) == len(optimizer.build_ga_slot_days())
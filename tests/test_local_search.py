@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def hard_violations(optimizer, schedule):
+    matrix = optimizer.as_schedule(schedule).matrix
+    occupied = matrix > 0
+    return (int((matrix > 1).sum()), int((occupied[:, :-1] & occupied[:, 1:]).sum()),
+            int(np.maximum(matrix.sum(axis=1) - optimizer.max_shifts, 0).sum()))
+
+
+@pytest.mark.parametrize('strategy', ['first', 'best'])
+def test_local_search_improves_greedy(optimizer, strategy):
+    start = optimizer.schedule
+    result = optimizer.local_search_optimize(start, strategy=strategy)
+    
+    assert optimizer.evaluate_schedule(result) > optimizer.evaluate_schedule(start)
+    assert hard_violations(optimizer, result) <= hard_violations(optimizer, start)
+    assert (optimizer.as_schedule(result).coverage() == optimizer.pref_index.required).all()
+
+
+def test_time_limit_none_means_no_limit(preferences):
+    optimizer = NobetOptimizer(preferences, local_search_options={'time_limit': None})
+    start = optimizer.simple_greedy_algorithm()
+    result = optimizer.local_search_enhance(start)
+    
+    assert not any('Yerel arama hatası' in line for line in optimizer.optimization_log)
+    assert optimizer.evaluate_schedule(result) > optimizer.evaluate_schedule(start)
+
+
+def test_time_limit_none_in_portfolio(preferences):
+    optimizer = NobetOptimizer(preferences, local_search_options={'time_limit': None},
+                               portfolio_options={'enabled': True, 'deadline': 3.0, 'workers': 1})
+    
+    assert optimizer.generate_optimal_schedule()
+
+
+def test_zero_iterations_returns_start(optimizer):
+    result = optimizer.local_search_optimize(optimizer.schedule, max_iterations=0)
+    
+    assert optimizer.as_schedule(result) == optimizer.as_schedule(optimizer.schedule)
+
+
+def test_days_limit_moves(optimizer):
+    days = [10, 11, 12, 20]
+    start = optimizer.as_schedule(optimizer.schedule)
+    result = optimizer.as_schedule(optimizer.local_search_optimize(start, days=days))
+    
+    changed = np.flatnonzero((result.matrix != start.matrix).any(axis=0)) + 1
+    assert set(changed.tolist()) <= set(days)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from schedule_optimizer import NobetOptimizer
+
+
+def test_lp_schedule_respects_hard_rules(preferences):
+    optimizer = NobetOptimizer(preferences)
+    schedule = optimizer.linear_programming_optimize()
+    matrix = schedule.matrix.astype(int)
+    counts = matrix.sum(axis=1)
+    
+    assert (schedule.coverage() == optimizer.pref_index.required).all()
+    assert not (matrix.astype(bool) & optimizer.pref_index.negative_mask).any()
+    assert not (matrix[:, :-1] & matrix[:, 1:]).any()
+    assert counts.max() <= optimizer.max_shifts and counts.min() >= optimizer.min_shifts
+    assert optimizer.evaluate_schedule(schedule) >= optimizer.evaluate_schedule(optimizer.simple_greedy_algorithm())
+
+
+def test_negative_days_are_not_variables(preferences):
+    optimizer = NobetOptimizer(preferences)
+    optimizer.linear_programming_optimize()
+    negatives = int(optimizer.pref_index.negative_mask.sum())
+    stats = optimizer.lp_stats
+    
+    assert stats['fixed_variables'] == negatives
+    assert stats['variables'] == optimizer.num_doctors * optimizer.num_days - negatives
+    assert stats['status'] == 'Optimal'
+    assert set(optimizer.metrics.phases) >= {'lp', 'lp_build', 'lp_solve'}
+
+
+def test_window_and_shift_bounds(preferences):
+    optimizer = NobetOptimizer(preferences)
+    schedule = optimizer.linear_programming_optimize(days=(8, 14), shift_bounds=(0, 2))
+    coverage = schedule.coverage()
+    
+    assert coverage[:7].sum() == 0 and coverage[14:].sum() == 0
+    assert (coverage[7:14] == optimizer.pref_index.required[7:14]).all()
+    assert schedule.shift_counts().max() <= 2
+
+
+def test_warm_start_keeps_previous_schedule(preferences):
+    previous = NobetOptimizer(preferences).linear_programming_optimize()
+    optimizer = NobetOptimizer(preferences)
+    schedule = optimizer.linear_programming_optimize(previous_schedule=previous.to_dict())
+    
+    # Aynı tercihlerle korunan her atama ödüllendirildiği için önceki optimal çizelge korunur
+    assert optimizer.evaluate_schedule(schedule) == optimizer.evaluate_schedule(previous)
+    assert np.array_equal(schedule.matrix, previous.matrix)
@@ -0,0 +1,43 @@
+from schedule_optimizer import NobetOptimizer, OptimizationMetrics
+
+
+def test_phases_counters_and_callback():
+    events = []
+    metrics = OptimizationMetrics(events.append)
+    with metrics.phase('lp'):
+        pass
+    metrics.record('lp', 0.5)
+    metrics.count('ga_generations', 3)
+    metrics.count('ga_generations')
+    
+    data = metrics.as_dict()
+    assert data['phases']['lp'] >= 0.5 and data['counters'] == {'ga_generations': 4}
+    assert [event['name'] for event in events] == ['lp', 'lp'] and events[1]['seconds'] == 0.5
+
+
+def test_prometheus_export():
+    metrics = OptimizationMetrics()
+    metrics.record('greedy', 0.25)
+    metrics.count('cache_hits', 2)
+    text = metrics.to_prometheus(prefix='test')
+    
+    assert 'test_phase_seconds{phase="greedy"} 0.25' in text
+    assert 'test_events_total{counter="cache_hits"} 2' in text
+    assert text.endswith("\n")
+
+
+def test_callback_is_not_pickled():
+    metrics = OptimizationMetrics(print)
+    
+    assert metrics.__getstate__()['callback'] is None and metrics.callback is print
+
+
+def test_report_contains_solver_phases(preferences):
+    events = []
+    optimizer = NobetOptimizer(preferences, metrics_callback=events.append)
+    optimizer.generate_optimal_schedule()
+    report = optimizer.generate_report()
+    
+    assert {'preprocess', 'lp', 'lp_build', 'lp_solve', 'local_search'} <= set(report['metrics']['phases'])
+    assert events[-1] == {'type': 'report', 'metrics': report['metrics']}
+    assert {event['name'] for event in events if event['type'] == 'phase'} >= {'lp', 'local_search'}
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from schedule_optimizer import NobetOptimizer, ScheduleOperators
+
+
+@pytest.fixture
+def operators(preferences):
+    return ScheduleOperators(NobetOptimizer(preferences))
+
+
+def random_individual(operators):
+    """Kurallara bakmadan rastgele doktorlarla doldurulmuş, sonra onarılmış birey"""
+    individual = [random.randrange(operators.num_doctors) for _ in operators.slot_day]
+    return operators.repair(individual)
+
+
+def assert_valid(operators, individual):
+    """Aynı güne çift atama, ardışık nöbet ve nöbet sınırı ihlali olmamalı"""
+    masks, counts = operators.occupancy(individual)
+    for day in range(1, operators.num_days + 1):
+        start, end = operators.bounds[day]
+        assert len(set(individual[start:end])) == end - start
+    for mask, count in zip(masks, counts):
+        assert not mask & (mask >> 1)
+        assert mask.bit_count() == count <= operators.max_shifts
+    assert sum(counts) == len(individual)
+
+
+def test_repair_produces_valid_individuals(operators):
+    random.seed(0)
+    for _ in range(100):
+        assert_valid(operators, random_individual(operators))
+
+
+def test_mutate_keeps_hard_rules(operators):
+    random.seed(1)
+    for _ in range(500):
+        individual = random_individual(operators)
+        mutant, = operators.mutate(list(individual), indpb=0.3)
+        
+        assert len(mutant) == len(individual)
+        assert_valid(operators, mutant)
+
+
+def test_mutate_swaps_keep_hard_rules(operators, monkeypatch):
+    """Her slotta takas dalı denenir; takas sonrası maske/sayaçlar bireyle tutarlı kalmalı"""
+    random.seed(2)
+    individuals = [random_individual(operators) for _ in range(200)]
+    # indpb=1 ile her slot seçilir, 0.5 üzeri değer takas dalına gider
+    monkeypatch.setattr(random, 'random', lambda: 0.9)
+    for individual in individuals:
+        mutant, = operators.mutate(list(individual), indpb=1.0)
+        
+        assert mutant != individual
+        assert_valid(operators, mutant)
+
+
+def test_crossover_keeps_hard_rules(operators):
+    random.seed(3)
+    for _ in range(200):
+        child1, child2 = operators.crossover(random_individual(operators), random_individual(operators))
+        
+        assert_valid(operators, child1)
+        assert_valid(operators, child2)
+
+
+def test_crossover_can_exchange_last_day(operators):
+    random.seed(4)
+    start, end = operators.bounds[operators.num_days]
+    exchanged = False
+    for _ in range(200):
+        ind1, ind2 = random_individual(operators), random_individual(operators)
+        if ind1[start:end] == ind2[start:end]:
+            continue
+        child1, _ = operators.crossover(list(ind1), list(ind2))
+        exchanged = exchanged or child1[start:end] == ind2[start:end]
+    
+    assert exchanged
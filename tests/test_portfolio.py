@@ -0,0 +1,41 @@
+import multiprocessing
+from time import perf_counter
+
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def portfolio(preferences, **options):
+    return NobetOptimizer(preferences, ga_options={'seed': 1},
+                          portfolio_options=dict({'enabled': True, 'deadline': 3.0}, **options))
+
+
+@pytest.mark.parametrize('workers', [1, None])
+def test_portfolio_returns_best_offer(preferences, workers):
+    optimizer = portfolio(preferences, workers=workers)
+    events = []
+    schedule = optimizer.portfolio_optimize(progress_callback=events.append)
+    
+    assert events[0]['engine'] == 'greedy'
+    assert all(event['type'] == 'progress' for event in events)
+    assert [e['best_objective'] for e in events] == sorted(e['best_objective'] for e in events)
+    assert optimizer.evaluate_schedule(schedule) == events[-1]['best_objective']
+    assert optimizer.algorithm_used.startswith('portfolio:')
+    assert optimizer.metrics.counters['portfolio_incumbents'] == len(events)
+
+
+@pytest.mark.parametrize('workers', [1, None])
+def test_portfolio_respects_deadline(preferences, workers):
+    optimizer = portfolio(preferences, workers=workers)
+    start = perf_counter()
+    schedule = optimizer.portfolio_optimize(deadline=0.5)
+    
+    assert schedule
+    assert perf_counter() - start < 3.0
+
+
+def test_portfolio_leaves_no_worker_processes(preferences):
+    portfolio(preferences).portfolio_optimize(deadline=1.0)
+    
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from schedule_optimizer import NobetOptimizer, PreferenceIndex
+
+WEIGHTS = {'pozitif': 10, 'neutral': 1, 'negatif': -20}
+
+
+def make_index(**kwargs):
+    preferences = {'A': {'pozitif': [1, 3], 'negatif': [2, 3, 9]}, 'B': {'negatif': [4]}, 'C': {}}
+    return PreferenceIndex(preferences, ['A', 'B', 'C'], 4, [2, 2, 3, 3], [False, False, True, True],
+                           WEIGHTS, **kwargs)
+
+
+def test_masks_bits_and_scores():
+    index = make_index()
+    
+    assert index.positive_mask.tolist() == [[True, False, True, False], [False] * 4, [False] * 4]
+    assert index.is_positive(0, 1) and index.is_negative(0, 2) and index.is_negative(1, 4)
+    assert not index.is_negative(2, 4) and not index.is_positive(0, 2)
+    # Aynı gün hem pozitif hem negatifse pozitif sayılır; ufuk dışı günler yok sayılır
+    assert index.score(0, 3) == 10 and index.score(0, 2) == -20 and index.score(2, 1) == 1
+    assert index.negative_bits[0] == (1 << 2) | (1 << 3)
+    assert index.score_matrix.tolist() == [list(row) for row in index.score_rows]
+
+
+def test_required_slots_and_read_only_arrays():
+    index = make_index()
+    
+    assert index.required_by_day == (0, 2, 2, 3, 3)
+    assert index.slot_days.tolist() == [0, 0, 1, 1, 2, 2, 2, 3, 3, 3]
+    with pytest.raises(ValueError):
+        index.score_matrix[0, 0] = 5
+
+
+def test_history_adjustments_shift_scores():
+    index = make_index(weekend_adjustment=np.array([-2.0, 0.0, 1.0]), preference_adjustment=np.array([3.0, 1.0, 0.0]))
+    
+    assert index.score(0, 1) == 13 and index.score(0, 2) == -23
+    assert index.score(0, 3) == 13 - 2 and index.score(2, 4) == 2
+    assert index.score(1, 4) == -20 - 1
+
+
+def test_optimizer_index_follows_calendar(preferences):
+    optimizer = NobetOptimizer(preferences)
+    index = optimizer.pref_index
+    
+    assert index.required[14] == optimizer.WEEKEND_DOCTORS_NEEDED   # 15 Temmuz resmi tatil
+    assert index.required[6] == optimizer.WEEKDAY_DOCTORS_NEEDED
+    for doctor_id, doctor in enumerate(optimizer.doctors):
+        assert np.flatnonzero(index.negative_mask[doctor_id]).tolist() == [day - 1 for day in preferences[doctor]['negatif']]
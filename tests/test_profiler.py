@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+from schedule_optimizer import NobetOptimizer, PhaseProfiler
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_nested_phases_profile_innermost_only():
+    profiler = PhaseProfiler(sampling=False)
+    profiler.enter('outer')
+    profiler.enter('inner')
+    sum(range(10000))
+    profiler.exit('inner')
+    profiler.exit('outer')
+    
+    assert set(profiler.profiles) == {'outer', 'inner'}
+    assert profiler.active == [] and profiler._thread is None
+    assert profiler.stacks == {}
+
+
+def test_optimizer_phases_are_written(preferences, tmp_path):
+    profiler = PhaseProfiler(interval=0.001)
+    NobetOptimizer(preferences, profiler=profiler).generate_optimal_schedule()
+    written = profiler.write(str(tmp_path))
+    
+    assert 'lp' in profiler.profiles
+    assert str(tmp_path / 'lp.pstats') in written and str(tmp_path / 'summary.txt') in written
+    assert '=== lp ===' in (tmp_path / 'summary.txt').read_text(encoding='utf-8')
+    if profiler.stacks:
+        for line in (tmp_path / 'profile.collapsed').read_text(encoding='utf-8').splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert stack.split(';')[0] in profiler.profiles and int(count) > 0
+
+
+def test_profile_cli_writes_next_to_output(preferences, tmp_path):
+    source = tmp_path / 'tercihler.json'
+    source.write_text(json.dumps(preferences), encoding='utf-8')
+    output = tmp_path / 'cizelge.json'
+    subprocess.run([sys.executable, 'schedule_optimizer.py', '-i', str(source), '-o', str(output), '--profile'],
+                   cwd=ROOT, check=True, capture_output=True, timeout=120)
+    
+    assert output.exists()
+    assert (tmp_path / 'cizelge.profile' / 'summary.txt').exists()
+
+
+def test_profile_rejected_in_batch_mode(tmp_path):
+    result = subprocess.run([sys.executable, 'schedule_optimizer.py', '--batch', '-', '--profile'],
+                            cwd=ROOT, input='', capture_output=True, text=True, timeout=60)
+    
+    assert result.returncode == 2
+    assert '--profile' in result.stderr
@@ -0,0 +1,45 @@
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def block_day(preferences, day):
+    """Tüm doktorlara day gününü negatif ekler; LP atlanır ve GA çalışır"""
+    return {doctor: dict(prefs, pozitif=[value for value in prefs['pozitif'] if value != day],
+                         negatif=sorted(set(prefs['negatif']) | {day}))
+            for doctor, prefs in preferences.items()}
+
+
+def solve(preferences, **options):
+    optimizer = NobetOptimizer(preferences, ga_options={'seed': 1, 'generations': 5}, **options)
+    return optimizer, optimizer.generate_optimal_schedule()
+
+
+@pytest.mark.parametrize('case, algorithm', [
+    ('lp', 'linear_programming'),
+    ('portfolio', 'portfolio:'),
+    ('ga', 'genetic_algorithm'),
+    ('greedy', 'greedy'),
+])
+def test_quality_score_uses_common_objective(preferences, case, algorithm):
+    options = {
+        'lp': {},
+        'portfolio': {'portfolio_options': {'enabled': True, 'deadline': 3.0, 'workers': 1}},
+        'ga': {},
+        'greedy': {'rules': {'MAX_SHIFTS_PER_DOCTOR': 2}},
+    }[case]
+    optimizer, schedule = solve(block_day(preferences, 5) if case == 'ga' else preferences, **options)
+    
+    assert optimizer.algorithm_used.startswith(algorithm)
+    expected = optimizer.evaluate_schedule(schedule) / (optimizer.num_days * optimizer.num_doctors)
+    assert optimizer.quality_score == pytest.approx(expected)
+    assert optimizer.generate_report()['quality_metrics']['quality_score'] == optimizer.quality_score
+
+
+def test_lp_and_portfolio_scores_are_comparable(preferences):
+    lp, lp_schedule = solve(preferences)
+    portfolio, portfolio_schedule = solve(preferences, portfolio_options={'enabled': True, 'deadline': 3.0,
+                                                                          'workers': 1})
+    
+    assert lp.evaluate_schedule(lp_schedule) == portfolio.evaluate_schedule(portfolio_schedule)
+    assert lp.quality_score == portfolio.quality_score
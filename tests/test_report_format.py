@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+import schedule_optimizer
+from schedule_optimizer import compact_report, dumps_json
+
+
+def stream_records(optimizer, day_masks=False):
+    """write_report_stream çıktısını kayıt listesine çevirir"""
+    stream = io.StringIO()
+    summary = optimizer.write_report_stream(stream, day_masks=day_masks)
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    return records, summary
+
+
+def test_compact_report_round_trips_schedule(optimizer):
+    report = optimizer.generate_report()
+    compact = compact_report(report)
+    doctors = compact['doctors']
+    
+    assert compact['format'] == 'compact'
+    assert 'assigned_days' not in compact['doctor_stats']
+    for day, ids in enumerate(compact['schedule'], start=1):
+        assert sorted(doctors[i] for i in ids) == sorted(report['schedule'][day])
+    assert compact['doctor_stats']['total_shifts'] == [report['doctor_stats'][d]['total_shifts'] for d in doctors]
+    assert compact['quality_metrics'] == report['quality_metrics']
+
+
+def test_compact_report_day_masks(optimizer):
+    report = optimizer.generate_report()
+    compact = compact_report(report, day_masks=True)
+    
+    assert 'schedule' not in compact
+    for doctor, mask in zip(compact['doctors'], compact['day_masks']):
+        days = [day for day in range(1, optimizer.num_days + 1) if int(mask, 16) >> day & 1]
+        assert days == report['doctor_stats'][doctor]['assigned_days']
+
+
+def test_compact_report_passes_errors_through():
+    assert compact_report({'error': 'x'}) == {'error': 'x'}
+
+
+def test_stream_matches_full_report(optimizer):
+    report = optimizer.generate_report()
+    records, summary = stream_records(optimizer, day_masks=True)
+    doctors = records[0]['doctors']
+    
+    assert [r['type'] for r in records] == (['header'] + ['day'] * optimizer.num_days
+                                            + ['doctor'] * len(doctors) + ['summary'])
+    for record in records[1:1 + optimizer.num_days]:
+        assert sorted(doctors[i] for i in record['doctors']) == sorted(report['schedule'][record['day']])
+    for record in records[1 + optimizer.num_days:-1]:
+        stats = report['doctor_stats'][doctors[record['id']]]
+        assert record['total_shifts'] == stats['total_shifts']
+        assert record['satisfaction_score'] == pytest.approx(stats['satisfaction_score'])
+        assert record['day_mask'] == format(sum(1 << day for day in stats['assigned_days']), 'x')
+    assert records[-1]['quality_metrics']['total_shifts'] == report['quality_metrics']['total_shifts']
+    assert summary['type'] == 'summary'
+
+
+@pytest.mark.parametrize('orjson', [True, False])
+def test_dumps_json_is_compact_and_keeps_int_keys(monkeypatch, orjson):
+    if orjson and not schedule_optimizer.ORJSON_AVAILABLE:
+        pytest.skip("orjson kurulu değil")
+    monkeypatch.setattr(schedule_optimizer, 'ORJSON_AVAILABLE', orjson)
+    data = {1: ['Dr. Ayşe'], 'x': 1.5}
+    
+    assert dumps_json(data) == '{"1":["Dr. Ayşe"],"x":1.5}'
+    assert json.loads(dumps_json(data, indent=True)) == {'1': ['Dr. Ayşe'], 'x': 1.5}
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+
+from schedule_optimizer import NobetOptimizer, Schedule
+
+
+def test_from_dict_and_back():
+    schedule = Schedule.from_dict({'1': ['A', 'B'], 2: ['C'], 3: ['X'], 9: ['A']}, ['A', 'B', 'C'], 3)
+    
+    assert schedule.to_dict() == {1: ['A', 'B'], 2: ['C'], 3: []}
+    assert schedule[1] == ('A', 'B') and dict(schedule)[2] == ('C',)
+    assert json.loads(json.dumps(schedule.to_dict())) == {'1': ['A', 'B'], '2': ['C'], '3': []}
+
+
+def test_matrix_views():
+    schedule = Schedule.from_slots(['A', 'B'], 4, [0, 0, 1, 0], [0, 2, 1, 2])
+    
+    assert schedule.days_of(0) == [1, 3, 3]
+    assert schedule.doctor_ids_on(3) == [0, 0]
+    assert schedule.shift_counts().tolist() == [3, 1]
+    assert schedule.coverage().tolist() == [1, 1, 2, 0]
+    assert schedule.bitmasks() == [0b1010, 0b100]
+    
+    schedule.unassign(0, 3)
+    schedule.assign(1, 4)
+    assert schedule.to_dict() == {1: ['A'], 2: ['B'], 3: ['A'], 4: ['B']}
+
+
+def test_copy_equality_and_hash():
+    schedule = Schedule.from_dict({1: ['A'], 2: ['B']}, ['A', 'B'], 2)
+    copy = schedule.copy()
+    
+    assert copy == schedule and hash(copy) == hash(schedule)
+    copy.assign(0, 2)
+    assert copy != schedule and schedule[2] == ('B',)
+
+
+def test_from_dict_returns_matching_schedule_unchanged():
+    schedule = Schedule.from_dict({1: ['A'], 2: ['B']}, ['A', 'B'], 2)
+    
+    assert Schedule.from_dict(schedule, ('A', 'B'), 2) is schedule
+
+
+def test_from_dict_remaps_other_doctor_order_and_horizon():
+    schedule = Schedule.from_dict({1: ['A'], 2: ['B', 'C'], 3: ['C']}, ['A', 'B', 'C'], 3)
+    
+    remapped = Schedule.from_dict(schedule, ['C', 'A', 'D'], 2)
+    assert remapped.doctors == ('C', 'A', 'D')
+    assert remapped.to_dict() == {1: ['A'], 2: ['C']}
+    assert np.array_equal(remapped.matrix, [[0, 1], [1, 0], [0, 0]])
+
+
+def test_reversed_schedule_scores_like_dict(preferences):
+    optimizer = NobetOptimizer(preferences)
+    schedule = optimizer.as_schedule(optimizer.simple_greedy_algorithm())
+    reversed_schedule = Schedule.from_dict(schedule.to_dict(), list(reversed(optimizer.doctors)), optimizer.num_days)
+    
+    assert optimizer.evaluate_schedule(reversed_schedule) == optimizer.evaluate_schedule(schedule.to_dict())
+    assert optimizer.as_schedule(reversed_schedule) == schedule
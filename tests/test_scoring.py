@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from schedule_optimizer import NobetOptimizer
+
+
+def edited(schedule, doctor, source, target):
+    """Çizelgenin doktoru source gününden target gününe taşınmış kopyası"""
+    result = {day: list(doctors) for day, doctors in schedule.items()}
+    result[source].remove(doctor)
+    result[target].append(doctor)
+    return result
+
+
+def first_assignment(schedule):
+    for day, doctors in schedule.items():
+        if doctors:
+            return doctors[0], day
+    raise AssertionError("Boş çizelge")
+
+
+def test_objective_matches_evaluate_schedule(optimizer):
+    result = optimizer.score_schedules(optimizer.schedule)[0]
+    
+    assert result['objective'] == pytest.approx(optimizer.evaluate_schedule(optimizer.schedule))
+    assert result['delta'] == 0
+    assert set(result['doctor_stats']) == set(optimizer.doctors)
+    total = sum(stats['total_shifts'] for stats in result['doctor_stats'].values())
+    assert total == int(optimizer.as_schedule(optimizer.schedule).matrix.sum())
+
+
+def test_edit_matches_full_schedule(optimizer):
+    schedule = optimizer.as_schedule(optimizer.schedule).to_dict()
+    doctor, day = first_assignment(schedule)
+    target = day + 10
+    
+    by_edit, by_schedule = optimizer.score_schedules([
+        {'edits': [{'doctor': doctor, 'from': day, 'to': target}]},
+        edited(schedule, doctor, day, target),
+    ])
+    
+    assert by_edit['objective'] == pytest.approx(by_schedule['objective'])
+    assert by_edit['violations'] == by_schedule['violations']
+    assert by_edit['delta'] == pytest.approx(by_edit['objective'] - optimizer.evaluate_schedule(schedule))
+    # Kaynak gün bir kişi eksik kalır
+    assert day in by_edit['violations']['coverage']
+    assert not by_edit['valid']
+
+
+def test_iso_dates_and_batch_consistency(optimizer):
+    schedule = optimizer.as_schedule(optimizer.schedule).to_dict()
+    doctor, day = first_assignment(schedule)
+    iso = optimizer.calendar.date_of(day).isoformat()
+    candidates = [{'edits': [{'doctor': doctor, 'remove': iso}, {'doctor': doctor, 'add': day}]}] * 50
+    
+    results = optimizer.score_schedules(candidates, doctor_stats=False)
+    
+    assert len(results) == 50
+    assert all(result['delta'] == 0 and 'doctor_stats' not in result for result in results)
+
+
+def test_hard_constraint_violations(optimizer):
+    schedule = optimizer.as_schedule(optimizer.schedule).to_dict()
+    doctor = next(doctor for doctor in optimizer.doctors if doctor not in schedule[1] + schedule[2])
+    # Aynı doktor art arda iki gün ve bir güne iki kez
+    overloaded = {day: list(doctors) for day, doctors in schedule.items()}
+    overloaded[1] = overloaded[1] + [doctor, doctor]
+    overloaded[2] = overloaded[2] + [doctor]
+    # Ufuk sınırını aşan doktor
+    busy = next(other for other in optimizer.doctors if other != doctor)
+    for day in range(3, optimizer.num_days + 1, 2):
+        if busy not in overloaded[day]:
+            overloaded[day].append(busy)
+    
+    violations = optimizer.score_schedules(overloaded)[0]['violations']
+    
+    assert {'doctor': doctor, 'day': 1} in violations['duplicate']
+    assert {'doctor': doctor, 'day': 1} in violations['consecutive']
+    assert busy in violations['max_shifts']
+    assert 1 in violations['coverage'] and 2 in violations['coverage']
+
+
+@pytest.mark.parametrize('edit, message', [
+    ({'doctor': 'Dr. Yok', 'add': 1}, 'Bilinmeyen doktor'),
+    ({'doctor': None, 'add': 40}, 'Bilinmeyen doktor'),
+    ({'add': 40}, 'Ufuk dışı'),
+    ({'remove': 1}, 'nöbetli değil'),
+    ({}, 'Geçersiz düzenleme'),
+])
+def test_invalid_edits(optimizer, edit, message):
+    schedule = optimizer.as_schedule(optimizer.schedule)
+    doctor = optimizer.doctors[0]
+    free_day = next(day for day in range(1, optimizer.num_days + 1) if doctor not in schedule[day])
+    edit = {'doctor': doctor, **edit}
+    if edit.get('remove') == 1:
+        edit['remove'] = free_day
+    
+    with pytest.raises(ValueError, match=message):
+        optimizer.score_schedules([{'edits': []}, {'edits': [edit]}])
+
+
+def test_apply_edits_in_place(optimizer):
+    matrix = np.zeros((optimizer.num_doctors, optimizer.num_days), dtype=np.int16)
+    doctor = optimizer.doctors[2]
+    
+    optimizer.apply_edits(matrix, [{'doctor': doctor, 'add': 5}, {'doctor': doctor, 'from': 5, 'to': 9}])
+    
+    assert matrix.sum() == 1
+    assert matrix[2, 8] == 1
+
+
+def test_edits_require_base(preferences):
+    with pytest.raises(ValueError, match='base'):
+        NobetOptimizer(preferences).score_schedules({'edits': []})
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from optimizer_service import DuplicateJobError, OptimizerService, QueueFullError
+
+
+def slow_job(preferences, job_id, timeout):
+    """LP'yi atlatan (her doktor 5. gün negatif) ve GA'yı süre sınırına kadar çalıştıran iş"""
+    preferences = {doctor: dict(prefs, pozitif=[day for day in prefs['pozitif'] if day != 5],
+                                negatif=sorted(set(prefs['negatif']) | {5}))
+                   for doctor, prefs in preferences.items()}
+    return {'id': job_id, 'preferences': preferences, 'timeout': timeout,
+            'ga_options': {'generations': 10 ** 6}}
+
+
+def crash_job(job):
+    """İşçi sürecini öldürür (havuzu bozar)"""
+    os._exit(1)
+
+
+def run(coroutine_function, *args):
+    """Servisi tek işçiyle açar, testi olay döngüsünde çalıştırır ve havuzu kapatır"""
+    async def main():
+        service = OptimizerService(workers=1, queue_size=2, default_timeout=30.0)
+        try:
+            return await coroutine_function(service, *args)
+        finally:
+            service.executor.shutdown(cancel_futures=True)
+    return asyncio.run(main())
+
+
+async def wait_status(service, job_id, statuses, limit=30.0):
+    end = time.monotonic() + limit
+    while (service.job_status(job_id) or {}).get('status') not in statuses:
+        assert time.monotonic() < end, service.job_status(job_id)
+        await asyncio.sleep(0.05)
+    return service.job_status(job_id)
+
+
+def submit(service, job):
+    job, _ = service.prepare_job(job)
+    return service.submit(job)
+
+
+def test_queue_limit_and_cancel(preferences):
+    async def scenario(service):
+        running = submit(service, slow_job(preferences, 'a', 2.0))
+        queued = submit(service, slow_job(preferences, 'b', 30.0))
+        with pytest.raises(QueueFullError):
+            submit(service, slow_job(preferences, 'c', 30.0))
+        
+        assert service.job_status(running)['status'] == 'running'
+        assert service.job_status(queued)['status'] == 'queued'
+        
+        # Bekleyen iş gerçekten iptal edilir; çalışan iş iptal edilemez, bitiş anında kendiliğinden biter
+        assert service.cancel(queued)
+        assert service.job_status(queued)['status'] == 'cancelled'
+        assert not service.cancel(running)
+        assert service.job_status(running)['status'] == 'running'
+        delete = await service.route('DELETE', f'/jobs/{running}', b'')
+        
+        start = time.monotonic()
+        status = await wait_status(service, running, ('done', 'failed'))
+        return delete, status, time.monotonic() - start
+    
+    delete, status, elapsed = run(scenario)
+    assert delete[0] == 409 and delete[1]['status'] == 'running' and not delete[1]['cancelled']
+    assert status['result']['success']
+    assert elapsed < 10.0
+
+
+def test_duplicate_job_id_rejected(preferences):
+    async def scenario(service):
+        first = submit(service, slow_job(preferences, 'a', 2.0))
+        with pytest.raises(DuplicateJobError):
+            submit(service, slow_job(preferences, 'a', 2.0))
+        body = json.dumps(slow_job(preferences, 'a', 2.0)).encode()
+        response = await service.route('POST', '/jobs', body)
+        await wait_status(service, first, ('done', 'failed'))
+        return response, len(service.jobs), service.active_jobs
+    
+    response, jobs, active = run(scenario)
+    assert response[0] == 409
+    assert (jobs, active) == (1, 0)
+
+
+@pytest.mark.parametrize('timeout', [None, 'x', 0, -1, True])
+def test_invalid_timeout_rejected(preferences, timeout):
+    async def scenario(service):
+        body = json.dumps({'preferences': preferences, 'timeout': timeout}).encode()
+        return (await service.route('POST', '/solve', body),
+                await service.route('POST', '/score', body))
+    
+    solve, score = run(scenario)
+    assert solve[0] == 400 and score[0] == 400
+
+
+def test_crashed_worker_restarts_pool(preferences):
+    async def scenario(service):
+        job, timeout = service.prepare_job({'id': 'crash', 'preferences': preferences, 'timeout': 30.0})
+        crashed = await service.solve(job, timeout, function=crash_job)
+        job, timeout = service.prepare_job({'id': 'after', 'preferences': preferences, 'timeout': 30.0})
+        after = await service.solve(job, timeout)
+        return crashed, after
+    
+    crashed, after = run(scenario)
+    assert crashed[0] == 200 and not crashed[1]['success']
+    assert after[0] == 200 and after[1]['success']
+
+
+def test_solve_timeout_and_deadline(preferences):
+    async def scenario(service):
+        job, timeout = service.prepare_job(slow_job(preferences, 'a', 1.0))
+        status, payload = await service.solve(job, timeout)
+        finished = await wait_status(service, 'a', ('done', 'failed'))
+        return status, payload, finished
+    
+    status, payload, finished = run(scenario)
+    # Yanıt zaman aşımında ya da iş tam bitiş anında döner; işçi her durumda serbest kalır
+    assert status in (200, 504)
+    assert finished['result']['success']
+
+
+def test_routes(preferences):
+    async def scenario(service):
+        body = json.dumps({'preferences': preferences, 'candidates': [{}]}).encode()
+        return [
+            await service.route('GET', '/health', b''),
+            await service.route('GET', '/solve', b''),
+            await service.route('GET', '/nope', b''),
+            await service.route('POST', '/solve', b'[1]'),
+            await service.route('POST', '/score', body),
+            await service.route('GET', '/jobs/yok', b''),
+        ]
+    
+    health, wrong_method, missing, invalid, score, unknown_job = run(scenario)
+    assert health[0] == 200 and health[1]['workers'] == 1
+    assert wrong_method[0] == 405 and missing[0] == 404 and invalid[0] == 400
+    assert score[0] == 200 and score[1]['results'][0]['violations']['coverage']
+    assert unknown_job[0] == 404
+
+
+def test_score_counts_against_queue(preferences):
+    async def scenario(service):
+        submit(service, slow_job(preferences, 'a', 2.0))
+        submit(service, slow_job(preferences, 'b', 2.0))
+        body = json.dumps({'preferences': preferences, 'candidates': [{}]}).encode()
+        return await service.route('POST', '/score', body)
+    
+    status, payload, headers = run(scenario)
+    assert status == 503 and headers == {'Retry-After': '1'}
+
+
+def test_client_disconnect_cancels_queued_job(preferences):
+    async def scenario(service):
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async def post(job):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = json.dumps(job).encode()
+            writer.write(f"POST /solve HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            return reader, writer
+        
+        try:
+            reader, writer = await post(slow_job(preferences, 'a', 2.0))
+            _, dropped = await post(slow_job(preferences, 'b', 30.0))
+            await wait_status(service, 'b', ('queued',))
+            dropped.close()
+            cancelled = await wait_status(service, 'b', ('cancelled',), limit=5.0)
+            
+            response = await asyncio.wait_for(reader.read(), 30.0)
+            writer.close()
+            return cancelled, response
+        finally:
+            server.close()
+    
+    cancelled, response = run(scenario)
+    assert cancelled['status'] == 'cancelled'
+    # Çalışan iş yanıtını ya sonuçla ya da tam bitiş anında zaman aşımıyla verir
+    assert response.startswith((b"HTTP/1.1 200 OK", b"HTTP/1.1 504 Gateway Timeout"))
@@ -0,0 +1,40 @@
+from time import time
+
+from schedule_optimizer import NobetOptimizer
+
+
+def test_solver_receives_limits(preferences):
+    optimizer = NobetOptimizer(preferences, solver_options={'time_limit': 7, 'gap': 0.05, 'threads': 2})
+    solver = optimizer.create_lp_solver(warm_start=True)
+    
+    assert solver.timeLimit == 7
+    assert solver.optionsDict['gapRel'] == 0.05 and solver.optionsDict['threads'] == 2
+    assert solver.optionsDict['warmStart'] is True and not solver.msg
+
+
+def test_deadline_clamps_time_limit(preferences):
+    optimizer = NobetOptimizer(preferences, solver_options={'time_limit': 60})
+    optimizer.deadline = time() + 2.0
+    
+    assert 0 < optimizer.create_lp_solver().timeLimit <= 2.0
+
+
+def test_defaults_leave_solver_unbounded(preferences):
+    solver = NobetOptimizer(preferences).create_lp_solver()
+    
+    assert solver.timeLimit is None and 'gapRel' not in solver.optionsDict
+
+
+def test_unknown_backend_falls_back_to_cbc(preferences):
+    optimizer = NobetOptimizer(preferences, solver_options={'backend': 'yok_boyle_cozucu'})
+    solver = optimizer.create_lp_solver()
+    
+    assert type(solver).__name__ == 'PULP_CBC_CMD'
+    assert any('CBC kullanılıyor' in line for line in optimizer.optimization_log)
+    assert optimizer.linear_programming_optimize() is not None
+
+
+def test_zero_time_limit_still_returns_schedule(preferences):
+    optimizer = NobetOptimizer(preferences, solver_options={'time_limit': 0})
+    
+    assert optimizer.generate_optimal_schedule()
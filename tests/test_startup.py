@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def test_import_does_not_load_engines():
+    loaded = run_python("import json, sys, schedule_optimizer; "
+                        "print(json.dumps([name for name in ('pulp', 'deap') if name in sys.modules]))")
+    
+    assert loaded == []
+
+
+def test_engines_load_on_first_use():
+    result = run_python(
+        "import json, sys, schedule_optimizer as so\n"
+        "from schedule_benchmark import generate_preferences\n"
+        "optimizer = so.NobetOptimizer(generate_preferences(6, horizon=7), month=7, year=2025)\n"
+        "optimizer.simple_greedy_algorithm()\n"
+        "before = 'pulp' in sys.modules\n"
+        "optimizer.linear_programming_optimize()\n"
+        "print(json.dumps([before, 'pulp' in sys.modules, sorted(so.IMPORT_TIMES)]))"
+    )
+    
+    assert result[0] is False and result[1] is True
+    assert {'numpy', 'pulp'} <= set(result[2])
+
+
+def test_profile_startup_reports_imports():
+    result = subprocess.run([sys.executable, 'schedule_optimizer.py', '--profile-startup'], cwd=ROOT,
+                            capture_output=True, text=True)
+    
+    assert result.returncode == 0
+    assert 'modül yükleme' in result.stderr and 'import pulp' in result.stderr
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+
+from schedule_optimizer import NobetOptimizer, compact_report, run_batch
+from schedule_storage import ScheduleStore, SQLiteScheduleStore, open_store, period_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(f"sqlite:{tmp_path / 'nobet.db'}")
+    yield store
+    store.close()
+
+
+def solved_report(preferences, **kwargs):
+    optimizer = NobetOptimizer(preferences, **kwargs)
+    optimizer.generate_optimal_schedule()
+    return optimizer.generate_report()
+
+
+def test_base_store_is_abstract():
+    with pytest.raises(TypeError):
+        ScheduleStore()
+
+
+def test_preferences_round_trip(store, preferences):
+    assert store.save_preferences('acil', '2025-07', preferences) == len(preferences)
+    
+    loaded = store.load_preferences('acil', '2025-07')
+    assert loaded == {doctor: {'pozitif': prefs['pozitif'], 'negatif': prefs['negatif'], 'ozelSebepler': ''}
+                      for doctor, prefs in preferences.items()}
+    assert store.load_preferences('dahiliye', '2025-07') == {}
+    assert store.load_preferences('acil', '2025-08') == {}
+
+
+def test_preferences_upsert_and_iso_days(store, preferences):
+    doctor = next(iter(preferences))
+    store.save_preferences('acil', '2025-07', preferences)
+    store.save_preferences('acil', '2025-07', {doctor: {'pozitif': ['2025-07-20', 3], 'negatif': ['2025-08-02']}})
+    
+    loaded = store.load_preferences('acil', '2025-07')
+    assert len(loaded) == len(preferences)
+    assert loaded[doctor]['pozitif'] == [20, 3] and loaded[doctor]['negatif'] == [33]
+
+
+def test_report_versions(store, preferences):
+    report = solved_report(preferences)
+    
+    assert store.save_report('acil', report) == 1
+    assert store.save_report('acil', compact_report(report)) == 2
+    assert store.save_report('dahiliye', report) == 1
+    
+    versions = store.list_versions('acil', '2025-07')
+    assert [row['version'] for row in versions] == [1, 2]
+    assert versions[0]['algorithm'] == report['quality_metrics']['algorithm_used']
+    
+    expected = NobetOptimizer.normalize_schedule(report['schedule'])
+    for version in (1, 2, None):
+        loaded = store.load_schedule('acil', '2025-07', version)
+        assert loaded['schedule'] == expected
+    assert store.load_schedule('acil', '2025-07')['version'] == 2
+    assert store.load_schedule('acil', '2025-08') is None
+
+
+def test_versions_survive_reopen(tmp_path, preferences):
+    path = str(tmp_path / 'nobet.db')
+    store = SQLiteScheduleStore(path)
+    store.save_report('acil', solved_report(preferences))
+    store.close()
+    
+    reopened = SQLiteScheduleStore(path)
+    assert reopened.save_report('acil', solved_report(preferences)) == 2
+    reopened.close()
+
+
+def test_batch_reads_and_writes_store(store, preferences):
+    store.save_preferences('acil', period_key(2025, 7), preferences)
+    jobs = io.StringIO('{"id": "ok", "tenant": "acil"}\n{"id": "missing", "tenant": "yok"}\n')
+    output = io.StringIO()
+    
+    assert run_batch(jobs, output, workers=1, store=store) == (1, 1)
+    
+    results = {row['id']: row for row in map(json.loads, output.getvalue().splitlines())}
+    assert results['ok']['success'] and results['ok']['version'] == 1
+    assert not results['missing']['success'] and 'yok' in results['missing']['error']
+    assert store.load_schedule('acil', '2025-07')['version'] == 1